@@ -0,0 +1,51 @@
+import numpy
+
+# Walker's alias method for sampling an index from a discrete distribution. Building the
+# table is O(n), after which every sample costs one uniform random number and one
+# comparison, however many outcomes there are
+class AliasTable:
+    # weights are non-negative numbers, one per outcome, that need not sum to one
+    def __init__(self, weights):
+        weights = [float(weight) for weight in weights]
+        if not weights or min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError("Alias table weights must be non-negative and not all zero, got %r" % (weights,))
+        self.weights = weights
+        self.size = len(weights)
+        total = sum(weights)
+        # Scale so the average outcome fills exactly one column of the table
+        scaled = [weight * self.size / total for weight in weights]
+        self.probability = [1.0] * self.size
+        self.alias = range(self.size)
+        small = [index for index in xrange(self.size) if scaled[index] < 1.0]
+        large = [index for index in xrange(self.size) if scaled[index] >= 1.0]
+        # Vose's construction: top up each under-full column with part of an over-full one
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # Whatever is left is full up to rounding error
+        for index in small + large:
+            self.probability[index] = 1.0
+        self.probability_array = numpy.array(self.probability)
+        self.alias_array = numpy.array(self.alias)
+
+    # Index drawn using one uniformly distributed random number in [0, 1)
+    def sample(self, uniform):
+        position = uniform * self.size
+        column = min(int(position), self.size - 1)
+        if position - column < self.probability[column]:
+            return column
+        return self.alias[column]
+
+    # Indices drawn for a whole NumPy array of uniform random numbers at once
+    def sample_batch(self, uniforms):
+        positions = numpy.asarray(uniforms) * self.size
+        columns = numpy.minimum(positions.astype(numpy.intp), self.size - 1)
+        keep = (positions - columns) < self.probability_array[columns]
+        return numpy.where(keep, columns, self.alias_array[columns])
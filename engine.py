@@ -1,23 +1,215 @@
-from future_event_list import FutureEventList
-from future_event_list import Event
+from timeit import default_timer
+from future_event_list import EventPool
+from future_event_list import FEL_STRATEGIES
 
 class SimulationEngine:
-    def __init__(self):
-        self.future_event_list = FutureEventList()
+    # Number of events run() executes between checks of its wall clock budget
+    WALLCLOCK_CHECK_INTERVAL = 256
+
+    # fel_strategy is either the name of one of the FEL_STRATEGIES ('linked',
+    # 'heap' or 'calendar') or an already constructed future event list.
+    # If recycle_events is True, executed and cancelled events are reused for
+    # later events instead of being left to the garbage collector
+    def __init__(self, fel_strategy='heap', recycle_events=False):
+        self.event_pool = EventPool() if recycle_events else None
+        if isinstance(fel_strategy, basestring):
+            if fel_strategy not in FEL_STRATEGIES:
+                raise ValueError("Unknown future event list strategy '%s', expected one of: %s"
+                                 % (fel_strategy, ', '.join(sorted(FEL_STRATEGIES))))
+            self.future_event_list = FEL_STRATEGIES[fel_strategy](self.event_pool)
+        else:
+            self.future_event_list = fel_strategy
         self.now = 0.0
+        # Event returned by the last remove_event(), released to the pool on the next call
+        self.last_removed_event = None
+        # Handler for each event type, indexed by EventType value
+        self.handlers = []
+        # Why the last call to run() returned: 'empty', 'until_time', 'max_events',
+        # 'wallclock_budget' or 'predicate'
+        self.stop_reason = None
+        # Number of events removed for execution, and number cancelled before execution
+        self.executed_count = 0
+        self.cancelled_count = 0
     
     # Keeps track of current time
-    def current_time():
-        return now
+    def current_time(self):
+        return self.now
+
+    # Registers the function that executes events of event_type. Events are dispatched
+    # through a list indexed by event type, so the type only needs checking here, once
+    def register_handler(self, event_type, handler):
+        if not isinstance(event_type, int) or event_type < 0:
+            raise ValueError("Event type must be a non-negative integer, got %r" % (event_type,))
+        while len(self.handlers) <= event_type:
+            self.handlers.append(self.unregistered_handler(len(self.handlers)))
+        if not getattr(self.handlers[event_type], 'unregistered', False):
+            raise ValueError("A handler is already registered for event type %d" % event_type)
+        self.handlers[event_type] = handler
+
+    # Placeholder in the handler list for event types nobody registered
+    def unregistered_handler(self, event_type):
+        def handler(payload):
+            raise ValueError("No handler registered for event type %d" % event_type)
+        handler.unregistered = True
+        return handler
+
+    # Executes an event by calling the handler registered for its type with its payload
+    def dispatch_event(self, event):
+        self.handlers[event.event_data](event.payload)
 
     # Wrapper method to add newly scheduled event to future event list 
-    # and insert it according to timestamp
-    def schedule_new_event(self, timestamp, event_data, callback):
-        self.future_event_list.add_event(timestamp, event_data, callback)
+    # and insert it according to timestamp. Returns a handle that can be passed to cancel().
+    # The handle records the event's sequence number as well as the event, so a handle
+    # kept after its event was executed never matches a recycled Event object
+    def schedule_new_event(self, timestamp, event_data, payload=None):
+        new_event = self.future_event_list.add_event(timestamp, event_data, payload)
+        return (new_event, new_event.sequence)
+
+    # Whether the event a handle refers to is still waiting to be executed
+    def is_pending(self, handle):
+        event, sequence = handle
+        return event.pending is True and event.sequence == sequence
+
+    # Whether the event a handle refers to is still in the future event list, cancelled or not
+    def is_scheduled(self, handle):
+        event, sequence = handle
+        return event.pending is not False and event.sequence == sequence
+
+    # Cancels a scheduled event. The event is left in the future event list and is
+    # discarded when it reaches the front (lazy deletion), so cancelling costs O(1).
+    # Returns False if the event was already executed or cancelled
+    def cancel(self, handle):
+        event, sequence = handle
+        if not event.pending or event.sequence != sequence:
+            return False
+        event.pending = None
+        self.cancelled_count += 1
+        return True
 
-    # Wrapper method to remove the first event from the future event list
+    # Undoes cancel() for an event that has not yet reached the front of the future event
+    # list, so it is executed after all. Returns False if the event was not cancelled or has
+    # already been discarded
+    def uncancel(self, handle):
+        event, sequence = handle
+        if event.pending is not None or event.sequence != sequence:
+            return False
+        event.pending = True
+        self.cancelled_count -= 1
+        return True
+
+    # Wrapper method to remove the first event from the future event list,
+    # skipping over any events that were cancelled. The returned event is only
+    # valid until the next call when events are being recycled
     def remove_event(self):
-        return self.future_event_list.remove_first_event()
+        event_pool = self.event_pool
+        if event_pool is not None and self.last_removed_event is not None:
+            event_pool.release(self.last_removed_event)
+        removed_event = self.future_event_list.remove_first_event()
+        while removed_event is not None and not removed_event.pending:
+            removed_event.pending = False
+            if event_pool is not None:
+                event_pool.release(removed_event)
+            removed_event = self.future_event_list.remove_first_event()
+        if removed_event is not None:
+            removed_event.pending = False
+            self.executed_count += 1
+        self.last_removed_event = removed_event
+        return removed_event
+
+    # Undoes the last remove_event(), putting the event back at the front of the future event list
+    def unremove_event(self, event):
+        event.pending = True
+        self.executed_count -= 1
+        self.last_removed_event = None
+        self.future_event_list.reinsert_first_event(event)
+
+    # Executes events in timestamp order, advancing self.now, until the future event list
+    # is empty or one of the optional stop conditions is met:
+    #   until_time - the next event is later than this time; the clock is left at until_time
+    #       and the event stays scheduled, so a later run() carries on from it
+    #   max_events - this many events have been executed by this call
+    #   wallclock_budget - this many seconds of real time have passed, checked every
+    #       WALLCLOCK_CHECK_INTERVAL events so the timer is not read on every event
+    #   predicate - a function of no arguments returned True after executing an event
+    # Returns the number of events executed, and sets self.stop_reason
+    def run(self, until_time=None, max_events=None, wallclock_budget=None, predicate=None):
+        if until_time is None:
+            until_time = float('inf')
+        if max_events is None:
+            max_events = -1
+        handlers = self.handlers
+        remove_event = self.remove_event
+        executed = 0
+        # Plain loop when only time and event count limits apply
+        if wallclock_budget is None and predicate is None:
+            while executed != max_events:
+                event = remove_event()
+                if event is None:
+                    self.stop_reason = 'empty'
+                    return executed
+                if event.timestamp > until_time:
+                    self.unremove_event(event)
+                    self.now = until_time
+                    self.stop_reason = 'until_time'
+                    return executed
+                self.now = event.timestamp
+                handlers[event.event_data](event.payload)
+                executed += 1
+            self.stop_reason = 'max_events'
+            return executed
+
+        deadline = float('inf') if wallclock_budget is None else default_timer() + wallclock_budget
+        check_interval = SimulationEngine.WALLCLOCK_CHECK_INTERVAL
+        while executed != max_events:
+            event = remove_event()
+            if event is None:
+                self.stop_reason = 'empty'
+                return executed
+            if event.timestamp > until_time:
+                self.unremove_event(event)
+                self.now = until_time
+                self.stop_reason = 'until_time'
+                return executed
+            self.now = event.timestamp
+            handlers[event.event_data](event.payload)
+            executed += 1
+            if predicate is not None and predicate():
+                self.stop_reason = 'predicate'
+                return executed
+            if executed % check_interval == 0 and default_timer() > deadline:
+                self.stop_reason = 'wallclock_budget'
+                return executed
+        self.stop_reason = 'max_events'
+        return executed
+
+    # Returns the engine's state as plain data: the clock, the event counters and the
+    # scheduled events as (timestamp, event_data, payload, sequence, cancelled) in execution
+    # order. Cancelled events are kept, as they can still be uncancelled
+    def get_state(self):
+        return {'now': self.now,
+                'executed_count': self.executed_count,
+                'cancelled_count': self.cancelled_count,
+                'sequence': self.future_event_list.sequence,
+                'events': [(event.timestamp, event.event_data, event.payload, event.sequence, event.pending is None)
+                           for event in self.future_event_list.scheduled_events()]}
+
+    # Replaces the engine's state with one returned by get_state(), keeping the registered
+    # handlers and the future event list strategy. Returns a dict mapping each restored
+    # event's sequence number to its new handle
+    def set_state(self, state):
+        self.future_event_list = self.future_event_list.__class__(self.event_pool)
+        self.last_removed_event = None
+        self.now = state['now']
+        self.executed_count = state['executed_count']
+        self.cancelled_count = state['cancelled_count']
+        handles = {}
+        for timestamp, event_data, payload, sequence, cancelled in state['events']:
+            restored_event = self.future_event_list.restore_event(timestamp, event_data, payload, sequence)
+            if cancelled:
+                restored_event.pending = None
+            handles[sequence] = (restored_event, sequence)
+        self.future_event_list.sequence = state['sequence']
+        return handles
 
     # Wrapper method to see if the future event list is empty
     def is_empty(self):
@@ -1,6 +1,6 @@
 import pandas as pd
 
-df = pd.read_csv('ExperimentResults/light_g35_r13_fpoint1_a6.csv')
+df = pd.read_csv('ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv')
 
 N14E_car_arrivals = df["Num Cars N14E"].mean()
 S14E_car_arrivals = df["Num Cars S14E"].mean()
@@ -59,7 +59,7 @@ for rect in rects:
                                     # positive and negative values.
 plt.ylim(0, 200)
 plt.tight_layout()
-plt.savefig('Graphs/arrivals_light_g35_r13_fpoint1_a6.png')
+plt.savefig('Graphs/arrivals_light_g35_r13_fpoint1_a6_delay.png')
 
 
 
@@ -123,4 +123,4 @@ for rect in rects:
                                     # positive and negative values.
 plt.ylim(0, 30)
 plt.tight_layout()
-plt.savefig('Graphs/wait_light_g35_r13_fpoint1_a6.png')
+plt.savefig('Graphs/wait_light_g35_r13_fpoint1_a6_delay.png')
@@ -2,16 +2,10 @@
 
 # Change the command line arguments as necessary to perform various experiments.
 # See README.txt for an overview of the command line arguments as well as their
-# default values.
+# default values. The replications run in parallel, one process per core, in batches
+# until the average waits are known to within 5% (-p), at most 100 of them (-R), and
+# their statistics are appended to the results file (-o) once they have all finished.
 
 echo Experiment Begin
-counter=1
-while  [ $counter -le 100 ]
-do
-    echo -e '\n*********************************************************'
-    python2 intersection_simulation.py -l t -g 35 -r 13 -f 0.1 -a 6
-    echo -e '\n*********************************************************'
-    ((counter++))
-done
-
-echo Experiment Complete
\ No newline at end of file
+python2 replication.py -R 100 -p 0.05 -l t -g 35 -r 13 -f 0.1 -a 6 -o ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv
+echo Experiment Complete
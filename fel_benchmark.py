@@ -0,0 +1,126 @@
+import argparse
+import gc
+import random
+import sys
+import types
+from timeit import default_timer
+from engine import SimulationEngine
+from future_event_list import FEL_STRATEGIES
+
+# Creating optional flag arguments for the benchmark
+def check_arg(args=None):
+    parser = argparse.ArgumentParser(description='Crossover benchmark of the future event list strategies')
+    parser.add_argument('-s', '--sizes',
+                        help='Comma separated numbers of pending events to benchmark, default is 10,100,1000,10000,100000',
+                        default='10,100,1000,10000,100000')
+    parser.add_argument('-o', '--holds',
+                        help='Number of hold operations (remove first event, schedule a new one) timed per size, default is 20000',
+                        default='20000')
+    parser.add_argument('-m', '--maxlinked',
+                        help='Largest size the linked list is benchmarked at, since each insert walks the list, default is 10000',
+                        default='10000')
+    parser.add_argument('-r', '--records',
+                        help='If 1, report bytes per pending event and engine events/sec with and without event recycling instead, default is 0',
+                        default='0')
+    results = parser.parse_args(args)
+    return ([int(size) for size in results.sizes.split(',')],
+            int(results.holds),
+            int(results.maxlinked),
+            int(results.records))
+
+# Classic "hold" model: fill the future event list with size events, then repeatedly
+# remove the first event and schedule a new one an exponential time later, so the
+# number of pending events stays at size. Returns microseconds per hold operation
+def time_hold(strategy, size, holds, seed=1):
+    rng = random.Random(seed)
+    future_event_list = FEL_STRATEGIES[strategy]()
+    for i in xrange(size):
+        future_event_list.add_event(rng.expovariate(1.0) * size, None, None)
+    increments = [rng.expovariate(1.0) * size for i in xrange(holds)]
+    start_time = default_timer()
+    for increment in increments:
+        event = future_event_list.remove_first_event()
+        future_event_list.add_event(event.timestamp + increment, None, None)
+    end_time = default_timer()
+    return (end_time - start_time) * 1e6 / holds
+
+# Total size in bytes of the objects reachable from root, not counting functions,
+# classes and modules, which are shared rather than owned
+def deep_size(root):
+    shared_types = (types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                    types.ModuleType, types.ClassType, type)
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, shared_types):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+# Bytes of future event list storage per pending event when size events are scheduled
+def bytes_per_pending_event(strategy, size, seed=1):
+    rng = random.Random(seed)
+    future_event_list = FEL_STRATEGIES[strategy]()
+    empty_size = deep_size(future_event_list)
+    for i in xrange(size):
+        future_event_list.add_event(rng.expovariate(1.0) * size, 1, None)
+    return float(deep_size(future_event_list) - empty_size) / size
+
+# Hold model run through SimulationEngine, including cancellation bookkeeping and, if
+# recycle_events is True, the event pool. Returns events executed per second, the best
+# of repeats runs since a single run is easily disturbed by other load on the machine
+def engine_events_per_second(size, holds, recycle_events, seed=1, repeats=3):
+    best_rate = 0.0
+    for repeat in xrange(repeats):
+        rng = random.Random(seed)
+        simulation_engine = SimulationEngine('heap', recycle_events=recycle_events)
+        for i in xrange(size):
+            simulation_engine.schedule_new_event(rng.expovariate(1.0) * size, 1, None)
+        increments = [rng.expovariate(1.0) * size for i in xrange(holds)]
+        start_time = default_timer()
+        for increment in increments:
+            event = simulation_engine.remove_event()
+            simulation_engine.schedule_new_event(event.timestamp + increment, 1, None)
+        end_time = default_timer()
+        best_rate = max(best_rate, holds / (end_time - start_time))
+    return best_rate
+
+def run_records_benchmark(sizes, holds):
+    print 'Heap future event list: bytes per pending event, and engine events/sec with and without recycling'
+    print '%10s%16s%16s%16s' % ('events', 'bytes/event', 'events/sec', 'recycled/sec')
+    for size in sizes:
+        print '%10d%16.1f%16.0f%16.0f' % (size, bytes_per_pending_event('heap', size),
+                                          engine_events_per_second(size, holds, False),
+                                          engine_events_per_second(size, holds, True))
+        sys.stdout.flush()
+
+def run_benchmark(sizes, holds, max_linked):
+    strategies = ['linked', 'heap', 'calendar']
+    print 'Microseconds per hold operation (remove first event + schedule new event)'
+    print '%10s' % 'events' + ''.join(['%12s' % strategy for strategy in strategies]) + '%12s' % 'fastest'
+    for size in sizes:
+        timings = {}
+        for strategy in strategies:
+            if strategy == 'linked' and size > max_linked:
+                continue
+            timings[strategy] = time_hold(strategy, size, holds)
+        row = '%10d' % size
+        for strategy in strategies:
+            if strategy in timings:
+                row += '%12.2f' % timings[strategy]
+            else:
+                row += '%12s' % '-'
+        row += '%12s' % min(timings, key=timings.get)
+        print row
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    sizes, holds, max_linked, records = check_arg(sys.argv[1:])
+    if records:
+        run_records_benchmark(sizes, holds)
+    else:
+        run_benchmark(sizes, holds, max_linked)
@@ -1,11 +1,20 @@
-# Implementation of event object for future event list (modified linked list)
-class Event:
+import bisect
+import heapq
+
+# Implementation of event object for future event list (modified linked list).
+# One of these is allocated for every scheduled event, so it uses __slots__ rather
+# than a per-instance __dict__
+class Event(object):
+    __slots__ = ('timestamp', 'event_data', 'payload', 'next_event', 'pending', 'sequence')
+
     # Constructor method
-    def __init__(self, timestamp, event_data, callback, next_event):
+    def __init__(self, timestamp, event_data, payload, next_event):
         self.timestamp = timestamp  # timestamp of when event scheduled
-        self.event_data = event_data    # the kind of event scheduled
-        self.callback = callback    # the function to invoke when event is executed, i.e., arrival()
+        self.event_data = event_data    # the kind of event scheduled, an EventType value
+        self.payload = payload      # passed to the handler registered for event_data, often None
         self.next_event = next_event    # a reference to the next event in the future event list
+        self.pending = True     # None once cancelled but still in the list, False once removed
+        self.sequence = 0       # Order in which the event was scheduled, set by the future event list
 
     # Get timestamp for an event in a future event list
     def get_timestamp(self):
@@ -15,9 +24,9 @@ class Event:
     def get_event_data(self):
         return self.event_data
 
-    # Get callback function for the event
-    def get_callback(self):
-        return self.callback
+    # Get payload for the event
+    def get_payload(self):
+        return self.payload
 
     # Gets the refernce to an event's next event
     def get_next_event(self):
@@ -27,18 +36,46 @@ class Event:
     def set_next_event(self, next_event):
         self.next_event = next_event
 
+# Free list of Event objects. Events are handed back once they have been executed or
+# cancelled and reused for later events, so a long simulation run allocates only as many
+# Event objects as are ever pending at once
+class EventPool:
+    def __init__(self):
+        self.free_events = []
+
+    # Same arguments as the Event constructor, reusing a free Event when there is one
+    def acquire(self, timestamp, event_data, payload, next_event):
+        if not self.free_events:
+            return Event(timestamp, event_data, payload, next_event)
+        event = self.free_events.pop()
+        event.timestamp = timestamp
+        event.event_data = event_data
+        event.payload = payload
+        event.next_event = next_event
+        event.pending = True
+        return event
+
+    # Returns an event that is no longer in any future event list to the pool
+    def release(self, event):
+        event.payload = None
+        event.next_event = None
+        self.free_events.append(event)
+
 # Implementation of future event list
 class FutureEventList:
-    def __init__(self):
+    # If an EventPool is given, new events are taken from it
+    def __init__(self, event_pool=None):
         # This is a reference to the first event in the future event list
         self.head = None
+        self.sequence = 0
+        self.new_event = event_pool.acquire if event_pool is not None else Event
     
     # Method to check to see if FutureEventList is empty
     def is_empty(self):
         return self.head is None
 
-    # Method to add a new event to the future event list
-    def add_event(self, timestamp, event_data, callback):
+    # Method to add a new event to the future event list, returns the new event
+    def add_event(self, timestamp, event_data, payload):
         current_event = self.head
         previous_event = None
         stop = False
@@ -52,7 +89,9 @@ class FutureEventList:
                 previous_event = current_event
                 current_event = current_event.get_next_event()
         # Once spot to insert event is found
-        temp_event = Event(timestamp, event_data, callback, None)
+        self.sequence += 1
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = self.sequence
         # Adding event if future event list is empty, or event goes at front
         # of future event list
         if previous_event is None:
@@ -62,6 +101,7 @@ class FutureEventList:
         else:
             temp_event.set_next_event(current_event)
             previous_event.set_next_event(temp_event)
+        return temp_event
     
     # Removes and returns first event in future event list
     def remove_first_event(self):
@@ -72,6 +112,36 @@ class FutureEventList:
             new_head = self.head.get_next_event()
             self.head = new_head
             return removed_event
+
+    # Puts back the event just removed by remove_first_event, ahead of all other events
+    def reinsert_first_event(self, event):
+        event.set_next_event(self.head)
+        self.head = event
+
+    # Returns the events in the future event list, cancelled ones included, in the order they
+    # will be removed
+    def scheduled_events(self):
+        events = []
+        current_event = self.head
+        while current_event is not None:
+            events.append(current_event)
+            current_event = current_event.get_next_event()
+        return events
+
+    # Adds an event with the sequence number it had when it was first scheduled. Used to
+    # rebuild a future event list, so events must be restored in the order they will be removed
+    def restore_event(self, timestamp, event_data, payload, sequence):
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = sequence
+        self.sequence = max(self.sequence, sequence)
+        if self.head is None:
+            self.head = temp_event
+        else:
+            current_event = self.head
+            while current_event.get_next_event() is not None:
+                current_event = current_event.get_next_event()
+            current_event.set_next_event(temp_event)
+        return temp_event
     
     # Gets a count of the size of the list
     def get_fel_size(self):
@@ -94,6 +164,212 @@ class FutureEventList:
             current_event = current_event.get_next_event()
         print ''
 
+# Implementation of future event list backed by a binary heap, so adding and
+# removing events is O(log n) rather than a walk along the linked list
+class HeapFutureEventList:
+    # If an EventPool is given, new events are taken from it
+    def __init__(self, event_pool=None):
+        # Heap entries are (timestamp, -sequence, event). The linked list places a
+        # new event ahead of any events already scheduled for the same timestamp,
+        # so the negated insertion sequence breaks ties the same way and the
+        # simulation executes events in exactly the same order
+        self.heap = []
+        self.sequence = 0
+        self.new_event = event_pool.acquire if event_pool is not None else Event
+
+    # Method to check to see if FutureEventList is empty
+    def is_empty(self):
+        return not self.heap
+
+    # Method to add a new event to the future event list, returns the new event
+    def add_event(self, timestamp, event_data, payload):
+        self.sequence += 1
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = self.sequence
+        heapq.heappush(self.heap, (timestamp, -self.sequence, temp_event))
+        return temp_event
+
+    # Removes and returns first event in future event list
+    def remove_first_event(self):
+        if not self.heap:
+            return None
+        else:
+            return heapq.heappop(self.heap)[2]
+
+    # Puts back the event just removed by remove_first_event, with its original sequence
+    # so it keeps its place among events with the same timestamp
+    def reinsert_first_event(self, event):
+        heapq.heappush(self.heap, (event.timestamp, -event.sequence, event))
+
+    # Returns the events in the future event list, cancelled ones included, in the order they
+    # will be removed
+    def scheduled_events(self):
+        return [entry[2] for entry in sorted(self.heap)]
+
+    # Adds an event with the sequence number it had when it was first scheduled
+    def restore_event(self, timestamp, event_data, payload, sequence):
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = sequence
+        self.sequence = max(self.sequence, sequence)
+        heapq.heappush(self.heap, (timestamp, -sequence, temp_event))
+        return temp_event
+
+    # Gets a count of the size of the list
+    def get_fel_size(self):
+        return len(self.heap)
+
+    # Prints to console the future event list, in the order events will be removed
+    def print_fel_list(self):
+        print "Future Event List: | ",
+        for entry in sorted(self.heap):
+            print entry[2].get_timestamp(),
+            print " | ",
+        print ''
+
+# Implementation of future event list as a calendar queue (Brown, 1988). Events are
+# hashed by timestamp into an array of "day" buckets, each one holding a short sorted
+# list, and removal walks forward through the days of the current "year". The number
+# of buckets and the width of a day are recomputed as the event population grows and
+# shrinks, which keeps adding and removing events amortized O(1)
+class CalendarQueue:
+    # Number of buckets is kept between these bounds and resized by doubling/halving
+    MIN_BUCKETS = 2
+    # Number of earliest events sampled to estimate the bucket width on a resize
+    WIDTH_SAMPLE_SIZE = 25
+
+    # If an EventPool is given, new events are taken from it
+    def __init__(self, event_pool=None, bucket_width=1.0):
+        self.bucket_width = float(bucket_width)
+        self.buckets = [[] for i in xrange(CalendarQueue.MIN_BUCKETS)]
+        self.bucket_mask = CalendarQueue.MIN_BUCKETS - 1
+        # Index of the day (timestamp // bucket_width) currently being dequeued
+        self.current_day = 0
+        # Timestamp of the last event removed, no pending event is earlier than this
+        self.last_timestamp = 0.0
+        self.size = 0
+        # Entries are (timestamp, -sequence, event), ties broken as in HeapFutureEventList
+        self.sequence = 0
+        self.new_event = event_pool.acquire if event_pool is not None else Event
+
+    # Method to check to see if FutureEventList is empty
+    def is_empty(self):
+        return self.size == 0
+
+    # Method to add a new event to the future event list, returns the new event
+    def add_event(self, timestamp, event_data, payload):
+        self.sequence += 1
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = self.sequence
+        self.insert_entry((timestamp, -self.sequence, temp_event))
+        self.size += 1
+        if self.size > 2 * len(self.buckets):
+            self.resize(2 * len(self.buckets))
+        return temp_event
+
+    # Places an entry in its day bucket, keeping the bucket sorted. An entry earlier than the
+    # last one removed, e.g. the event put back by a paused run or one scheduled just after
+    # the pause, moves the calendar position back to it, or it would be missed for a year
+    def insert_entry(self, entry):
+        day = int(entry[0] / self.bucket_width)
+        if entry[0] < self.last_timestamp:
+            self.last_timestamp = entry[0]
+            self.current_day = day
+        bucket = self.buckets[day & self.bucket_mask]
+        # Buckets hold a couple of events on average, and events tend to be
+        # scheduled after those already pending, so check the end first
+        if not bucket or bucket[-1] < entry:
+            bucket.append(entry)
+        else:
+            bisect.insort(bucket, entry)
+
+    # Removes and returns first event in future event list
+    def remove_first_event(self):
+        if self.size == 0:
+            return None
+        buckets = self.buckets
+        mask = self.bucket_mask
+        width = self.bucket_width
+        day = self.current_day
+        # Walk forward through one year of days looking for an event due today
+        for i in xrange(len(buckets)):
+            bucket = buckets[day & mask]
+            if bucket and int(bucket[0][0] / width) <= day:
+                return self.pop_entry(bucket, day)
+            day += 1
+        # Nothing due within a year, so jump straight to the earliest event
+        bucket = min([bucket for bucket in buckets if bucket])
+        return self.pop_entry(bucket, int(bucket[0][0] / width))
+
+    # Removes the first entry of a bucket and updates the calendar position
+    def pop_entry(self, bucket, day):
+        entry = bucket.pop(0)
+        self.current_day = day
+        self.last_timestamp = entry[0]
+        self.size -= 1
+        if self.size < len(self.buckets) / 2 and len(self.buckets) > CalendarQueue.MIN_BUCKETS:
+            self.resize(len(self.buckets) / 2)
+        return entry[2]
+
+    # Puts back the event just removed by remove_first_event, with its original sequence
+    # so it keeps its place among events with the same timestamp
+    def reinsert_first_event(self, event):
+        self.insert_entry((event.timestamp, -event.sequence, event))
+        self.size += 1
+
+    # Returns the events in the future event list, cancelled ones included, in the order they
+    # will be removed
+    def scheduled_events(self):
+        return [entry[2] for entry in sorted([entry for bucket in self.buckets for entry in bucket])]
+
+    # Adds an event with the sequence number it had when it was first scheduled
+    def restore_event(self, timestamp, event_data, payload, sequence):
+        temp_event = self.new_event(timestamp, event_data, payload, None)
+        temp_event.sequence = sequence
+        self.sequence = max(self.sequence, sequence)
+        self.insert_entry((timestamp, -sequence, temp_event))
+        self.size += 1
+        if self.size > 2 * len(self.buckets):
+            self.resize(2 * len(self.buckets))
+        return temp_event
+
+    # Rebuilds the calendar with a new number of buckets and a bucket width
+    # estimated from the spacing of the earliest pending events
+    def resize(self, new_bucket_count):
+        entries = sorted([entry for bucket in self.buckets for entry in bucket])
+        sample = entries[:CalendarQueue.WIDTH_SAMPLE_SIZE]
+        if len(sample) > 1:
+            separations = [sample[i + 1][0] - sample[i][0] for i in xrange(len(sample) - 1)]
+            average = sum(separations) / len(separations)
+            # Ignore large gaps so a few outliers do not inflate the width
+            close = [gap for gap in separations if gap <= 2.0 * average]
+            if close and sum(close) > 0:
+                self.bucket_width = 3.0 * sum(close) / len(close)
+        self.buckets = [[] for i in xrange(new_bucket_count)]
+        self.bucket_mask = new_bucket_count - 1
+        self.current_day = int(self.last_timestamp / self.bucket_width)
+        # Entries are already in order, so each bucket is filled sorted
+        for entry in entries:
+            self.buckets[int(entry[0] / self.bucket_width) & self.bucket_mask].append(entry)
+
+    # Gets a count of the size of the list
+    def get_fel_size(self):
+        return self.size
+
+    # Prints to console the future event list, in the order events will be removed
+    def print_fel_list(self):
+        print "Future Event List: | ",
+        for entry in sorted([entry for bucket in self.buckets for entry in bucket]):
+            print entry[2].get_timestamp(),
+            print " | ",
+        print ''
+
+# Future event list implementations SimulationEngine can be constructed with
+FEL_STRATEGIES = {
+    'linked': FutureEventList,
+    'heap': HeapFutureEventList,
+    'calendar': CalendarQueue,
+}
+
 def simulate_future_event_list():
     print 'in future_event_list.py'
     # Initialize future event list
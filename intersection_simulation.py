@@ -1,18 +1,25 @@
 import argparse
-from numpy import random
-from math import log
+from array import array
+from alias_table import AliasTable
 from engine import SimulationEngine
 from event_type import EventType
-from queue import Queue
-from random import randint
+from functools import partial
+from queue import FixedCapacityQueue, TypedQueue
+from random_stream import RandomStream
+from result_sink import ResultSink, add_format_argument
+from running_statistics import RunningStatistics
+from tracer import Tracer
+import cPickle
 import sys
 import time
+import zlib
 
 # Creating optional flag arguments for simulation
 def check_arg(args=None):
     parser = argparse.ArgumentParser(description='Script to learn basic argparse')
     parser.add_argument('-d', '--debugmode',
-                        help='Whether or not to print trace of simulation execution, if 1 trace is done, if 0, is not done',
+                        help='Whether or not to trace the simulation execution and print the last events traced, '
+                             'if 1 trace is done, if 0, is not done',
                         default='0')
     parser.add_argument('-a', '--atlantic',
                         help='The mean arrival time of cars on Atlantic Dr, by default is set to 6',
@@ -32,6 +39,39 @@ def check_arg(args=None):
     parser.add_argument('-t', '--simtime',
                         help='Length of time the simulation runs, default is 500',
                         default='500')
+    parser.add_argument('-W', '--laneweights',
+                        help='Comma separated weights of the chance the next car arrives in each lane, in the order '
+                             'n14e, s14e, en14w, es14w, n_atlantic_s, s_atlantic_n, default is 49,50,50,50,13,13',
+                        default='49,50,50,50,13,13')
+    parser.add_argument('-e', '--fel',
+                        help='Future event list used by the simulation engine: heap, calendar or linked, default is heap',
+                        default='heap')
+    parser.add_argument('-n', '--drain',
+                        help='Whether cars still in the intersection when the simulation time runs out are '
+                             'followed until they leave, by default is true',
+                        default='True')
+    parser.add_argument('-m', '--maxevents',
+                        help='Stop the simulation after this many events, 0 for no limit, default is 0',
+                        default='0')
+    parser.add_argument('-w', '--wallclock',
+                        help='Stop the simulation after this many seconds of real time, 0 for no limit, default is 0',
+                        default='0')
+    parser.add_argument('-s', '--seed',
+                        help='Seed for the random number generators, by default they are seeded from the system',
+                        default='')
+    parser.add_argument('-S', '--savesnapshot',
+                        help='Run the simulation for the simulation duration as a warm-up, save its complete state to '
+                             'this file and stop',
+                        default='')
+    parser.add_argument('-L', '--loadsnapshot',
+                        help='Start the simulation from the state saved in this file instead of an empty intersection, '
+                             'then run it for the simulation duration',
+                        default='')
+    parser.add_argument('-o', '--output',
+                        help='Results file the statistics of the run are appended to, default is '
+                             'ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv',
+                        default='ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv')
+    add_format_argument(parser)
     results = parser.parse_args(args)
     return (results.debugmode,
             results.atlantic,
@@ -39,10 +79,26 @@ def check_arg(args=None):
             results.greenlighttime,
             results.redlighttime,
             results.light,
-            results.simtime)
-
-# Global variables
-class GlobalVar: 
+            results.simtime,
+            results.laneweights,
+            results.fel,
+            results.drain,
+            results.maxevents,
+            results.wallclock,
+            results.seed,
+            results.savesnapshot,
+            results.loadsnapshot,
+            results.output,
+            results.format)
+
+# Names of the event types, for the trace printed in debug mode
+EVENT_NAMES = dict((value, name) for name, value in vars(EventType).items() if not name.startswith('__'))
+
+# One run of the 14St, Atlantic Dr intersection simulation. The class attributes are the
+# default parameters, any of which can be overridden by passing it to the constructor as a
+# keyword argument. Each simulation owns its engine, random number stream, lane queues and
+# statistics, so one interpreter can run many of them, one after another using reset()
+class Simulation:
     # Constants used in simulation, not in python, these are functionlly
     # NOT constants, so be sure not to change these values
     # GoAcross = Time for car to go straight across any intersection
@@ -69,2593 +125,768 @@ class GlobalVar:
     LowVolume14 = 10
     LowVolumeAtlantic = 15
 
-    # Flag set to 1 to print debugging statements (event trace), 0 otherwise
+    # Relative chance the next car arrives in each lane, in the order n14e, s14e, en14w,
+    # es14w, n_atlantic_s, s_atlantic_n
+    LaneWeights = (49, 50, 50, 50, 13, 13)
+
+    # Flag set to 1 to trace the events executed, 0 otherwise. The trace holds the last
+    # TraceCapacity events and is printed at the end of the run or when an error occurs
     DB = 0
+    TraceCapacity = 1000
+
+    # Future event list implementation used by the simulation engine
+    FelStrategy = 'heap'
+
+    # Limits on the simulation run. If Drain is False the run stops at SimulationDuration
+    # instead of following the cars still in the intersection until they leave. MaxEvents
+    # and WallclockBudget (seconds) bound the cost of a run, 0 means no limit
+    Drain = True
+    MaxEvents = 0
+    WallclockBudget = 0
+
+    # Seed for the random number generators, None to seed them from the system
+    Seed = None
+
+    # Number of vehicles the per-vehicle arrays grow by when full
+    VEHICLE_BLOCK = 4096
+
+    # Number of cars each lane queue has storage allocated for up front, a lane then cannot
+    # hold more. 0 for lane queues that grow as needed. Either way a queued car takes one
+    # integer of an array
+    QueueCapacity = 0
+
+    # Files to save the simulation state to after a warm-up run, or to start the
+    # simulation from, empty if not used
+    SaveSnapshot = ''
+    LoadSnapshot = ''
 
     # Used to determine length of simulation run, this is a time amount rather than 
     # number arrivals amount
     SimulationDuration = 500
 
-    # Initialize simulation clock variable
-    Now = 0.0
-
-    # Number of events executed over course of simulation
-    NumEvents = 0
-
-    # State variables used for statistics
-    TotalWaitingTime = 0.0  # Total time waiting to land
-    LastEventTime = 0.0     # Time of last event processed; used to compute TotalWaitingTime
-
-    # State variables of the simulation
-    _14LightGreen = True                        # True if light is green for 14 street, false if red for 14 street
-    _AtlanticLightGreen = not _14LightGreen     # Opposite boolean value of _14Stlight
-    N_Atlantic_14_Free = True       # True if northern part of intersection is open to traverse
-    S_Atlantic_14_Free = True       # True if southern part of intersection is open to traverse
-    W_Atlantic_14_Free = True       # True is west part of intersection is open to traverse
-    E_Atlantic_14_Free = True       # True if east part of intersection is open to traverse
-
-    # N_14_E Attributes, Cars heading east in northern lane of 14st west of Atlantic Dr
-    n14e_total_waiting_time = 0.0   # Total waiting time for n14e cars
-    n14e_last_event_time = 0.0      # Time of last event processed for n14e event 
-    n14e_queue = Queue()            # Queue to model cars lining up at stop light
-    n14e_arrival_count = 0          # Number of cars that have entered this segment of road
-    n14e_mean_arrival = HighVolume14         # Rate of arrival, lambda using exponential
-
-    # S_14_E Attributes, Cars heading east in southern lane of 14st west of Atlantic Dr
-    s14e_total_waiting_time = 0.0   # Total waiting time for s14e cars
-    s14e_last_event_time = 0.0      # Time of last event processed for s14e event 
-    s14e_queue = Queue()            # Queue to model cars lining up at stop light
-    s14e_arrival_count = 0          # Number of cars that have entered this segment of road
-    s14e_mean_arrival = HighVolume14         # Rate of arrival, lambda using exponential
-
-    # EN_14_W Attributes, Cars heading west in northern lane of 14st east of Atlantic Dr
-    en14w_total_waiting_time = 0.0  # Total waiting time for en14w cars
-    en14w_last_event_time = 0.0     # Time of last event processed for en14w event 
-    en14w_queue = Queue()           # Queue to model cars lining up at stop light
-    en14w_arrival_count = 0         # Number of cars that have entered this segment of road
-    en14w_mean_arrival = HighVolume14        # Rate of arrival, lambda using exponential
-
-    # ES_14_W Attributes, Cars heading west in southern lane of 14st west of Atlantic Dr
-    es14w_total_waiting_time = 0.0  # Total waiting time for es14w cars
-    es14w_last_event_time = 0.0     # Time of last event processed for es14w event 
-    es14w_queue = Queue()           # Queue to model cars lining up at stop light
-    es14w_arrival_count = 0         # Number of cars that have entered this segment of road
-    es14w_mean_arrival = HighVolume14        # Rate of arrival, lambda using exponential
-
-    # N_Atlantic_S Attributes, Cars heading south on Atlantic Dr north of 14th St
-    n_atlantic_s_total_waiting_time = 0.0   # Total waiting time for n_atlantic_s cars
-    n_atlantic_s_last_event_time = 0.0      # Time of last event processed for n_atlantic_s event 
-    n_atlantic_s_queue = Queue()            # Queue to model cars lining up at stop light
-    n_atlantic_s_arrival_count = 0          # Number of cars that have entered this segment of road
-    n_atlantic_s_mean_arrival = HighVolumeAtlantic         # Rate of arrival, lambda using exponential
-
-    # S_Atlantic_N Attributes, Cars heading north on Atlantic Dr south of 14th St
-    s_atlantic_n_total_waiting_time = 0.0   # Total waiting time for s_atlantic_n cars
-    s_atlantic_n_last_event_time = 0.0      # Time of last event processed for s_atlantic_n event
-    s_atlantic_n_queue = Queue()            # Queue to model cars lining up at stop light
-    s_atlantic_n_arrival_count = 0          # Number of cars that have entered this segment of road
-    s_atlantic_n_mean_arrival = HighVolumeAtlantic       # Rate of arrival, lambda using exponential
-
-# Assigning global vales the values passed in with flags, or default values if no values passed in
-if __name__ == '__main__':
-    print 'Welcome to the 14St, Atlantic Dr Intersection Simulation'
-    print '\nHere are the simulation parameters:'
-    debugmode, atlantic, fourteenth, greenlighttime, redlighttime, light, simtime = check_arg(sys.argv[1:])
-    GlobalVar.DB = int(debugmode)
-    if light == "True" or light == "T" or light == "true" or light == "t":
-        GlobalVar.TrafficLight = True
-        print '  Traffic light used:', GlobalVar.TrafficLight
-        print '  Green light time:', int(greenlighttime)
-        print '  Red light time:', int(redlighttime)
-    else:
-        print '  Traffic light used:', GlobalVar.TrafficLight
-    GlobalVar.SimulationDuration = int(simtime)
-    GlobalVar.GreenLightDuration = int(greenlighttime)
-    GlobalVar.RedLightDuration = int(redlighttime)
-    print '  Debug mode:', int(debugmode)
-    print '  Simulation duration:', simtime
-    # Update all the mean arrival times for atlantic drive
-    atlantic_arrival_rate = float(atlantic)
-    GlobalVar.n_atlantic_s_mean_arrival = atlantic_arrival_rate       # Rate of arrival, lambda using exponential
-    GlobalVar.s_atlantic_n_mean_arrival = atlantic_arrival_rate       # Rate of arrival, lambda using exponential
-    print '  N Atlantic S Mean Arrival:', GlobalVar.n_atlantic_s_mean_arrival
-    print '  S Atlantic N Mean Arrival:', GlobalVar.s_atlantic_n_mean_arrival
-
-    # Update all the mean arrival times for fourteenth street
-    fourteenth_arrival_rate = float(fourteenth)
-    GlobalVar.n14e_mean_arrival = fourteenth_arrival_rate         # Rate of arrival, lambda using exponential
-    GlobalVar.s14e_mean_arrival = fourteenth_arrival_rate         # Rate of arrival, lambda using exponential
-    GlobalVar.en14w_mean_arrival = fourteenth_arrival_rate        # Rate of arrival, lambda using exponential
-    GlobalVar.es14w_mean_arrival = fourteenth_arrival_rate        # Rate of arrival, lambda using exponential
-    print '  N 14 E Mean Arrival:', GlobalVar.n14e_mean_arrival
-    print '  S 14 E Mean Arrival:', GlobalVar.s14e_mean_arrival
-    print '  EN 14 W Mean Arrival:', GlobalVar.en14w_mean_arrival
-    print '  ES 14 W Mean Arrival:', GlobalVar.es14w_mean_arrival
-
-# Initialize simulation engine, which is a future event list, which is a linked list
-# Note this needs to be accessible from various functions, so am making this a global object
-# Interestingly, it does not seem necessary to use global keyword before it
-simulation_engine = SimulationEngine()
-
-###### Random Number Generator
-# Compute exponenitally distributed random number with mean provided. The expected value is
-# the mean provided, but because from probability distribution, there will be variance from expected value
-def rand_exp(mean):
-    uniform_random = random.uniform(0, 1)
-    return (-mean * log(1.0 - uniform_random))
-
-# Generates a uniformally distributed random number [0, 1)
-def random_uniform():
-    return random.uniform(0, 1)
-
-# Assumption is that most cars will go straight across the intersection
-def get_turn_direction():
-    random_variable = random_uniform()
-    if random_variable < 0.5:
-        return "straight"
-    elif random_variable >= 0.5 and random_variable < 0.75:
-        return "left"
-    else:
-        return "right"
-
-# Those roads with more traffic are weighted higher to increase chance of arrival
-# This determines the volume of traffic
-def determine_next_arrival():
-    random_int = randint(1, 225)
-    if random_int in range(1,50):
-        # print 'n14e arrival scheduled'
-        return {'mean': GlobalVar.n14e_mean_arrival, 'event_type': EventType.N14E_ARRIVAL, 'callback': n14e_arrival}
-    if random_int in range(50,100):
-        # print 's14e arrival scheduled'
-        return {'mean': GlobalVar.s14e_mean_arrival, 'event_type': EventType.S14E_ARRIVAL, 'callback': s14e_arrival}
-    if random_int in range(100,150):
-        # print 'en14w arrival scheduled'
-        return {'mean': GlobalVar.en14w_mean_arrival, 'event_type': EventType.EN14W_ARRIVAL, 'callback': en14w_arrival} 
-    if random_int in range(150,200):
-        # print 'es14w arrival scheduled'
-        return {'mean': GlobalVar.es14w_mean_arrival, 'event_type': EventType.ES14W_ARRIVAL, 'callback': es14w_arrival}
-    if random_int in range(200,213):
-        # print 'n_atlantic_s arrival scheduled'
-        return {'mean': GlobalVar.n_atlantic_s_mean_arrival, 'event_type': EventType.N_ATLANTIC_S_ARRIVAL, 'callback': n_atlantic_s_arrival}
-    if random_int in range(213,226):
-        # print 's_atlantic_n arrival scheduled'
-        return {'mean': GlobalVar.s_atlantic_n_mean_arrival, 'event_type': EventType.S_ATLANTIC_N_ARRIVAL, 'callback': s_atlantic_n_arrival} 
-
-# Same function as above but with traffic light
-def determine_next_arrival_traffic_light():
-    random_int = randint(1, 225)
-    if random_int in range(1,50):
-        # print 'n14e arrival scheduled'
-        return {'mean': GlobalVar.n14e_mean_arrival, 'event_type': EventType.N14E_ARRIVAL_TL, 'callback': n14e_arrival_traffic_light}
-    if random_int in range(50,100):
-        # print 's14e arrival scheduled'
-        return {'mean': GlobalVar.s14e_mean_arrival, 'event_type': EventType.S14E_ARRIVAL_TL, 'callback': s14e_arrival_traffic_light}
-    if random_int in range(100,150):
-        # print 'en14w arrival scheduled'
-        return {'mean': GlobalVar.en14w_mean_arrival, 'event_type': EventType.EN14W_ARRIVAL_TL, 'callback': en14w_arrival_traffic_light} 
-    if random_int in range(150,200):
-        # print 'es14w arrival scheduled'
-        return {'mean': GlobalVar.es14w_mean_arrival, 'event_type': EventType.ES14W_ARRIVAL_TL, 'callback': es14w_arrival_traffic_light}
-    if random_int in range(200,213):
-        # print 'n_atlantic_s arrival scheduled'
-        return {'mean': GlobalVar.n_atlantic_s_mean_arrival, 'event_type': EventType.N_ATLANTIC_S_ARRIVAL_TL, 'callback': n_atlantic_s_arrival_traffic_light}
-    if random_int in range(213,226):
-        # print 's_atlantic_n arrival scheduled'
-        return {'mean': GlobalVar.s_atlantic_n_mean_arrival, 'event_type': EventType.S_ATLANTIC_N_ARRIVAL_TL, 'callback': s_atlantic_n_arrival_traffic_light} 
-
-###### Simulation time keeper
-def current_time():
-    return GlobalVar.Now
-
-# While this light is green, cars can continue to arrive on any street and pass through if on 14 street
-def _14_light_turns_green(event_data):
-    # If something bad happens
-    if event_data != EventType._14_LIGHT_TURNS_GREEN:
-        print "In _14_light_turns_green, unexpected event type %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "Light turns green, time = %f" % current_time()
-
-    GlobalVar._14LightGreen = True
-    GlobalVar._AtlanticLightGreen = not GlobalVar._14LightGreen
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    # Need to schedule event to change traffic light to red
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        new_event_type = EventType._14_LIGHT_TURNS_RED
-        timestamp = current_time() + GlobalVar.GreenLightDuration
-        simulation_engine.schedule_new_event(timestamp, new_event_type, _14_light_turns_red)
-
-    # Need to check on traffic in both directions
-    if not GlobalVar.es14w_queue.isEmpty():
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_go_across_traffic_light)
-    
-    if not GlobalVar.en14w_queue.isEmpty():
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_go_across_traffic_light)
-
-    if not GlobalVar.n14e_queue.isEmpty():
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_go_across_traffic_light)
-    
-    if not GlobalVar.s14e_queue.isEmpty():
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_go_across_traffic_light)
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-# While this light is green, cars can continue to arrive on any street and pass through if on 14 street
-def _14_light_turns_red(event_data):
-    # If something bad happens
-    if event_data != EventType._14_LIGHT_TURNS_RED:
-        print "In _14_light_turns_red, unexpected event type %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "Light turns red, time = %f" % current_time()
-
-    GlobalVar._14LightGreen = False
-    GlobalVar._AtlanticLightGreen = not GlobalVar._14LightGreen
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    # Need to schedule event to change traffic light to green
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        new_event_type = EventType._14_LIGHT_TURNS_GREEN
-        timestamp = current_time() + GlobalVar.RedLightDuration
-        simulation_engine.schedule_new_event(timestamp, new_event_type, _14_light_turns_green)
-
-        # Need to check on traffic in both directions
-    if not GlobalVar.n_atlantic_s_queue.isEmpty():
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across_traffic_light)
-    
-    if not GlobalVar.s_atlantic_n_queue.isEmpty():
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across_traffic_light)
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-# Event handler for a car arriving at northern lane of 14th street from the west, west of atlantic
-def n14e_arrival(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_ARRIVAL:
-        print "Unexpected event type in n14e_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E_ARRIVAL Event, time: %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'n14e_car_%d' % (GlobalVar.n14e_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.n14e_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-            ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.n14e_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" or turn_direction is "right":
-        # Event for N_14_E Go Across
-        # Southern part of intersection no longer free for cars to turn across
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_go_across)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free:
-        # Event for N_14_E Turn Left
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left)
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for cars turning left from northern lane of 14st east across to Atlnatic Dr north
-def n14e_turn_left(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_TURN_LEFT:
-        print "Unexpected event type in n14e_turn_left, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E Turn Left event, time: %f" % current_time()
-    if GlobalVar.n14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-    
-    # Remove car from n14e queue
-    car_removed = GlobalVar.n14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N14E" % car_removed
-        print "%d cars now in n14e_queue" % GlobalVar.n14e_queue.size()
-        print "n14e_queue.isEmpty() is: ",
-        print GlobalVar.n14e_queue.isEmpty()
-    
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-        ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for cars going across atlantic dr intersection on n14e
-def n14e_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_GO_ACROSS:
-        print "Unexpected event type in n14e_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E Go Across event, time: %f" % current_time()
-    if GlobalVar.n14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n14e queue
-    car_removed = GlobalVar.n14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N14E" % car_removed
-        print "%d cars now in n14e_queue" % GlobalVar.n14e_queue.size()
-        print "n14e_queue.isEmpty() is: ",
-        print GlobalVar.n14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-        ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Southern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    # These sections are: es14w_turn_left, n_atlantic_s anything
-    if not GlobalVar.es14w_queue.isEmpty():
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left)
-    else:
-        # flip a coin to determine which side of atlantic dr to let go
-        coin = random_uniform()
-        # print 'coin flip is %f' % coin
-        if coin < 0.5:
-            # Check n_atlantic_s
-            if not GlobalVar.n_atlantic_s_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.N_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right)
-        else:
-            # Check s_atlantic_n
-            if not GlobalVar.s_atlantic_n_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right)
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for a car arriving at southern lane of 14th street from the west, west of atlantic
-def s14e_arrival(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_ARRIVAL:
-        print "Unexpected event type in s14e_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E_ARRIVAL Event: time=%f" % current_time()
-    
-    # Get identity of car
-    car_identity = 's14e_car_%d' % (GlobalVar.s14e_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.s14e_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-            ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.s14e_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" or turn_direction is "left":
-        # Event for s14e Go Across
-        # Southern part of intersection no longer free for cars to turn across
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_go_across)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "right":
-        # Event for S_14_E Turn Right
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_TURN_RIGHT
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_turn_right)
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for cars going across atlantic dr intersection on s14e
-def s14e_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_GO_ACROSS:
-        print "Unexpected event type in s14e_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E Go Across event, time: %f" % current_time()
-    if GlobalVar.s14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s14e queue
-    car_removed = GlobalVar.s14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across S14E" % car_removed
-        print "%d cars now in s14e_queue" % GlobalVar.s14e_queue.size()
-        print "s14e_queue.isEmpty() is: ",
-        print GlobalVar.s14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-        ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Southern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    # These sections are: es14w_turn_left
-    if not GlobalVar.es14w_queue.isEmpty():
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left)
-    else:
-        # flip a coin to determine which side of atlantic dr to let go
-        coin = random_uniform()
-        # print 'coin flip is %f' % coin
-        if coin < 0.5:
-            # Check n_atlantic_s
-            if not GlobalVar.n_atlantic_s_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.N_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right)
+    # Mean time between arrivals of cars in each lane, used as the mean of an exponential
+    n14e_mean_arrival = HighVolume14
+    s14e_mean_arrival = HighVolume14
+    en14w_mean_arrival = HighVolume14
+    es14w_mean_arrival = HighVolume14
+    n_atlantic_s_mean_arrival = HighVolumeAtlantic
+    s_atlantic_n_mean_arrival = HighVolumeAtlantic
+
+    # Parameters that can be passed to the constructor
+    PARAMETERS = ('GoAcross', 'TurnRight', 'TurnLeft', 'GreenLightDuration', 'RedLightDuration', 'TrafficLight',
+                  'LaneWeights', 'DB', 'TraceCapacity', 'FelStrategy', 'Drain', 'MaxEvents', 'WallclockBudget',
+                  'Seed', 'QueueCapacity', 'SaveSnapshot', 'LoadSnapshot', 'SimulationDuration',
+                  'n14e_mean_arrival', 's14e_mean_arrival', 'en14w_mean_arrival', 'es14w_mean_arrival',
+                  'n_atlantic_s_mean_arrival', 's_atlantic_n_mean_arrival')
+
+    def __init__(self, **parameters):
+        for name in self.PARAMETERS:
+            setattr(self, name, parameters.pop(name, getattr(Simulation, name)))
+        if parameters:
+            raise ValueError("Unknown simulation parameters: %s" % ', '.join(sorted(parameters)))
+        self.LaneTable = AliasTable(self.LaneWeights)
+        self.random_stream = RandomStream(self.Seed)
+        self.reset()
+
+    # Puts the simulation back to an empty intersection at time 0, with a new engine and the
+    # random number stream restarted from the seed. If seed is given it replaces the seed
+    # parameter first, so each replication can be run with its own seed
+    def reset(self, seed=None):
+        if seed is not None:
+            self.Seed = seed
+        # Initialize simulation engine, which is a future event list, a binary heap unless
+        # another strategy was chosen with the FelStrategy parameter
+        self.simulation_engine = SimulationEngine(self.FelStrategy)
+        self.tracer = Tracer(self.TraceCapacity) if self.DB else None
+        self.register_handlers()
+        self.random_stream.seed(self.Seed)
+
+        # Time after which no more arrivals or light changes are scheduled
+        self.EndTime = self.SimulationDuration
+
+        # Number of events executed over course of simulation
+        self.NumEvents = 0
+
+        # State variables of the simulation
+        self.light_green = [True, False]                # Whether the 14 St and the Atlantic Dr light are green
+        self.zones_occupied = 0                         # Bitmask of the parts of the intersection cars are in
+
+        # Lane attributes, one entry per lane in the order of LANES
+        self.queues = [self.new_queue() for lane in self.LANES]       # Queues to model cars lining up at stop light
+        self.pending_departures = [[] for lane in self.LANES]         # Departure events scheduled that have not executed
+        self.departing = [0] * len(self.LANES)                        # Number of them not cancelled either
+        self.arrival_count = [0] * len(self.LANES)                    # Number of cars that have entered the lane
+        self.delay = [RunningStatistics() for lane in self.LANES]     # Time the lane's cars waited to be let in
+
+        # Vehicles are numbered from 0 in order of arrival, and the lane queues hold these
+        # numbers. Per-vehicle data is kept in typed arrays indexed by vehicle number, which
+        # are allocated in blocks
+        self.vehicle_count = 0                                       # Number of vehicles that have arrived
+        self.arrival_time = array('d', [0.0]) * self.VEHICLE_BLOCK   # Time each vehicle arrived
+        self.let_in_time = array('d', [0.0]) * self.VEHICLE_BLOCK    # Time each vehicle was let in
+
+    def new_queue(self):
+        if self.QueueCapacity:
+            return FixedCapacityQueue(self.QueueCapacity, 'l')
+        return TypedQueue('l')
+
+    # Compute exponenitally distributed random number with mean provided. The expected value is
+    # the mean provided, but because from probability distribution, there will be variance from expected value
+    def rand_exp(self, mean):
+        return self.random_stream.exponential(mean)
+
+    # Generates a uniformally distributed random number [0, 1)
+    def random_uniform(self):
+        return self.random_stream.uniform()
+
+    # Assumption is that most cars will go straight across the intersection
+    def get_turn_direction(self):
+        random_variable = self.random_uniform()
+        if random_variable < 0.5:
+            return "straight"
+        elif random_variable >= 0.5 and random_variable < 0.75:
+            return "left"
         else:
-            # Check s_atlantic_n
-            if not GlobalVar.s_atlantic_n_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right)
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for cars turning right onto atlantic dr from s14e
-def s14e_turn_right(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_TURN_RIGHT:
-        print "Unexpected event type in s14e_turn_right, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E Turn Right event, time: %f" % current_time()
-    if GlobalVar.s14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s14e queue
-    car_removed = GlobalVar.s14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from S14E onto Atlantic Dr south" % car_removed
-        print "%d cars now in s14e_queue" % GlobalVar.s14e_queue.size()
-        print "s14e_queue.isEmpty() is: ",
-        print GlobalVar.s14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-        ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Update southern part of Atlantic_14 intersection to be free
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for a car arriving at northern lane of 14th street from the east, east of atlantic 
-def en14w_arrival(event_data):
- # If something bad happens
-    if event_data != EventType.EN14W_ARRIVAL:
-        print "Unexpected event type in es14w_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W_ARRIVAL Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'en14w_car_%d' % (GlobalVar.en14w_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.en14w_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        if GlobalVar.DB:
-            print "en14w queue size greater than 1, is: %d" % GlobalVar.en14w_queue.size()
-        GlobalVar.en14w_total_waiting_time += \
-            ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.en14w_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" or turn_direction is "left":
-        # Event for EN14W Go Across
-        # Northern part of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_go_across)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "right":
-        # Event for EN14W Turn Right
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_TURN_RIGHT
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_turn_right)
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for cars going across Atlantic Dr on EN14W
-def en14w_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.EN14W_GO_ACROSS:
-        print "Unexpected event type in es14w_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W Go Across event, time: %f" % current_time()
-    if GlobalVar.en14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from en14w queue
-    car_removed = GlobalVar.en14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across EN14W" % car_removed
-        print "%d cars now in en14w_queue" % GlobalVar.en14w_queue.size()
-        print "en14w_queue.isEmpty() is: ",
-        print GlobalVar.en14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        GlobalVar.en14w_total_waiting_time += \
-        ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    # These sections are: n14e_turn_left
-    if not GlobalVar.n14e_queue.isEmpty():
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left)
-    else:
-        # flip a coin to determine which side of atlantic dr to let go
-        coin = random_uniform()
-        # print 'coin flip is %f' % coin
-        if coin < 0.5:
-            # Check n_atlantic_s
-            if not GlobalVar.n_atlantic_s_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.N_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right)
+            return "right"
+
+    # Those roads with more traffic are weighted higher to increase chance of arrival
+    # This determines the volume of traffic. The lane is drawn from LaneTable, and these
+    # tables give, for each lane in the order of LaneWeights, the attribute
+    # holding its mean arrival time and its arrival event type without and with the light
+    LANE_MEAN_ARRIVALS = ('n14e_mean_arrival', 's14e_mean_arrival', 'en14w_mean_arrival', 'es14w_mean_arrival',
+                          'n_atlantic_s_mean_arrival', 's_atlantic_n_mean_arrival')
+    LANE_ARRIVALS = (EventType.N14E_ARRIVAL, EventType.S14E_ARRIVAL, EventType.EN14W_ARRIVAL,
+                     EventType.ES14W_ARRIVAL, EventType.N_ATLANTIC_S_ARRIVAL, EventType.S_ATLANTIC_N_ARRIVAL)
+    LANE_ARRIVALS_TL = (EventType.N14E_ARRIVAL_TL, EventType.S14E_ARRIVAL_TL, EventType.EN14W_ARRIVAL_TL,
+                        EventType.ES14W_ARRIVAL_TL, EventType.N_ATLANTIC_S_ARRIVAL_TL,
+                        EventType.S_ATLANTIC_N_ARRIVAL_TL)
+
+    def determine_next_arrival(self):
+        lane = self.random_stream.discrete(self.LaneTable)
+        return {'mean': getattr(self, self.LANE_MEAN_ARRIVALS[lane]), 'event_type': self.LANE_ARRIVALS[lane]}
+
+    # Same function as above but with traffic light
+    def determine_next_arrival_traffic_light(self):
+        lane = self.random_stream.discrete(self.LaneTable)
+        return {'mean': getattr(self, self.LANE_MEAN_ARRIVALS[lane]), 'event_type': self.LANE_ARRIVALS_TL[lane]}
+
+    ###### Departure bookkeeping
+    # A departure moves whichever car is at the front of its lane when it is executed. One
+    # that comes due while its lane is empty does nothing, so the departures of a lane are
+    # cancelled when its queue empties, and brought back if a car arrives before they are due,
+    # which they then move as they would have without the cancelling.
+    # With n departures of a lane under way, the first n cars of the lane will be moved by
+    # them, so they have been let in. Each departure scheduled lets in the first car not yet
+    # let in, if there is one, and a car that arrives to find fewer cars ahead of it than
+    # departures under way is let in as it arrives
+
+    # Schedules a car leaving the queue of lane, remembering the event so that it can be
+    # cancelled if the lane empties before the event is executed
+    def schedule_departure(self, lane, timestamp, event_type):
+        pending_departures = self.pending_departures[lane]
+        # Forget departures that have been executed or discarded
+        pending_departures[:] = [handle for handle in pending_departures
+                                 if self.simulation_engine.is_scheduled(handle)]
+        pending_departures.append(self.simulation_engine.schedule_new_event(timestamp, event_type))
+        departing = self.departing[lane]
+        queue = self.queues[lane]
+        if departing < queue.size():
+            self.let_in_time[queue.peek(departing)] = self.simulation_engine.now
+        self.departing[lane] = departing + 1
+
+    # Cancels the departures still pending for lane, whose queue is now empty
+    def cancel_pending_departures(self, lane):
+        for handle in self.pending_departures[lane]:
+            self.simulation_engine.cancel(handle)
+        self.departing[lane] = 0
+
+    # Brings back the cancelled departures of lane, which a car is arriving to, those not yet
+    # due, and forgets the others
+    def resume_pending_departures(self, lane):
+        pending_departures = self.pending_departures[lane]
+        pending_departures[:] = [handle for handle in pending_departures if self.simulation_engine.uncancel(handle)]
+        self.departing[lane] = len(pending_departures)
+
+    ###### Snapshots
+    # Attributes rebuilt from the parameters rather than saved. The parameters themselves are
+    # not saved either, a snapshot holds state only and is run with the parameters of the
+    # simulation it is loaded into
+    REBUILT = ('LaneTable', 'simulation_engine', 'random_stream', 'tracer')
+
+    # Returns the state of the simulation (lane queues, intersection and light state,
+    # statistics, pending events and random number generator state) as a compressed string
+    def take_snapshot(self):
+        global_var = {}
+        for name, value in vars(self).items():
+            if name in self.PARAMETERS or name in self.REBUILT:
+                continue
+            # Only the per-vehicle data of vehicles that have arrived is kept
+            if name in ('arrival_time', 'let_in_time'):
+                value = value[:self.vehicle_count]
+            # Lane queues are kept as the vehicle numbers in them, and rebuilt on restore with
+            # the queue capacity of the simulation restored into
+            if name == 'queues':
+                value = [[queue.peek(index) for index in xrange(queue.size())] for queue in value]
+            # Pending departures are kept as sequence numbers, which identify their events
+            if name == 'pending_departures':
+                value = [[handle[1] for handle in lane if self.simulation_engine.is_scheduled(handle)]
+                         for lane in value]
+            global_var[name] = value
+        snapshot = {'global_var': global_var,
+                    'TrafficLight': self.TrafficLight,
+                    'engine': self.simulation_engine.get_state(),
+                    'random_stream': self.random_stream.get_state()}
+        return zlib.compress(cPickle.dumps(snapshot, cPickle.HIGHEST_PROTOCOL))
+
+    # Puts the simulation back in the state returned by take_snapshot(). If reseed is True the
+    # random number generators are seeded with seed (from the system if seed is None) instead
+    # of being restored, so several replications forked from one snapshot follow different paths.
+    # The pending arrivals are of the kind with or without the light, so a snapshot can only be
+    # restored into a simulation that uses the light if it was taken from one
+    def restore_snapshot(self, snapshot, reseed=False, seed=None):
+        snapshot = cPickle.loads(zlib.decompress(snapshot))
+        if snapshot['TrafficLight'] != self.TrafficLight:
+            raise ValueError("Snapshot was taken %s the traffic light, it cannot be restored into a simulation %s it"
+                             % (('with', 'without') if snapshot['TrafficLight'] else ('without', 'with')))
+        handles = self.simulation_engine.set_state(snapshot['engine'])
+        for name, value in snapshot['global_var'].items():
+            if name == 'queues':
+                queues = [self.new_queue() for lane in value]
+                for queue, vehicles in zip(queues, value):
+                    for vehicle in vehicles:
+                        queue.enqueue(vehicle)
+                value = queues
+            if name == 'pending_departures':
+                value = [[handles[sequence] for sequence in lane] for lane in value]
+            setattr(self, name, value)
+        if reseed:
+            self.random_stream.seed(seed)
         else:
-            # Check s_atlantic_n
-            if not GlobalVar.s_atlantic_n_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right)
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for cars turning right onto atlantic dr from en14w
-def en14w_turn_right(event_data):
-    # If something bad happens
-    if event_data != EventType.EN14W_TURN_RIGHT:
-        print "Unexpected event type in es14w_turn_right, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W Turn Right event, time: %f" % current_time()
-    if GlobalVar.en14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from en14w queue
-    car_removed = GlobalVar.en14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from EN14W onto Atlantic Dr south" % car_removed
-        print "%d cars now in en14w_queue" % GlobalVar.en14w_queue.size()
-        print "en14w_queue.isEmpty() is: ",
-        print GlobalVar.en14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        GlobalVar.en14w_total_waiting_time += \
-        ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for a car arriving at southern lane of 14th street from the east, east of atlantic
-def es14w_arrival(event_data):
- # If something bad happens
-    if event_data != EventType.ES14W_ARRIVAL:
-        print "Unexpected event type in es14w_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W_ARRIVAL Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'es14w_car_%d' % (GlobalVar.es14w_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.es14w_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-            ( (GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.es14w_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" or turn_direction is "right":
-        # Event for ES14W Go Across
-        # Northern part of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_go_across)
-    # Can make a left turn if no car is traversing southern part of intersection
-    elif turn_direction is "left" and GlobalVar.S_Atlantic_14_Free:
-        # Event for ES14W Turn Left
-        # This is now blocking the southern part of atlantic intersection
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left)
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for cars going across Atlantic Dr on ES14W
-def es14w_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.ES14W_GO_ACROSS:
-        print "Unexpected event type in es14w_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W Go Across event, time: %f" % current_time()
-    if GlobalVar.es14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from es14w queue
-    car_removed = GlobalVar.es14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across ES14W" % car_removed
-        print "%d cars now in es14w_queue" % GlobalVar.es14w_queue.size()
-        print "es14w_queue.isEmpty() is: ",
-        print GlobalVar.es14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-        ( (GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    # These sections are: n14e_turn_left
-    if not GlobalVar.n14e_queue.isEmpty():
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left)
-    else:
-        # Need to put this into a separate method
-        # flip a coin to determine which side of atlantic dr to let go
-        coin = random_uniform()
-        # print 'coin flip is %f' % coin
-        if coin < 0.5:
-            # Check n_atlantic_s
-            if not GlobalVar.n_atlantic_s_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for N_ATLANTIC_S Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.N_Atlantic_14_Free = False
-                    new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right)
+            self.random_stream.set_state(snapshot['random_stream'])
+
+    def save_snapshot(self, path):
+        fh = open(path, 'wb')
+        fh.write(self.take_snapshot())
+        fh.close()
+
+    def load_snapshot(self, path, reseed=False, seed=None):
+        fh = open(path, 'rb')
+        snapshot = fh.read()
+        fh.close()
+        self.restore_snapshot(snapshot, reseed, seed)
+
+    # Clears the statistics gathered so far, e.g. to discard those of a warm-up period. Cars
+    # already waiting keep their place in the lane queues
+    def reset_statistics(self):
+        self.NumEvents = 0
+        self.arrival_count = [0] * len(self.LANES)
+        self.delay = [RunningStatistics() for lane in self.LANES]
+        self.simulation_engine.executed_count = 0
+        self.simulation_engine.cancelled_count = 0
+
+    ###### Simulation time keeper
+    def current_time(self):
+        return self.simulation_engine.now
+
+    ###### Intersection layout
+    # The intersection is described by the tables below instead of a handler per event type.
+    # Three generic handlers, car_arrives, car_moves and light_changes, interpret them, so
+    # another intersection can be modelled by a subclass with its own tables
+    #
+    # Lanes cars queue in, in the order of LaneWeights
+    # n14e = Cars heading east in northern lane of 14st west of Atlantic Dr
+    # s14e = Cars heading east in southern lane of 14st west of Atlantic Dr
+    # en14w = Cars heading west in northern lane of 14st east of Atlantic Dr
+    # es14w = Cars heading west in southern lane of 14st east of Atlantic Dr
+    # n_atlantic_s = Cars heading south on Atlantic Dr north of 14th St
+    # s_atlantic_n = Cars heading north on Atlantic Dr south of 14th St
+    LANES = ('n14e', 's14e', 'en14w', 'es14w', 'n_atlantic_s', 's_atlantic_n')
+
+    # Parts of the intersection a car can block while crossing it: the northern, southern,
+    # west and east parts. Zone i is bit i of zones_occupied, so a set of zones is a bitmask
+    ZONES = 'NSWE'
+
+    # Light phases, used as indices into light_green
+    FOURTEENTH = 0
+    ATLANTIC = 1
+
+    # How the car at the front of a lane is let into the intersection, depending on the turn
+    # it makes. Each entry is (turns, zones that must be free, light phase that must be green
+    # or None, movement event, zones the car occupies). The entry for the car's turn is used
+    # and if its zones or light do not allow it, the car waits
+    TURN_CHOICES = {
+        'n14e': ((('straight', 'right'), '', None, EventType.N14E_GO_ACROSS, 'S'),
+                 (('left',), 'N', None, EventType.N14E_TURN_LEFT, 'N')),
+        's14e': ((('straight', 'left'), '', None, EventType.S14E_GO_ACROSS, 'S'),
+                 (('right',), '', None, EventType.S14E_TURN_RIGHT, 'S')),
+        'en14w': ((('straight', 'left'), '', None, EventType.EN14W_GO_ACROSS, 'N'),
+                  (('right',), '', None, EventType.EN14W_TURN_RIGHT, 'N')),
+        'es14w': ((('straight', 'right'), '', None, EventType.ES14W_GO_ACROSS, 'N'),
+                  (('left',), 'S', None, EventType.ES14W_TURN_LEFT, 'S')),
+        'n_atlantic_s': ((('straight',), 'NS', None, EventType.N_ATLANTIC_S_GO_ACROSS, 'NS'),
+                         (('left',), 'NS', None, EventType.N_ATLANTIC_S_TURN_LEFT, 'NS'),
+                         (('right',), 'N', None, EventType.N_ATLANTIC_S_TURN_RIGHT, 'N')),
+        's_atlantic_n': ((('straight',), 'NS', None, EventType.S_ATLANTIC_N_GO_ACROSS, 'NS'),
+                         (('left',), 'NS', None, EventType.S_ATLANTIC_N_TURN_LEFT, 'NS'),
+                         (('right',), 'S', None, EventType.S_ATLANTIC_N_TURN_RIGHT, 'S')),
+        # An s_atlantic_n car let in after a 14 St car has crossed turns right only if the
+        # northern part is free
+        's_atlantic_n_waiting': ((('straight',), 'NS', None, EventType.S_ATLANTIC_N_GO_ACROSS, 'NS'),
+                                 (('left',), 'NS', None, EventType.S_ATLANTIC_N_TURN_LEFT, 'NS'),
+                                 (('right',), 'N', None, EventType.S_ATLANTIC_N_TURN_RIGHT, 'S')),
+        'n14e_tl': ((('straight', 'right'), '', FOURTEENTH, EventType.N14E_GO_ACROSS_TL, 'S'),
+                    (('left',), 'N', FOURTEENTH, EventType.N14E_TURN_LEFT_TL, 'N')),
+        's14e_tl': ((('straight', 'left'), '', FOURTEENTH, EventType.S14E_GO_ACROSS_TL, 'S'),
+                    (('right',), '', FOURTEENTH, EventType.S14E_TURN_RIGHT_TL, '')),
+        'en14w_tl': ((('straight', 'left'), '', FOURTEENTH, EventType.EN14W_GO_ACROSS_TL, 'N'),
+                     (('right',), '', FOURTEENTH, EventType.EN14W_TURN_RIGHT_TL, '')),
+        'es14w_tl': ((('straight', 'right'), '', FOURTEENTH, EventType.ES14W_GO_ACROSS_TL, 'N'),
+                     (('left',), 'S', FOURTEENTH, EventType.ES14W_TURN_LEFT_TL, 'S')),
+        'n_atlantic_s_tl': ((('straight',), 'W', ATLANTIC, EventType.N_ATLANTIC_S_GO_ACROSS_TL, 'W'),
+                            (('left',), 'E', ATLANTIC, EventType.N_ATLANTIC_S_TURN_LEFT_TL, 'E'),
+                            (('right',), '', ATLANTIC, EventType.N_ATLANTIC_S_TURN_RIGHT_TL, 'W')),
+        's_atlantic_n_tl': ((('straight',), 'E', ATLANTIC, EventType.S_ATLANTIC_N_GO_ACROSS_TL, 'E'),
+                            (('left',), 'W', ATLANTIC, EventType.S_ATLANTIC_N_TURN_LEFT_TL, 'W'),
+                            (('right',), '', ATLANTIC, EventType.S_ATLANTIC_N_TURN_RIGHT_TL, 'E')),
+    }
+
+    # Rules for letting waiting cars into the intersection after a car has moved or the light
+    # has changed:
+    # ('serve', lane, movement event, zones occupied, light phase that must be green or None,
+    #     lanes that must be empty) moves the car at the front of lane, whatever its turn
+    # ('coin', lane, turn choice, lane, turn choice) flips a coin to pick one of two lanes and
+    #     lets the car at its front in as TURN_CHOICES[turn choice] allows
+    ATLANTIC_COIN = ('coin', 'n_atlantic_s', 'n_atlantic_s', 's_atlantic_n', 's_atlantic_n_waiting')
+    AFTER_SOUTH_CROSSING = (('serve', 'es14w', EventType.ES14W_TURN_LEFT, 'S', None, ()), ATLANTIC_COIN)
+    AFTER_NORTH_CROSSING = (('serve', 'n14e', EventType.N14E_TURN_LEFT, 'N', None, ()), ATLANTIC_COIN)
+    N_ATLANTIC_S_NEXT = (('serve', 'n_atlantic_s', EventType.N_ATLANTIC_S_GO_ACROSS_TL, 'W', ATLANTIC, ()),
+                         ('serve', 's_atlantic_n', EventType.S_ATLANTIC_N_TURN_LEFT_TL, 'W', ATLANTIC, ()))
+    S_ATLANTIC_N_NEXT = (('serve', 's_atlantic_n', EventType.S_ATLANTIC_N_GO_ACROSS_TL, 'E', ATLANTIC, ()),
+                         ('serve', 'n_atlantic_s', EventType.N_ATLANTIC_S_TURN_LEFT_TL, 'E', ATLANTIC, ()))
+    ES14W_NEXT = (('serve', 'es14w', EventType.ES14W_GO_ACROSS_TL, 'N', FOURTEENTH, ()),
+                  ('serve', 'n14e', EventType.N14E_TURN_LEFT_TL, 'N', FOURTEENTH, ('en14w',)))
+
+    # Arrival events: (lane, True if the traffic light is used, turn choice)
+    ARRIVALS = {
+        EventType.N14E_ARRIVAL: ('n14e', False, 'n14e'),
+        EventType.S14E_ARRIVAL: ('s14e', False, 's14e'),
+        EventType.EN14W_ARRIVAL: ('en14w', False, 'en14w'),
+        EventType.ES14W_ARRIVAL: ('es14w', False, 'es14w'),
+        EventType.N_ATLANTIC_S_ARRIVAL: ('n_atlantic_s', False, 'n_atlantic_s'),
+        EventType.S_ATLANTIC_N_ARRIVAL: ('s_atlantic_n', False, 's_atlantic_n'),
+        EventType.N14E_ARRIVAL_TL: ('n14e', True, 'n14e_tl'),
+        EventType.S14E_ARRIVAL_TL: ('s14e', True, 's14e_tl'),
+        EventType.EN14W_ARRIVAL_TL: ('en14w', True, 'en14w_tl'),
+        EventType.ES14W_ARRIVAL_TL: ('es14w', True, 'es14w_tl'),
+        EventType.N_ATLANTIC_S_ARRIVAL_TL: ('n_atlantic_s', True, 'n_atlantic_s_tl'),
+        EventType.S_ATLANTIC_N_ARRIVAL_TL: ('s_atlantic_n', True, 's_atlantic_n_tl'),
+    }
+
+    # Movement events, a car leaving the front of a lane across the intersection: (lane,
+    # parameter holding the time the movement takes, zones freed, rules). The first rule
+    # that applies is used. The event is scheduled when the car is let in, so the car
+    # stopped waiting the movement time before the event
+    MOVEMENTS = {
+        EventType.N14E_GO_ACROSS: ('n14e', 'GoAcross', 'S', AFTER_SOUTH_CROSSING),
+        EventType.N14E_TURN_LEFT: ('n14e', 'TurnLeft', 'N', ()),
+        EventType.S14E_GO_ACROSS: ('s14e', 'GoAcross', 'S', AFTER_SOUTH_CROSSING),
+        EventType.S14E_TURN_RIGHT: ('s14e', 'TurnRight', 'S', ()),
+        EventType.EN14W_GO_ACROSS: ('en14w', 'GoAcross', 'N', AFTER_NORTH_CROSSING),
+        EventType.EN14W_TURN_RIGHT: ('en14w', 'TurnRight', 'N', ()),
+        EventType.ES14W_GO_ACROSS: ('es14w', 'GoAcross', 'N', AFTER_NORTH_CROSSING),
+        EventType.ES14W_TURN_LEFT: ('es14w', 'TurnLeft', 'S', ()),
+        EventType.N_ATLANTIC_S_GO_ACROSS: ('n_atlantic_s', 'GoAcross', 'NS', ()),
+        EventType.N_ATLANTIC_S_TURN_LEFT: ('n_atlantic_s', 'TurnLeft', 'NS', ()),
+        EventType.N_ATLANTIC_S_TURN_RIGHT: ('n_atlantic_s', 'TurnRight', 'N', ()),
+        EventType.S_ATLANTIC_N_GO_ACROSS: ('s_atlantic_n', 'GoAcross', 'NS', ()),
+        EventType.S_ATLANTIC_N_TURN_LEFT: ('s_atlantic_n', 'TurnLeft', 'NS', ()),
+        EventType.S_ATLANTIC_N_TURN_RIGHT: ('s_atlantic_n', 'TurnRight', 'S', ()),
+        EventType.N14E_GO_ACROSS_TL: ('n14e', 'GoAcross', 'S',
+            (('serve', 'n14e', EventType.N14E_GO_ACROSS_TL, 'S', FOURTEENTH, ()),
+             ('serve', 'es14w', EventType.ES14W_TURN_LEFT_TL, 'S', FOURTEENTH, ('s14e',)))),
+        EventType.N14E_TURN_LEFT_TL: ('n14e', 'TurnLeft', 'N',
+            (('serve', 'n14e', EventType.N14E_GO_ACROSS_TL, 'S', FOURTEENTH, ()),)),
+        EventType.S14E_GO_ACROSS_TL: ('s14e', 'GoAcross', 'S',
+            (('serve', 's14e', EventType.S14E_GO_ACROSS_TL, 'S', FOURTEENTH, ()),
+             ('serve', 'es14w', EventType.ES14W_TURN_LEFT_TL, 'S', FOURTEENTH, ('n14e',)))),
+        EventType.S14E_TURN_RIGHT_TL: ('s14e', 'TurnRight', '',
+            (('serve', 's14e', EventType.S14E_GO_ACROSS_TL, 'S', FOURTEENTH, ()),)),
+        EventType.EN14W_GO_ACROSS_TL: ('en14w', 'GoAcross', 'N',
+            (('serve', 'en14w', EventType.EN14W_GO_ACROSS_TL, 'N', FOURTEENTH, ()),
+             ('serve', 'n14e', EventType.N14E_TURN_LEFT_TL, 'N', FOURTEENTH, ('es14w',)))),
+        EventType.EN14W_TURN_RIGHT_TL: ('en14w', 'TurnRight', '',
+            (('serve', 'en14w', EventType.EN14W_GO_ACROSS_TL, 'N', FOURTEENTH, ()),)),
+        EventType.ES14W_GO_ACROSS_TL: ('es14w', 'GoAcross', 'N', ES14W_NEXT),
+        EventType.ES14W_TURN_LEFT_TL: ('es14w', 'TurnLeft', 'S', ES14W_NEXT),
+        EventType.N_ATLANTIC_S_GO_ACROSS_TL: ('n_atlantic_s', 'GoAcross', 'W', N_ATLANTIC_S_NEXT),
+        EventType.N_ATLANTIC_S_TURN_LEFT_TL: ('n_atlantic_s', 'TurnLeft', 'E', N_ATLANTIC_S_NEXT),
+        EventType.N_ATLANTIC_S_TURN_RIGHT_TL: ('n_atlantic_s', 'TurnRight', 'W', N_ATLANTIC_S_NEXT),
+        EventType.S_ATLANTIC_N_GO_ACROSS_TL: ('s_atlantic_n', 'GoAcross', 'E', S_ATLANTIC_N_NEXT),
+        EventType.S_ATLANTIC_N_TURN_LEFT_TL: ('s_atlantic_n', 'TurnLeft', 'W', S_ATLANTIC_N_NEXT),
+        EventType.S_ATLANTIC_N_TURN_RIGHT_TL: ('s_atlantic_n', 'TurnRight', 'E', S_ATLANTIC_N_NEXT),
+    }
+
+    # Light change events: (True if the 14 St light turns green, next light change event,
+    # parameter holding the time until it, rules). Every rule that applies is used
+    LIGHT_CHANGES = {
+        EventType._14_LIGHT_TURNS_GREEN: (True, EventType._14_LIGHT_TURNS_RED, 'GreenLightDuration',
+            (('serve', 'es14w', EventType.ES14W_GO_ACROSS_TL, 'N', None, ()),
+             ('serve', 'en14w', EventType.EN14W_GO_ACROSS_TL, 'N', None, ()),
+             ('serve', 'n14e', EventType.N14E_GO_ACROSS_TL, 'S', None, ()),
+             ('serve', 's14e', EventType.S14E_GO_ACROSS_TL, 'S', None, ()))),
+        EventType._14_LIGHT_TURNS_RED: (False, EventType._14_LIGHT_TURNS_GREEN, 'RedLightDuration',
+            (('serve', 'n_atlantic_s', EventType.N_ATLANTIC_S_GO_ACROSS_TL, 'W', None, ()),
+             ('serve', 's_atlantic_n', EventType.S_ATLANTIC_N_GO_ACROSS_TL, 'E', None, ()))),
+    }
+
+    # Converts the zone letters of the layout tables to a bitmask of zones
+    def zone_mask(self, zones):
+        mask = 0
+        for zone in zones:
+            mask |= 1 << self.ZONES.index(zone)
+        return mask
+
+    # Turn choice compiled for the handlers: a dict from each turn to (zones required, light
+    # phase, movement event, time the movement takes, zones occupied), zones as bitmasks
+    def compile_turn_choice(self, name):
+        compiled = {}
+        for turns, required, phase, movement, occupied in self.TURN_CHOICES[name]:
+            for turn in turns:
+                compiled[turn] = (self.zone_mask(required), phase, movement,
+                                  getattr(self, self.MOVEMENTS[movement][1]), self.zone_mask(occupied))
+        return compiled
+
+    def compile_rules(self, rules):
+        compiled = []
+        for rule in rules:
+            if rule[0] == 'serve':
+                kind, lane, movement, occupied, phase, empty_lanes = rule
+                compiled.append((kind, self.LANES.index(lane), movement, getattr(self, self.MOVEMENTS[movement][1]),
+                                 self.zone_mask(occupied), phase,
+                                 tuple(self.LANES.index(other) for other in empty_lanes)))
+            else:
+                kind, heads_lane, heads_choice, tails_lane, tails_choice = rule
+                compiled.append((kind, (self.LANES.index(heads_lane), self.compile_turn_choice(heads_choice)),
+                                 (self.LANES.index(tails_lane), self.compile_turn_choice(tails_choice))))
+        return tuple(compiled)
+
+    # Registers a generic handler, bound to its compiled table entry, for every arrival,
+    # movement and light change event type. When tracing, each handler is wrapped to record
+    # its events first, so the handlers themselves never check whether to trace
+    def register_handlers(self):
+        for event_type, (lane, traffic_light, choice) in self.ARRIVALS.items():
+            self.register_handler(event_type, self.LANES.index(lane), partial(
+                self.car_arrives, (event_type, self.LANES.index(lane), traffic_light,
+                                   self.compile_turn_choice(choice))))
+        for event_type, (lane, duration, freed, rules) in self.MOVEMENTS.items():
+            self.register_handler(event_type, self.LANES.index(lane), partial(
+                self.car_moves, (event_type, self.LANES.index(lane), self.zone_mask(freed),
+                                 self.compile_rules(rules))))
+        for event_type, (fourteenth_green, next_change, duration, rules) in self.LIGHT_CHANGES.items():
+            self.register_handler(event_type, -1, partial(
+                self.light_changes, (event_type, fourteenth_green, next_change, getattr(self, duration),
+                                     self.compile_rules(rules))))
+
+    # lane is the index of the lane the events are for, -1 if none
+    def register_handler(self, event_type, lane, handler):
+        if self.tracer is not None:
+            handler = partial(self.traced, event_type, lane, handler)
+        self.simulation_engine.register_handler(event_type, handler)
+
+    # Records an event in the trace, with the length of its lane's queue before it, then
+    # handles it
+    def traced(self, event_type, lane, handler, payload):
+        queue_length = self.queues[lane].size() if lane >= 0 else -1
+        self.tracer.record(self.simulation_engine.now, event_type, lane, queue_length)
+        handler(payload)
+
+    def dump_trace(self):
+        self.tracer.dump(EVENT_NAMES, self.LANES)
+
+    ###### Event handlers
+    # Lets the car at the front of lane into the intersection if the turn it makes is allowed
+    # by the compiled turn choice, scheduling the movement and blocking the zones it needs
+    def let_in(self, lane, choice, now):
+        required, phase, movement, duration, occupied = choice[self.get_turn_direction()]
+        if self.zones_occupied & required:
+            return
+        if phase is not None and not self.light_green[phase]:
+            return
+        self.zones_occupied |= occupied
+        self.schedule_departure(lane, now + duration, movement)
+
+    # Applies compiled rules after a car has moved or the light has changed, either all that
+    # apply or only the first
+    def apply_rules(self, rules, apply_all, now):
+        queues = self.queues
+        for rule in rules:
+            if rule[0] == 'serve':
+                kind, lane, movement, duration, occupied, phase, empty_lanes = rule
+                if queues[lane].isEmpty() or (phase is not None and not self.light_green[phase]):
+                    continue
+                if empty_lanes and [other for other in empty_lanes if not queues[other].isEmpty()]:
+                    continue
+                self.zones_occupied |= occupied
+                self.schedule_departure(lane, now + duration, movement)
+            else:
+                # flip a coin to determine which lane to let go
+                kind, heads, tails = rule
+                lane, choice = heads if self.random_uniform() < 0.5 else tails
+                if not queues[lane].isEmpty():
+                    self.let_in(lane, choice, now)
+            if not apply_all:
+                return
+
+    # Event handler for a car arriving at the back of a lane
+    def car_arrives(self, arrival, payload):
+        event_type, lane, traffic_light, choice = arrival
+        now = self.simulation_engine.now
+        queue = self.queues[lane]
+
+        # Number the newly arrived car, record its arrival and add it to the queue to simulate
+        # arriving at intersection
+        vehicle = self.vehicle_count
+        arrival_time = self.arrival_time
+        if vehicle == len(arrival_time):
+            arrival_time.extend(array('d', [0.0]) * self.VEHICLE_BLOCK)
+            self.let_in_time.extend(array('d', [0.0]) * self.VEHICLE_BLOCK)
+        arrival_time[vehicle] = now
+        self.vehicle_count = vehicle + 1
+        self.arrival_count[lane] += 1
+        if queue.isEmpty():
+            self.resume_pending_departures(lane)
+        if queue.size() < self.departing[lane]:
+            self.let_in_time[vehicle] = now
+        queue.enqueue(vehicle)
+        self.NumEvents += 1
+
+        # Schedule another arrival if there is still time
+        # It is using a value from an exponential distribution to determine exactly when the
+        # next car is to arrive
+        if now < self.EndTime:
+            if traffic_light:
+                next_arrival = self.determine_next_arrival_traffic_light()
+            else:
+                next_arrival = self.determine_next_arrival()
+            timestamp = now + self.rand_exp(next_arrival['mean'])
+            self.simulation_engine.schedule_new_event(timestamp, next_arrival['event_type'])
+
+        # Determine which direction to go, Right, Straight, or Left, and go if allowed
+        self.let_in(lane, choice, now)
+
+    # Event handler for the car at the front of a lane moving across the intersection
+    def car_moves(self, movement, payload):
+        event_type, lane, freed, rules = movement
+        now = self.simulation_engine.now
+        queue = self.queues[lane]
+        # Already handled
+        if queue.isEmpty():
+            return
+
+        # Remove car from queue
+        car_removed = queue.dequeue()
+        self.departing[lane] -= 1
+        # Any other departure still pending for this lane has no car left to move, unless a car
+        # arrives before it is due
+        if queue.isEmpty():
+            self.cancel_pending_departures(lane)
+
+        # The car waited from its arrival until it was let in
+        self.delay[lane].add(self.let_in_time[car_removed] - self.arrival_time[car_removed])
+        self.NumEvents += 1
+
+        # The parts of the intersection the car was in are free again, let waiting cars in
+        self.zones_occupied &= ~freed
+        self.apply_rules(rules, False, now)
+
+    # Event handler for the traffic light changing, which lets in the cars waiting at the
+    # light that has turned green
+    def light_changes(self, change, payload):
+        event_type, fourteenth_green, next_change, duration, rules = change
+        now = self.simulation_engine.now
+
+        self.light_green[self.FOURTEENTH] = fourteenth_green
+        self.light_green[self.ATLANTIC] = not fourteenth_green
+
+        # Need to schedule the next light change if there is still time
+        if now < self.EndTime:
+            self.simulation_engine.schedule_new_event(now + duration, next_change)
+        self.apply_rules(rules, True, now)
+
+        # Update experiment statistics
+        self.NumEvents += 1
+
+    # This is the main driver of the simulation, this is where we kick things off
+    def run(self):
+        if self.LoadSnapshot:
+            # Carry on from a warmed-up intersection, discarding the warm-up statistics. The
+            # random number generators are reseeded so every run from the snapshot differs
+            self.load_snapshot(self.LoadSnapshot, reseed=True, seed=self.Seed)
+            if not [event for event in self.simulation_engine.get_state()['events'] if event[1] in self.LIGHT_CHANGES]:
+                raise ValueError("Snapshot %s has no pending light change, so the light would never change again"
+                                 % self.LoadSnapshot)
+            self.reset_statistics()
+            self.EndTime = self.current_time() + self.SimulationDuration
         else:
-            # Check s_atlantic_n
-            if not GlobalVar.s_atlantic_n_queue.isEmpty():
-                turn_direction = get_turn_direction()
-                if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Go Across
-                    # Northern and southern parts of intersection no longer free for cars to turn across
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS
-                    timestamp = current_time() + GlobalVar.GoAcross
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across)
-                # Can make a left turn if no car is traversing northern part of intersection
-                elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-                    # Event for S_ATLANTIC_N Turn Left
-                    # This is now blocking the southern part of atlantic intersection
-                    GlobalVar.N_Atlantic_14_Free = False
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT
-                    timestamp = current_time() + GlobalVar.TurnLeft
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left)
-                elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-                    GlobalVar.S_Atlantic_14_Free = False
-                    new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT
-                    timestamp = current_time() + GlobalVar.TurnRight
-                    simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right)
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for cars turning left from southern lane of 14st east across to Atlnatic Dr south
-def es14w_turn_left(event_data):
-    # If something bad happens
-    if event_data != EventType.ES14W_TURN_LEFT:
-        print "Unexpected event type in es14w_turn_left, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W Turn Left event, time: %f" % current_time()
-    if GlobalVar.es14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-    
-    # Remove car from es14w queue
-    car_removed = GlobalVar.es14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across ES14W" % car_removed
-        print "%d cars now in es14w_queue" % GlobalVar.es14w_queue.size()
-        print "es14w_queue.isEmpty() is: ",
-        print GlobalVar.es14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-        ((GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for a car arriving at Atlantic Dr north of 14th St
-def n_atlantic_s_arrival(event_data):
- # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_ARRIVAL:
-        print "Unexpected event type in n_atlantic_s_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_ATLANTIC_S_ARRIVAL Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'n_atlantic_s_car_%d' % (GlobalVar.n_atlantic_s_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.n_atlantic_s_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-            ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.n_atlantic_s_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-        # Event for N_ATLANTIC_S Go Across
-        # Northern and southern parts of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-        # Event for N_ATLANTIC_S Turn Left
-        # This is now blocking the southern part of atlantic intersection
-        GlobalVar.N_Atlantic_14_Free = False
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left)
-    elif turn_direction is "right" and GlobalVar.N_Atlantic_14_Free:
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right)
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars going across 14th St on Atlantic Dr
-def n_atlantic_s_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_GO_ACROSS:
-        print "Unexpected event type in n_atlantic_s_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Go Across event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N_Atlantic_S" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern and southern parts of intersection are now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system
-def n_atlantic_s_turn_left(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_TURN_LEFT:
-        print "Unexpected event type in n_atlantic_s_turn_left, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Turn Left event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  N_Atlantic_S onto 14th St" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern and southern parts of intersection are now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars turning right from Atlantic Dr onto 14th St
-def n_atlantic_s_turn_right(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_TURN_RIGHT:
-        print "Unexpected event type in n_atlantic_s_turn_right, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Turn Right event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  N_Atlantic_S onto 14th St" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for a car arriving at Atlantic Dr south of 14th St
-def s_atlantic_n_arrival(event_data):
- # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_ARRIVAL:
-        print "Unexpected event type in s_atlantic_n_arrival, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_ATLANTIC_N_ARRIVAL Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 's_atlantic_n_car_%d' % (GlobalVar.s_atlantic_n_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.s_atlantic_n_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-            ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.s_atlantic_n_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-        # Event for S_ATLANTIC_N Go Across
-        # Northern and southern parts of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar.S_Atlantic_14_Free:
-        # Event for S_ATLANTIC_N Turn Left
-        # This is now blocking the southern part of atlantic intersection
-        GlobalVar.N_Atlantic_14_Free = False
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left)
-    elif turn_direction is "right" and GlobalVar.S_Atlantic_14_Free:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right)
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars going across 14th St on Atlantic Dr
-def s_atlantic_n_go_across(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_GO_ACROSS:
-        print "Unexpected event type in s_atlantic_n_go_across, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Go Across event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across S_Atlantic_N" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern and southern parts of intersection are now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system
-def s_atlantic_n_turn_left(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_TURN_LEFT:
-        print "Unexpected event type in s_atlantic_n_turn_left, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Turn Left event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went left from  S_Atlantic_N onto 14th St" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern and southern parts of intersection are now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system
-def s_atlantic_n_turn_right(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_TURN_RIGHT:
-        print "Unexpected event type in s_atlantic_n_turn_right, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Turn Right event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  S_Atlantic_N onto 14th St" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for a car arriving at northern lane of 14th street from the west, west of atlantic
-# with presence of traffic light
-def n14e_arrival_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_ARRIVAL_TL:
-        print "Unexpected event type in n14e_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E_ARRIVAL Traffic Light Event, time: %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'n14e_car_%d' % (GlobalVar.n14e_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at traffic light
-    GlobalVar.n14e_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-            ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.n14e_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if (turn_direction is "straight" or turn_direction is "right") and GlobalVar._14LightGreen:
-        # Event for N_14_E Go Across
-        # Southern part of intersection no longer free for cars to turn across
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_go_across_traffic_light)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar.N_Atlantic_14_Free and GlobalVar._14LightGreen:
-        # Event for N_14_E Turn Left
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for cars going across atlantic dr intersection on n14e with presence of traffic light
-def n14e_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_GO_ACROSS_TL:
-        print "Unexpected event type in n14e_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.n14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n14e queue
-    car_removed = GlobalVar.n14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N14E" % car_removed
-        print "%d cars now in n14e_queue" % GlobalVar.n14e_queue.size()
-        print "n14e_queue.isEmpty() is: ",
-        print GlobalVar.n14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-        ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Southern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Need to check if more cars need to go across this lane
-    if not GlobalVar.n14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_go_across_traffic_light)
-    elif not GlobalVar.es14w_queue.isEmpty() and GlobalVar.s14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for cars turning left from northern lane of 14st east across to Atlnatic Dr north
-# with presence of traffic light
-def n14e_turn_left_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N14E_TURN_LEFT_TL:
-        print "Unexpected event type in n14e_turn_left_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N14E Turn Left Traffic Light event, time: %f" % current_time()
-    if GlobalVar.n14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-    
-    # Remove car from n14e queue
-    car_removed = GlobalVar.n14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N14E" % car_removed
-        print "%d cars now in n14e_queue" % GlobalVar.n14e_queue.size()
-        print "n14e_queue.isEmpty() is: ",
-        print GlobalVar.n14e_queue.isEmpty()
-    
-    # Update waiting time statistics
-    if GlobalVar.n14e_queue.size() > 1:
-        GlobalVar.n14e_total_waiting_time += \
-        ( (GlobalVar.n14e_queue.size() - 1) * (current_time() - GlobalVar.n14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Check if any other cars in this lane need to cross intersection
-    if not GlobalVar.n14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_go_across_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n14e_last_event_time = current_time()
-
-# Event handler for a car arriving at southern lane of 14th street from the west, west of atlantic
-# with presence of traffic light
-def s14e_arrival_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_ARRIVAL_TL:
-        print "Unexpected event type in s14e_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E_ARRIVAL Traffic Light Event: time=%f" % current_time()
-    
-    # Get identity of car
-    car_identity = 's14e_car_%d' % (GlobalVar.s14e_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.s14e_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-            ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.s14e_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if (turn_direction is "straight" or turn_direction is "left") and GlobalVar._14LightGreen:
-        # Event for s14e Go Across
-        # Southern part of intersection no longer free for cars to turn across
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_go_across_traffic_light)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "right" and GlobalVar._14LightGreen:
-        # Event for N_14_E Turn Right
-        new_event_type = EventType.S14E_TURN_RIGHT_TL
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_turn_right_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for cars going across atlantic dr intersection on s14e with presence of traffic light
-def s14e_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_GO_ACROSS_TL:
-        print "Unexpected event type in s14e_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.s14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s14e queue
-    car_removed = GlobalVar.s14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across S14E" % car_removed
-        print "%d cars now in s14e_queue" % GlobalVar.s14e_queue.size()
-        print "s14e_queue.isEmpty() is: ",
-        print GlobalVar.s14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-        ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Southern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.s14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_go_across_traffic_light)
-    elif not GlobalVar.es14w_queue.isEmpty() and GlobalVar.n14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        # Need to check if more cars need to go across this lane
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for cars turning right onto atlantic dr from s14e with presence of traffic light
-def s14e_turn_right_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S14E_TURN_RIGHT_TL:
-        print "Unexpected event type in s14e_turn_right_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S14E Turn Right Traffic Light event, time: %f" % current_time()
-    if GlobalVar.s14e_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s14e queue
-    car_removed = GlobalVar.s14e_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from S14E onto Atlantic Dr south" % car_removed
-        print "%d cars now in s14e_queue" % GlobalVar.s14e_queue.size()
-        print "s14e_queue.isEmpty() is: ",
-        print GlobalVar.s14e_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s14e_queue.size() > 1:
-        GlobalVar.s14e_total_waiting_time += \
-        ( (GlobalVar.s14e_queue.size() - 1) * (current_time() - GlobalVar.s14e_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Need to see if any other cars are waiting to cross intersection in this lane
-    if not GlobalVar.s14e_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.S14E_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s14e_go_across_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s14e_last_event_time = current_time()
-
-# Event handler for a car arriving at northern lane of 14th street from the east, east of atlantic
-# with presence of traffic light
-def en14w_arrival_traffic_light(event_data):
- # If something bad happens
-    if event_data != EventType.EN14W_ARRIVAL_TL:
-        print "Unexpected event type in es14w_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W_ARRIVAL Traffic Light Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'en14w_car_%d' % (GlobalVar.en14w_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.en14w_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        if GlobalVar.DB:
-            print "en14w queue size greater than 1, is: %d" % GlobalVar.en14w_queue.size()
-        GlobalVar.en14w_total_waiting_time += \
-            ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.en14w_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if (turn_direction is "straight" or turn_direction is "left") and GlobalVar._14LightGreen:
-        # Event for EN14W Go Across
-        # Northern part of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_go_across_traffic_light)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "right" and GlobalVar._14LightGreen:
-        # Event for EN14W Turn Right
-        new_event_type = EventType.EN14W_TURN_RIGHT_TL
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_turn_right_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for cars going across Atlantic Dr on EN14W with presence of traffic light
-# with presence of traffic light
-def en14w_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.EN14W_GO_ACROSS_TL:
-        print "Unexpected event type in es14w_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.en14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from en14w queue
-    car_removed = GlobalVar.en14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across EN14W" % car_removed
-        print "%d cars now in en14w_queue" % GlobalVar.en14w_queue.size()
-        print "en14w_queue.isEmpty() is: ",
-        print GlobalVar.en14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        GlobalVar.en14w_total_waiting_time += \
-        ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.en14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_go_across_traffic_light)
-    elif not GlobalVar.n14e_queue.isEmpty() and GlobalVar.es14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for cars turning right onto atlantic dr from en14w with presence of traffic light
-def en14w_turn_right_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.EN14W_TURN_RIGHT_TL:
-        print "Unexpected event type in es14w_turn_right_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "EN14W Turn Right Traffic Light event, time: %f" % current_time()
-    if GlobalVar.en14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from en14w queue
-    car_removed = GlobalVar.en14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from EN14W onto Atlantic Dr south" % car_removed
-        print "%d cars now in en14w_queue" % GlobalVar.en14w_queue.size()
-        print "en14w_queue.isEmpty() is: ",
-        print GlobalVar.en14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.en14w_queue.size() > 1:
-        GlobalVar.en14w_total_waiting_time += \
-        ( (GlobalVar.en14w_queue.size() - 1) * (current_time() - GlobalVar.en14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.en14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.EN14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, en14w_go_across_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.en14w_last_event_time = current_time()
-
-# Event handler for a car arriving at southern lane of 14th street from the east, east of atlantic
-# with presence of traffic light
-def es14w_arrival_traffic_light(event_data):
- # If something bad happens
-    if event_data != EventType.ES14W_ARRIVAL_TL:
-        print "Unexpected event type in es14w_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W_ARRIVAL Traffic Light Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'es14w_car_%d' % (GlobalVar.es14w_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.es14w_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-            ( (GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.es14w_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if (turn_direction is "straight" or turn_direction is "right") and GlobalVar._14LightGreen:
-        # Event for ES14W Go Across
-        # Northern part of intersection no longer free for cars to turn across
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_go_across_traffic_light)
-    # Can make a left turn if no car is traversing southern part of intersection
-    elif turn_direction is "left" and GlobalVar.S_Atlantic_14_Free and GlobalVar._14LightGreen:
-        # Event for ES14W Turn Left
-        # This is now blocking the southern part of atlantic intersection
-        GlobalVar.S_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for cars going across Atlantic Dr on ES14W with presence of traffic light
-def es14w_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.ES14W_GO_ACROSS_TL:
-        print "Unexpected event type in es14w_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.es14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from es14w queue
-    car_removed = GlobalVar.es14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across ES14W" % car_removed
-        print "%d cars now in es14w_queue" % GlobalVar.es14w_queue.size()
-        print "es14w_queue.isEmpty() is: ",
-        print GlobalVar.es14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-        ( (GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.N_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.es14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_go_across_traffic_light)
-    elif not GlobalVar.n14e_queue.isEmpty() and GlobalVar.en14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for cars turning left from southern lane of 14st east across to Atlnatic Dr south
-# with presence of traffic light
-def es14w_turn_left_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.ES14W_TURN_LEFT_TL:
-        print "Unexpected event type in es14w_turn_left_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "ES14W Turn Left event, time: %f" % current_time()
-    if GlobalVar.es14w_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-    
-    # Remove car from es14w queue
-    car_removed = GlobalVar.es14w_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across ES14W" % car_removed
-        print "%d cars now in es14w_queue" % GlobalVar.es14w_queue.size()
-        print "es14w_queue.isEmpty() is: ",
-        print GlobalVar.es14w_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.es14w_queue.size() > 1:
-        GlobalVar.es14w_total_waiting_time += \
-        ((GlobalVar.es14w_queue.size() - 1) * (current_time() - GlobalVar.es14w_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.S_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.es14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.ES14W_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, es14w_go_across_traffic_light)
-    elif not GlobalVar.n14e_queue.isEmpty() and GlobalVar.en14w_queue.isEmpty() and GlobalVar._14LightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.N_Atlantic_14_Free = False
-        new_event_type = EventType.N14E_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n14e_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.es14w_last_event_time = current_time()
-
-# Event handler for a car arriving at Atlantic Dr north of 14th St with presence of traffic light
-def n_atlantic_s_arrival_traffic_light(event_data):
- # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_ARRIVAL_TL:
-        print "Unexpected event type in n_atlantic_s_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_ATLANTIC_S_ARRIVAL Traffic Light Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 'n_atlantic_s_car_%d' % (GlobalVar.n_atlantic_s_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.n_atlantic_s_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-            ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.n_atlantic_s_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" and GlobalVar._AtlanticLightGreen and GlobalVar.W_Atlantic_14_Free:
-        # Event for N_ATLANTIC_S_TL Go Across
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across_traffic_light)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar._AtlanticLightGreen and GlobalVar.E_Atlantic_14_Free:
-        # Event for N_ATLANTIC_S Turn Left
-        # This is now blocking the southern part of atlantic intersection
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left_traffic_light)
-    elif turn_direction is "right" and GlobalVar._AtlanticLightGreen:
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_RIGHT_TL
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_right_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars going across 14th St on Atlantic Dr with presence of traffic light
-def n_atlantic_s_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_GO_ACROSS_TL:
-        print "Unexpected event type in n_atlantic_s_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across N_Atlantic_S" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Western part of intersection is now free for cars to turn across
-    GlobalVar.W_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across_traffic_light)
-    elif not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system with presence of traffic light
-def n_atlantic_s_turn_left_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_TURN_LEFT_TL:
-        print "Unexpected event type in n_atlantic_s_turn_left_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Turn Left Traffic Light event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  N_Atlantic_S onto 14th St" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Eastern part of intersection is now free for cars to turn across
-    GlobalVar.E_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across_traffic_light)
-    elif not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for cars turning right from Atlantic Dr onto 14th St with presence of traffic light
-def n_atlantic_s_turn_right_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.N_ATLANTIC_S_TURN_RIGHT_TL:
-        print "Unexpected event type in n_atlantic_s_turn_right_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "N_Atlantic_S Turn Right Traffic Light event, time: %f" % current_time()
-    if GlobalVar.n_atlantic_s_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from n_atlantic_s queue
-    car_removed = GlobalVar.n_atlantic_s_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  N_Atlantic_S onto 14th St" % car_removed
-        print "%d cars now in n_atlantic_s_queue" % GlobalVar.n_atlantic_s_queue.size()
-        print "n_atlantic_s_queue.isEmpty() is: ",
-        print GlobalVar.n_atlantic_s_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.n_atlantic_s_queue.size() > 1:
-        GlobalVar.n_atlantic_s_total_waiting_time += \
-        ( (GlobalVar.n_atlantic_s_queue.size() - 1) * (current_time() - GlobalVar.n_atlantic_s_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Northern part of intersection is now free for cars to turn across
-    GlobalVar.W_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_go_across_traffic_light)
-    elif not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.n_atlantic_s_last_event_time = current_time()
-
-# Event handler for a car arriving at Atlantic Dr south of 14th St with presence of traffic light
-def s_atlantic_n_arrival_traffic_light(event_data):
- # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_ARRIVAL_TL:
-        print "Unexpected event type in s_atlantic_n_arrival_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_ATLANTIC_N_ARRIVAL Traffic Light Event, time = %f" % current_time()
-    
-    # Get identity of car
-    car_identity = 's_atlantic_n_car_%d' % (GlobalVar.s_atlantic_n_arrival_count + 1)
-
-    # Add newly arrived car to queue to simulate arriving at intersection
-    GlobalVar.s_atlantic_n_queue.enqueue(car_identity)
-    
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-            ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update Statistics
-    GlobalVar.NumEvents += 1
-    GlobalVar.s_atlantic_n_arrival_count += 1
-
-    # Schedule another arrival if there is still time
-    # It is using a value from an exponential distribution to determine exactly when the
-    # next plane is to arrive
-    time = current_time()
-    if time < GlobalVar.SimulationDuration:
-        next_arrival = determine_next_arrival_traffic_light()
-        # If in debug mode
-        if GlobalVar.DB:
-            print 'Next arrival is: ',
-            print next_arrival
-        new_event_type = next_arrival['event_type']
-        timestamp = current_time() + rand_exp(next_arrival['mean'])
-        callback = next_arrival['callback']
-        simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    # Determine which direction to go, Right, Straight, or Left
-    turn_direction = get_turn_direction()
-    if turn_direction is "straight" and GlobalVar.E_Atlantic_14_Free and GlobalVar._AtlanticLightGreen:
-        # Event for S_ATLANTIC_N Go Across
-        # Northern and southern parts of intersection no longer free for cars to turn across
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across_traffic_light)
-    # Can make a left turn if no car is traversing northern part of intersection
-    elif turn_direction is "left" and GlobalVar.W_Atlantic_14_Free and GlobalVar._AtlanticLightGreen:
-        # Event for S_ATLANTIC_N Turn Left
-        GlobalVar.W_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_left_traffic_light)
-    elif turn_direction is "right" and GlobalVar._AtlanticLightGreen:
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_TURN_RIGHT_TL
-        timestamp = current_time() + GlobalVar.TurnRight
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_turn_right_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars going across 14th St on Atlantic Dr with presence of traffic light
-def s_atlantic_n_go_across_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_GO_ACROSS_TL:
-        print "Unexpected event type in s_atlantic_n_go_across_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Go Across Traffic Light event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went across S_Atlantic_N" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Eastern part of intersection is now free for cars to turn across
-    GlobalVar.E_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across_traffic_light)
-    elif not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system with presence of traffic light
-def s_atlantic_n_turn_left_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_TURN_LEFT_TL:
-        print "Unexpected event type in s_atlantic_n_turn_left_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Turn Left Traffic Light event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went left from  S_Atlantic_N onto 14th St" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Western parts of intersection is now free for cars to turn across
-    GlobalVar.W_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across_traffic_light)
-    elif not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# Event handler for cars turning left and out of the system
-def s_atlantic_n_turn_right_traffic_light(event_data):
-    # If something bad happens
-    if event_data != EventType.S_ATLANTIC_N_TURN_RIGHT_TL:
-        print "Unexpected event type in s_atlantic_n_turn_right_traffic_light, type is %d" % event_data
-        sys.exit()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "S_Atlantic_N Turn Right Traffic Light event, time: %f" % current_time()
-    if GlobalVar.s_atlantic_n_queue.isEmpty():
-        if GlobalVar.DB:
-            print "Already handled, returning"
-        return ''
-
-    # Remove car from s_atlantic_n queue
-    car_removed = GlobalVar.s_atlantic_n_queue.dequeue()
-    # If in debug mode
-    if GlobalVar.DB:
-        print "%s went right from  S_Atlantic_N onto 14th St" % car_removed
-        print "%d cars now in s_atlantic_n_queue" % GlobalVar.s_atlantic_n_queue.size()
-        print "s_atlantic_n_queue.isEmpty() is: ",
-        print GlobalVar.s_atlantic_n_queue.isEmpty()
-
-    # Update waiting time statistics
-    if GlobalVar.s_atlantic_n_queue.size() > 1:
-        GlobalVar.s_atlantic_n_total_waiting_time += \
-        ( (GlobalVar.s_atlantic_n_queue.size() - 1) * (current_time() - GlobalVar.s_atlantic_n_last_event_time))
-
-    # Update experiment statistics
-    GlobalVar.NumEvents = GlobalVar.NumEvents + 1
-
-    # Eastern part of intersection is now free for cars to turn across
-    GlobalVar.E_Atlantic_14_Free = True
-
-    # Need to check if any other cars are waiting to cross this section of road
-    if not GlobalVar.s_atlantic_n_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.S_ATLANTIC_N_GO_ACROSS_TL
-        timestamp = current_time() + GlobalVar.GoAcross
-        simulation_engine.schedule_new_event(timestamp, new_event_type, s_atlantic_n_go_across_traffic_light)
-    elif not GlobalVar.n_atlantic_s_queue.isEmpty() and GlobalVar._AtlanticLightGreen:
-        # Need to check if any cars waiting to turn
-        GlobalVar.E_Atlantic_14_Free = False
-        new_event_type = EventType.N_ATLANTIC_S_TURN_LEFT_TL
-        timestamp = current_time() + GlobalVar.TurnLeft
-        simulation_engine.schedule_new_event(timestamp, new_event_type, n_atlantic_s_turn_left_traffic_light)
-
-    # Time of last event processed
-    GlobalVar.s_atlantic_n_last_event_time = current_time()
-
-# This is the main driver of the simulation, this is where we kick things off
-def intersection_simulation():
-    # To start off the experiment, need to schedule a new arrival event
-    if GlobalVar.TrafficLight:
-        next_arrival = determine_next_arrival_traffic_light()
-    else:
-        next_arrival = determine_next_arrival()
-
-    # If in debug mode
-    if GlobalVar.DB:
-        print 'The first arrival is: ',
-        print next_arrival
-
-    # Need to schedule time for light to change
-    timestamp = current_time() + GlobalVar.GreenLightDuration
-    new_event_type = EventType._14_LIGHT_TURNS_RED
-    simulation_engine.schedule_new_event(timestamp, new_event_type, _14_light_turns_red)
-
-    timestamp = rand_exp(next_arrival['mean'])
-    new_event_type = next_arrival['event_type']
-    callback = next_arrival['callback']
-    simulation_engine.schedule_new_event(timestamp, new_event_type, callback)
-
-    if GlobalVar.DB:
-        print 'Initial future event list: ',
-        simulation_engine.print_future_event_list()
-        print ''
-    start_time = time.clock()
-
-    # The actual execution of the simulation, with the scheduling, 
-    # execution of, and then removal of the different events that transpire
-    removed_event = simulation_engine.remove_event()
-    # If in debug mode
-    if GlobalVar.DB:
-        print simulation_engine.print_future_event_list()
-        print ''
-    while removed_event is not None:
-        GlobalVar.Now = removed_event.get_timestamp()
-        callback = removed_event.get_callback()
-        removed_event_type = removed_event.get_event_data()
-        callback(removed_event_type)
-        removed_event = simulation_engine.remove_event()
-        # If in debug mode
-        if GlobalVar.DB:
-            print simulation_engine.print_future_event_list()
-            print 'Current time: %f' % current_time()
+            # To start off the experiment, need to schedule a new arrival event
+            if self.TrafficLight:
+                next_arrival = self.determine_next_arrival_traffic_light()
+            else:
+                next_arrival = self.determine_next_arrival()
+
+            # If in debug mode
+            if self.DB:
+                print 'The first arrival is: ',
+                print next_arrival
+
+            # Need to schedule time for light to change
+            timestamp = self.current_time() + self.GreenLightDuration
+            new_event_type = EventType._14_LIGHT_TURNS_RED
+            self.simulation_engine.schedule_new_event(timestamp, new_event_type)
+
+            timestamp = self.rand_exp(next_arrival['mean'])
+            new_event_type = next_arrival['event_type']
+            self.simulation_engine.schedule_new_event(timestamp, new_event_type)
+
+        if self.SaveSnapshot:
+            # Warm-up run: stop at the simulation duration and save the state reached. Arrivals
+            # and light changes, even those at the simulation duration, go on scheduling the
+            # next ones, so the run loaded from the snapshot has them to carry on from
+            until_time = self.EndTime
+            self.EndTime = float('inf')
+            self.simulation_engine.run(until_time=until_time)
+            self.save_snapshot(self.SaveSnapshot)
+            return
+
+        if self.DB:
+            print 'Initial future event list: ',
+            self.simulation_engine.print_future_event_list()
+            print ''
+        start_time = time.clock()
+
+        # The actual execution of the simulation, with the scheduling, 
+        # execution of, and then removal of the different events that transpire
+        until_time = None if self.Drain else self.EndTime
+        try:
+            self.simulation_engine.run(until_time=until_time,
+                                       max_events=self.MaxEvents or None,
+                                       wallclock_budget=self.WallclockBudget or None)
+        except Exception:
+            # Show the events that led up to the error
+            if self.tracer is not None:
+                print '\nError at time %f' % self.current_time()
+                self.dump_trace()
+            raise
+        if self.tracer is not None:
             print ''
+            self.dump_trace()
+
+        end_time = time.clock()
+
+    # print final statistics. Waiting times are those of the cars that have been let into
+    # the intersection; cars still queued at the end have not finished waiting
+    def print_statistics(self):
+        print '\nHere are the simulation statistics:'
+        for lane, name in enumerate(self.LANES):
+            delay = self.delay[lane]
+            print '  Number of cars that went through %s = %d' % (name, self.arrival_count[lane])
+            if self.DB:
+                print '  %s total waiting time: %f' % (name, delay.total())
+                print '  %s waiting time standard deviation: %f' % (name, delay.standard_deviation())
+            if delay.count != 0:
+                print '  %s average waiting time: %f' % (name, delay.mean)
+
+        print '  Number of events executed = %d' % self.simulation_engine.executed_count
+        print '  Number of events cancelled = %d' % self.simulation_engine.cancelled_count
+
+    # Columns of the experiment results files, in the order of statistics_row()
+    STATISTICS_COLUMNS = ('Fourteenth Arrival', 'Atlantic Arrival', 'Traffic Light', '14 Green Light', '14 Red Light',
+                          'Num Cars N14E', 'Num Cars S14E', 'Num Cars EN14W', 'Num Cars ES14W',
+                          'Num Cars N Atlantic S', 'Num Cars S Atlantic N', 'Avg Wait N14E', 'Avg Wait S14E',
+                          'Avg Wait EN14W', 'Avg Wait ES14W', 'Avg Wait N Atlantic S', 'Avg Wait S Atlantic N')
+
+    # The parameters and statistics of the run, as a line of the experiment results files
+    def statistics_row(self):
+        return [self.n14e_mean_arrival, self.n_atlantic_s_mean_arrival, self.TrafficLight,
+                self.GreenLightDuration, self.RedLightDuration] + self.arrival_count + \
+               [delay.mean for delay in self.delay]
+
+    # Appends a line of statistics to the results file at path, with a header line if the file
+    # is new. Many runs are better written through one ResultSink, which writes their lines at once
+    def write_statistics(self, path, format='csv'):
+        sink = ResultSink(path, format, self.STATISTICS_COLUMNS)
+        sink.write(self.statistics_row())
+        sink.close()
+
+# Simulation parameters, as keyword arguments for Simulation, from the values returned by
+# check_arg()
+def simulation_parameters(options):
+    debugmode, atlantic, fourteenth, greenlighttime, redlighttime, light, simtime, laneweights, fel, drain, \
+        maxevents, wallclock, seed, savesnapshot, loadsnapshot, output, output_format = options
+    lane_weights = tuple(float(weight) for weight in laneweights.split(','))
+    if len(lane_weights) != 6:
+        raise ValueError("Expected 6 lane weights, got %d" % len(lane_weights))
+    # Mean arrival times for atlantic drive and for fourteenth street
+    atlantic_arrival_rate = float(atlantic)
+    fourteenth_arrival_rate = float(fourteenth)
+    return dict(DB=int(debugmode),
+                FelStrategy=fel,
+                Drain=drain == "True" or drain == "T" or drain == "true" or drain == "t",
+                MaxEvents=int(maxevents),
+                WallclockBudget=float(wallclock),
+                Seed=int(seed) if seed else None,
+                SaveSnapshot=savesnapshot,
+                LoadSnapshot=loadsnapshot,
+                TrafficLight=light == "True" or light == "T" or light == "true" or light == "t",
+                SimulationDuration=int(simtime),
+                GreenLightDuration=int(greenlighttime),
+                RedLightDuration=int(redlighttime),
+                LaneWeights=lane_weights,
+                n_atlantic_s_mean_arrival=atlantic_arrival_rate,
+                s_atlantic_n_mean_arrival=atlantic_arrival_rate,
+                n14e_mean_arrival=fourteenth_arrival_rate,
+                s14e_mean_arrival=fourteenth_arrival_rate,
+                en14w_mean_arrival=fourteenth_arrival_rate,
+                es14w_mean_arrival=fourteenth_arrival_rate)
+
+# Runs the simulation with the values passed in with flags, or default values if no values
+# passed in, prints the statistics and appends them to the experiment results file
+def intersection_simulation(args=None):
+    print 'Welcome to the 14St, Atlantic Dr Intersection Simulation'
+    print '\nHere are the simulation parameters:'
+    options = check_arg(args)
+    parameters = simulation_parameters(options)
+    debugmode, atlantic, fourteenth, greenlighttime, redlighttime, light, simtime, laneweights, fel, drain, \
+        maxevents, wallclock, seed, savesnapshot, loadsnapshot, output, output_format = options
+    print '  Traffic light used:', parameters['TrafficLight']
+    if parameters['TrafficLight']:
+        print '  Green light time:', parameters['GreenLightDuration']
+        print '  Red light time:', parameters['RedLightDuration']
+    print '  Debug mode:', parameters['DB']
+    print '  Simulation duration:', simtime
+    print '  Future event list:', fel
+    print '  N Atlantic S Mean Arrival:', parameters['n_atlantic_s_mean_arrival']
+    print '  S Atlantic N Mean Arrival:', parameters['s_atlantic_n_mean_arrival']
+    print '  N 14 E Mean Arrival:', parameters['n14e_mean_arrival']
+    print '  S 14 E Mean Arrival:', parameters['s14e_mean_arrival']
+    print '  EN 14 W Mean Arrival:', parameters['en14w_mean_arrival']
+    print '  ES 14 W Mean Arrival:', parameters['es14w_mean_arrival']
+    print '  Lane weights:', laneweights
+
+    simulation = Simulation(**parameters)
+    simulation.run()
+    if simulation.LoadSnapshot:
+        print '\nStarted from snapshot %s at time %f' % (simulation.LoadSnapshot,
+                                                          simulation.EndTime - simulation.SimulationDuration)
+    if simulation.SaveSnapshot:
+        print '\nSnapshot of simulation state at time %f saved to %s' % (simulation.current_time(),
+                                                                         simulation.SaveSnapshot)
+        return
+    if simulation.simulation_engine.stop_reason != 'empty':
+        print '\nSimulation stopped at time %f, stop reason: %s' % (simulation.current_time(),
+                                                                    simulation.simulation_engine.stop_reason)
+    simulation.print_statistics()
+    simulation.write_statistics(output, output_format)
 
-    end_time = time.clock()
-
-    # print final statistics
-    print '\nHere are the simulation statistics:'
-    print '  Number of cars that went through n14e = %d' % GlobalVar.n14e_arrival_count
-    if GlobalVar.DB:
-        print '  n14e total waiting time: %f' % GlobalVar.n14e_total_waiting_time
-    if GlobalVar.n14e_arrival_count != 0:
-        print '  n14e average waiting time: %f' % (GlobalVar.n14e_total_waiting_time / GlobalVar.n14e_arrival_count)
-
-    print '  Number of cars that went through s14e = %d' % GlobalVar.s14e_arrival_count
-    if GlobalVar.DB:
-        print '  s14e total waiting time: %f' % GlobalVar.s14e_total_waiting_time
-    if GlobalVar.s14e_arrival_count != 0:
-        print '  s14e average waiting time: %f' % (GlobalVar.s14e_total_waiting_time / GlobalVar.s14e_arrival_count)
-
-    print '  Number of cars that went through en14w = %d' % GlobalVar.en14w_arrival_count
-    if GlobalVar.DB:
-        print '  en14w total waiting time: %f' % GlobalVar.en14w_total_waiting_time
-    if GlobalVar.en14w_arrival_count != 0:
-        print '  en14w average waiting time: %f' % (GlobalVar.en14w_total_waiting_time / GlobalVar.en14w_arrival_count)
-
-    print '  Number of cars that went through es14w = %d' % GlobalVar.es14w_arrival_count
-    if GlobalVar.DB:
-        print '  es14w total waiting time: %f' % GlobalVar.es14w_total_waiting_time
-    if GlobalVar.es14w_arrival_count != 0:
-        print '  es14w average waiting time: %f' % (GlobalVar.es14w_total_waiting_time / GlobalVar.es14w_arrival_count)
-
-    print '  Number of cars that went through n_atlantic_s = %d' % GlobalVar.n_atlantic_s_arrival_count
-    if GlobalVar.DB:
-        print '  n_atlantic_s total waiting time: %f' % GlobalVar.n_atlantic_s_total_waiting_time
-    if GlobalVar.n_atlantic_s_arrival_count != 0:
-        print '  n_atlantic_s average waiting time: %f' % (GlobalVar.n_atlantic_s_total_waiting_time / GlobalVar.n_atlantic_s_arrival_count)
-
-    print '  Number of cars that went through s_atlantic_n = %d' % GlobalVar.s_atlantic_n_arrival_count
-    if GlobalVar.DB:
-        print '  s_atlantic_n total waiting time: %f' % GlobalVar.s_atlantic_n_total_waiting_time
-    if GlobalVar.s_atlantic_n_arrival_count != 0:
-        print '  s_atlantic_n average waiting time: %f' % (GlobalVar.s_atlantic_n_total_waiting_time / GlobalVar.s_atlantic_n_arrival_count)
-
-    # Write statistics to csv file
-    fh = open('ExperimentResults/light_g35_r13_fpoint1_a6.csv', 'a+')
-    experiment_statistics = str(GlobalVar.n14e_mean_arrival) + ',' + \
-                    str(GlobalVar.n_atlantic_s_mean_arrival) + ',' + \
-                    str(GlobalVar.TrafficLight) + ',' + \
-                    str(GlobalVar.GreenLightDuration) + ',' + \
-                    str(GlobalVar.RedLightDuration) + ',' + \
-                    str(GlobalVar.n14e_arrival_count) + ',' + \
-                    str(GlobalVar.s14e_arrival_count) + ',' + \
-                    str(GlobalVar.en14w_arrival_count) + ',' + \
-                    str(GlobalVar.es14w_arrival_count) + ',' + \
-                    str(GlobalVar.n_atlantic_s_arrival_count) + ',' + \
-                    str(GlobalVar.s_atlantic_n_arrival_count) + ',' + \
-                    str(GlobalVar.n14e_total_waiting_time / GlobalVar.n14e_arrival_count) + ',' + \
-                    str(GlobalVar.s14e_total_waiting_time / GlobalVar.s14e_arrival_count) + ',' + \
-                    str(GlobalVar.en14w_total_waiting_time / GlobalVar.en14w_arrival_count) + ',' + \
-                    str(GlobalVar.es14w_total_waiting_time / GlobalVar.es14w_arrival_count) + ',' + \
-                    str(GlobalVar.n_atlantic_s_total_waiting_time / GlobalVar.n_atlantic_s_arrival_count) + ',' + \
-                    str(GlobalVar.s_atlantic_n_total_waiting_time / GlobalVar.s_atlantic_n_arrival_count) + '\n'
-    fh.writelines(experiment_statistics)
-    fh.close()
-
-intersection_simulation()
\ No newline at end of file
+if __name__ == '__main__':
+    intersection_simulation(sys.argv[1:])
@@ -0,0 +1,476 @@
+import time
+import numpy
+from event_type import EventType
+from intersection_simulation import Simulation
+
+# First in, first out queues of numbers, one set of queues per replication, held as ring
+# buffers. Each item is a tuple of one number per field. Queue q of row r is number
+# r * queues + q, and its items are kept in flat NumPy arrays from position number * capacity,
+# which is cheaper to index than arrays of three dimensions. Rows given to push and pop must
+# be all different
+class RingBuffers:
+    def __init__(self, replications, queues, capacity, dtypes):
+        self.queues = queues
+        self.capacity = capacity
+        self.items = [numpy.zeros(replications * queues * capacity, dtype=dtype) for dtype in dtypes]
+        self.front = numpy.zeros(replications * queues, dtype=int)
+        self.length = numpy.zeros(replications * queues, dtype=int)
+
+    def numbers(self, rows, queues):
+        return rows * self.queues + queues
+
+    # The lengths of all queues as an array of shape (replications, queues)
+    def lengths(self):
+        return self.length.reshape(-1, self.queues)
+
+    def push(self, rows, queues, values):
+        numbers = self.numbers(rows, queues)
+        lengths = self.length[numbers]
+        if len(lengths) and lengths.max() == self.capacity:
+            self.grow()
+        positions = self.front[numbers] + lengths
+        positions[positions >= self.capacity] -= self.capacity
+        positions += numbers * self.capacity
+        for items, value in zip(self.items, values):
+            items[positions] = value
+        self.length[numbers] = lengths + 1
+
+    # Unrolls every ring buffer into one twice the size
+    def grow(self):
+        capacity = self.capacity
+        positions = (self.front[:, None] + numpy.arange(capacity)) % capacity + \
+                    (numpy.arange(len(self.front)) * capacity)[:, None]
+        self.items = [numpy.concatenate([items[positions], numpy.zeros_like(items[positions])], axis=1).ravel()
+                      for items in self.items]
+        self.front[:] = 0
+        self.capacity = 2 * capacity
+
+    # Removes the front items of queues in each of rows and returns them
+    def pop(self, rows, queues):
+        numbers = self.numbers(rows, queues)
+        front = self.front[numbers]
+        values = [items[front + numbers * self.capacity] for items in self.items]
+        front += 1
+        front[front == self.capacity] = 0
+        self.front[numbers] = front
+        self.length[numbers] -= 1
+        return values
+
+    # The front items of queues in each of rows, which must not be empty
+    def peek(self, rows, queues):
+        numbers = self.numbers(rows, queues)
+        positions = self.front[numbers] + numbers * self.capacity
+        return [items[positions] for items in self.items]
+
+    # Sets field of the items offsets places behind the front of queues in each of rows to
+    # values. The items must be in the queues
+    def put(self, rows, queues, offsets, field, values):
+        numbers = self.numbers(rows, queues)
+        positions = self.front[numbers] + offsets
+        positions[positions >= self.capacity] -= self.capacity
+        self.items[field][positions + numbers * self.capacity] = values
+
+# Many replications of the 14St, Atlantic Dr intersection simulation advanced in lockstep.
+# Replications do not depend on each other, so instead of running their events one Python
+# call at a time, every step executes the next event of every replication at once: the state
+# of replication i is row i of NumPy arrays, and each handler is a handful of array
+# operations over the replications whose next event is of its kind. The layout tables of
+# Simulation are compiled to arrays indexed by event type, so the model is the same, but the
+# random numbers come from one generator shared by the batch, so the results match those of
+# Simulation in distribution rather than run for run
+class LockstepSimulation:
+    # Event kinds, and the columns of the future event arrays holding the pending arrival
+    # and the pending light change. The next departure of each movement follows them
+    ARRIVAL = 0
+    MOVEMENT = 1
+    LIGHT_CHANGE = 2
+    ARRIVAL_COLUMN = 0
+    LIGHT_COLUMN = 1
+
+    # Number of items each lane queue and departure queue of each replication has room for
+    # to start with
+    QUEUE_BLOCK = 64
+
+    # Turns in the order of the turn index drawn by let_in
+    TURNS = ('straight', 'left', 'right')
+
+    # Parameters of Simulation that a lockstep run cannot honour
+    UNSUPPORTED = ('DB', 'QueueCapacity', 'SaveSnapshot', 'LoadSnapshot')
+
+    # replications replications of the simulation with parameters, any of the keyword
+    # arguments of Simulation. Seed seeds the generator shared by the batch
+    def __init__(self, replications, **parameters):
+        if replications < 1:
+            raise ValueError("Number of replications must be at least 1, got %r" % (replications,))
+        for name in self.UNSUPPORTED:
+            if parameters.get(name):
+                raise ValueError("%s is not supported by the lockstep simulation" % name)
+        self.replications = replications
+        # The model supplies the parameters and the compiled layout tables
+        self.model = Simulation(**parameters)
+        self.compile_tables()
+        self.reset()
+
+    ###### Layout tables as arrays indexed by event type or turn choice
+    def compile_tables(self):
+        model = self.model
+        event_types = max(value for name, value in vars(EventType).items() if not name.startswith('__')) + 1
+        self.lanes = len(model.LANES)
+        self.lane_means = numpy.array([getattr(model, name) for name in model.LANE_MEAN_ARRIVALS])
+        self.lane_arrivals = numpy.array(model.LANE_ARRIVALS_TL if model.TrafficLight else model.LANE_ARRIVALS)
+
+        # Turn choices, numbered in the order met
+        self.choice_ids = {}
+        choices = []
+        def choice_id(name):
+            if name not in self.choice_ids:
+                self.choice_ids[name] = len(choices)
+                compiled = model.compile_turn_choice(name)
+                choices.append([compiled[turn] for turn in self.TURNS])
+            return self.choice_ids[name]
+
+        self.kind = numpy.full(event_types, -1, dtype=int)
+        self.event_lane = numpy.full(event_types, -1, dtype=int)
+        self.arrival_choice = numpy.zeros(event_types, dtype=int)
+        self.move_freed = numpy.zeros(event_types, dtype=int)
+        self.light_fourteenth_green = numpy.zeros(event_types, dtype=bool)
+        self.light_next = numpy.zeros(event_types, dtype=int)
+        self.light_duration = numpy.zeros(event_types)
+        self.apply_all = numpy.zeros(event_types, dtype=bool)
+
+        for event_type, (lane, traffic_light, choice) in model.ARRIVALS.items():
+            self.kind[event_type] = self.ARRIVAL
+            self.event_lane[event_type] = model.LANES.index(lane)
+            self.arrival_choice[event_type] = choice_id(choice)
+        rules = {}
+        # Movements are numbered, and movement m is column 2 + m of the future event arrays
+        self.movements = numpy.array(sorted(model.MOVEMENTS))
+        self.movement_index = numpy.full(event_types, -1, dtype=int)
+        self.movement_index[self.movements] = numpy.arange(len(self.movements))
+        self.lane_movements = numpy.array([[model.MOVEMENTS[movement][0] == lane for movement in self.movements]
+                                           for lane in model.LANES])
+        for event_type, (lane, duration, freed, movement_rules) in model.MOVEMENTS.items():
+            self.kind[event_type] = self.MOVEMENT
+            self.event_lane[event_type] = model.LANES.index(lane)
+            self.move_freed[event_type] = model.zone_mask(freed)
+            rules[event_type] = movement_rules
+        for event_type, (fourteenth_green, next_change, duration, light_rules) in model.LIGHT_CHANGES.items():
+            self.kind[event_type] = self.LIGHT_CHANGE
+            self.light_fourteenth_green[event_type] = fourteenth_green
+            self.light_next[event_type] = next_change
+            self.light_duration[event_type] = getattr(model, duration)
+            self.apply_all[event_type] = True
+            rules[event_type] = light_rules
+
+        # Rule k of an event type: kind 0 for none, 1 for serve and 2 for coin, then the
+        # fields of a serve rule (lane, movement, its duration, zones occupied, light phase
+        # or -1, bitmask of lanes that must be empty) or of a coin rule (lane and turn
+        # choice for heads and for tails)
+        rule_count = max(len(event_rules) for event_rules in rules.values())
+        shape = (event_types, rule_count)
+        self.rule_kind = numpy.zeros(shape, dtype=int)
+        self.rule_lane = numpy.zeros(shape, dtype=int)
+        self.rule_movement = numpy.zeros(shape, dtype=int)
+        self.rule_duration = numpy.zeros(shape)
+        self.rule_occupied = numpy.zeros(shape, dtype=int)
+        self.rule_phase = numpy.zeros(shape, dtype=int)
+        self.rule_empty = numpy.zeros(shape, dtype=int)
+        self.coin_lanes = numpy.zeros(shape + (2,), dtype=int)
+        self.coin_choices = numpy.zeros(shape + (2,), dtype=int)
+        for event_type, event_rules in rules.items():
+            for index, rule in enumerate(event_rules):
+                if rule[0] == 'serve':
+                    kind, lane, movement, occupied, phase, empty_lanes = rule
+                    self.rule_kind[event_type, index] = 1
+                    self.rule_lane[event_type, index] = model.LANES.index(lane)
+                    self.rule_movement[event_type, index] = movement
+                    self.rule_duration[event_type, index] = getattr(model, model.MOVEMENTS[movement][1])
+                    self.rule_occupied[event_type, index] = model.zone_mask(occupied)
+                    self.rule_phase[event_type, index] = -1 if phase is None else phase
+                    self.rule_empty[event_type, index] = sum(1 << model.LANES.index(other) for other in empty_lanes)
+                else:
+                    kind, heads_lane, heads_choice, tails_lane, tails_choice = rule
+                    self.rule_kind[event_type, index] = 2
+                    self.coin_lanes[event_type, index] = (model.LANES.index(heads_lane),
+                                                          model.LANES.index(tails_lane))
+                    self.coin_choices[event_type, index] = (choice_id(heads_choice), choice_id(tails_choice))
+
+        # Entry for each turn choice and turn: zones required, light phase or -1, movement,
+        # its duration and zones occupied
+        self.choice_required = numpy.array([[entry[0] for entry in choice] for choice in choices])
+        self.choice_phase = numpy.array([[-1 if entry[1] is None else entry[1] for entry in choice]
+                                         for choice in choices])
+        self.choice_movement = numpy.array([[entry[2] for entry in choice] for choice in choices])
+        self.choice_duration = numpy.array([[entry[3] for entry in choice] for choice in choices])
+        self.choice_occupied = numpy.array([[entry[4] for entry in choice] for choice in choices])
+        self.lane_bits = 1 << numpy.arange(self.lanes)
+
+    # Puts every replication back to an empty intersection at time 0. If seed is given it
+    # replaces the seed parameter first
+    def reset(self, seed=None):
+        if seed is not None:
+            self.model.Seed = seed
+        replications = self.replications
+        self.random = numpy.random.RandomState(self.model.Seed)
+        self.EndTime = self.model.SimulationDuration
+        self.now = numpy.zeros(replications)
+
+        # Next events, one row per replication: the pending arrival, the pending light change,
+        # then the next departure of each movement. A column with no event has time infinity.
+        # Each event has the sequence number it was scheduled with, so that events at the same
+        # time run in the order the engine runs them, latest scheduled first
+        columns = 2 + len(self.movements)
+        self.event_time = numpy.full((replications, columns), numpy.inf)
+        self.event_sequence = numpy.zeros((replications, columns), dtype=int)
+        self.event_type = numpy.zeros((replications, columns), dtype=int)
+        self.event_type[:, 2:] = self.movements
+        self.sequence = numpy.zeros(replications, dtype=int)
+
+        # Departures pending for each movement, as (time, sequence number). A movement takes a
+        # fixed time, so its departures are scheduled in time order and only the first of them
+        # needs to be among the next events
+        self.departures = RingBuffers(replications, len(self.movements), self.QUEUE_BLOCK, (float, int))
+        self.executed_count = numpy.zeros(replications, dtype=int)
+        self.cancelled_count = numpy.zeros(replications, dtype=int)
+
+        # State of the intersection
+        self.fourteenth_green = numpy.ones(replications, dtype=bool)
+        self.zones_occupied = numpy.zeros(replications, dtype=int)
+
+        # Lane queues hold the arrival times of the cars and the times they were let in, as
+        # Simulation works them out
+        self.queues = RingBuffers(replications, self.lanes, self.QUEUE_BLOCK, (float, float))
+        self.queue_length = self.queues.lengths()
+
+        # Statistics, with the delays accumulated as in RunningStatistics
+        self.arrival_count = numpy.zeros((replications, self.lanes), dtype=int)
+        self.delay_count = numpy.zeros((replications, self.lanes), dtype=int)
+        self.delay_mean = numpy.zeros((replications, self.lanes))
+        self.delay_sum_squared_deviations = numpy.zeros((replications, self.lanes))
+
+        # The first light change and the first arrival of every replication
+        everyone = numpy.arange(replications)
+        self.schedule(everyone, self.LIGHT_COLUMN, numpy.full(replications, float(self.model.GreenLightDuration)),
+                      numpy.full(replications, EventType._14_LIGHT_TURNS_RED))
+        self.schedule_arrival(everyone)
+
+    ###### Future events
+    def schedule(self, rows, column, timestamps, event_types):
+        self.event_time[rows, column] = timestamps
+        self.event_sequence[rows, column] = self.sequence[rows]
+        self.event_type[rows, column] = event_types
+        self.sequence[rows] += 1
+
+    # Schedules the next arrival of each of rows, in the lane drawn from the lane weights
+    def schedule_arrival(self, rows):
+        lanes = self.model.LaneTable.sample_batch(self.random.random_sample(len(rows)))
+        timestamps = self.now[rows] + self.random.exponential(self.lane_means[lanes])
+        self.schedule(rows, self.ARRIVAL_COLUMN, timestamps, self.lane_arrivals[lanes])
+
+    # Departures under way for lanes in each of rows, those of the movements out of the lane
+    def lane_departures(self, rows, lanes):
+        return (self.departures.lengths()[rows] * self.lane_movements[lanes]).sum(axis=1)
+
+    # Schedules a movement of the car at the front of its lane in each of rows, at the back
+    # of the departures of the movement, making it the next event of the movement if there
+    # was none. It lets in the first car of the lane not yet let in, if there is one
+    def schedule_departure(self, rows, timestamps, movements):
+        indices = self.movement_index[movements]
+        lanes = self.event_lane[movements]
+        departing = self.lane_departures(rows, lanes)
+        waiting = departing < self.queue_length[rows, lanes]
+        self.queues.put(rows[waiting], lanes[waiting], departing[waiting], 1, self.now[rows[waiting]])
+        sequences = self.sequence[rows]
+        first = self.departures.length[self.departures.numbers(rows, indices)] == 0
+        self.departures.push(rows, indices, (timestamps, sequences))
+        self.sequence[rows] += 1
+        columns = 2 + indices[first]
+        self.event_time[rows[first], columns] = timestamps[first]
+        self.event_sequence[rows[first], columns] = sequences[first]
+
+    # Removes the departure of the movement in column of each of rows that has just become
+    # the current event, bringing the next departure of the movement forward
+    def next_departure(self, rows, columns):
+        indices = columns - 2
+        self.departures.pop(rows, indices)
+        more = self.departures.length[self.departures.numbers(rows, indices)] > 0
+        rows = rows[more]
+        indices = indices[more]
+        self.event_time[rows, 2 + indices], self.event_sequence[rows, 2 + indices] = \
+            self.departures.peek(rows, indices)
+
+    # Cancels the departures still pending for lanes in each of rows, whose queues are now
+    # empty. They stay in the departure queues but not among the next events, so that a car
+    # arriving before they are due can bring them back, as the engine uncancels them
+    def cancel_departures(self, rows, lanes):
+        cancelled = self.departures.lengths()[rows] * self.lane_movements[lanes]
+        self.cancelled_count[rows] += cancelled.sum(axis=1)
+        times = self.event_time[rows, 2:]
+        times[cancelled > 0] = numpy.inf
+        self.event_time[rows, 2:] = times
+
+    # Brings back the cancelled departures of lanes in each of rows, which a car is arriving
+    # to, dropping those that came due, and would have run, while the lane was empty
+    def resume_departures(self, rows, lanes):
+        lengths = self.departures.lengths()
+        positions, indices = numpy.nonzero((lengths[rows] > 0) & self.lane_movements[lanes])
+        rows = rows[positions]
+        arrival_sequences = self.event_sequence[rows, self.ARRIVAL_COLUMN]
+        while len(rows):
+            times, sequences = self.departures.peek(rows, indices)
+            now = self.now[rows]
+            due = (times < now) | ((times == now) & (sequences > arrival_sequences))
+            resumed = ~due
+            self.event_time[rows[resumed], 2 + indices[resumed]] = times[resumed]
+            self.event_sequence[rows[resumed], 2 + indices[resumed]] = sequences[resumed]
+            numpy.subtract.at(self.cancelled_count, rows[resumed], lengths[rows[resumed], indices[resumed]])
+            rows, indices, arrival_sequences = rows[due], indices[due], arrival_sequences[due]
+            self.departures.pop(rows, indices)
+            more = lengths[rows, indices] > 0
+            rows, indices, arrival_sequences = rows[more], indices[more], arrival_sequences[more]
+
+    ###### Event handlers, each for the rows whose next event is of its kind
+    def green(self, rows, phases):
+        return (phases < 0) | (self.fourteenth_green[rows] == (phases == 0))
+
+    # Lets the car at the front of lanes into the intersection in each of rows if the turn
+    # it makes is allowed by its turn choice
+    def let_in(self, rows, lanes, choices):
+        uniforms = self.random.random_sample(len(rows))
+        turns = (uniforms >= 0.5).astype(int) + (uniforms >= 0.75)
+        required = self.choice_required[choices, turns]
+        phases = self.choice_phase[choices, turns]
+        allowed = ((self.zones_occupied[rows] & required) == 0) & self.green(rows, phases)
+        rows = rows[allowed]
+        choices = choices[allowed]
+        turns = turns[allowed]
+        self.zones_occupied[rows] |= self.choice_occupied[choices, turns]
+        self.schedule_departure(rows, self.now[rows] + self.choice_duration[choices, turns],
+                                self.choice_movement[choices, turns])
+
+    # Applies the rules of event_types, all that apply or only the first as the event type
+    # says
+    def apply_rules(self, rows, event_types):
+        done = numpy.zeros(len(rows), dtype=bool)
+        apply_all = self.apply_all[event_types]
+        nonempty = (self.queue_length[rows] > 0).dot(self.lane_bits)
+        for index in xrange(self.rule_kind.shape[1]):
+            kinds = numpy.where(done, 0, self.rule_kind[event_types, index])
+            serve = numpy.flatnonzero(kinds == 1)
+            if len(serve):
+                types = event_types[serve]
+                serve_rows = rows[serve]
+                lanes = self.rule_lane[types, index]
+                applies = (self.queue_length[serve_rows, lanes] > 0) & \
+                          self.green(serve_rows, self.rule_phase[types, index]) & \
+                          ((nonempty[serve] & self.rule_empty[types, index]) == 0)
+                serve = serve[applies]
+                types = types[applies]
+                serve_rows = serve_rows[applies]
+                self.zones_occupied[serve_rows] |= self.rule_occupied[types, index]
+                self.schedule_departure(serve_rows, self.now[serve_rows] + self.rule_duration[types, index],
+                                        self.rule_movement[types, index])
+                done[serve] = ~apply_all[serve]
+            coin = numpy.flatnonzero(kinds == 2)
+            if len(coin):
+                types = event_types[coin]
+                tails = (self.random.random_sample(len(coin)) >= 0.5).astype(int)
+                lanes = self.coin_lanes[types, index, tails]
+                choices = self.coin_choices[types, index, tails]
+                waiting = self.queue_length[rows[coin], lanes] > 0
+                self.let_in(rows[coin][waiting], lanes[waiting], choices[waiting])
+                done[coin] = ~apply_all[coin]
+            if done.all():
+                return
+
+    def cars_arrive(self, rows, event_types):
+        lanes = self.event_lane[event_types]
+        empty = self.queue_length[rows, lanes] == 0
+        self.resume_departures(rows[empty], lanes[empty])
+        # A car with fewer cars ahead of it than departures under way is let in as it arrives
+        let_in = self.queue_length[rows, lanes] < self.lane_departures(rows, lanes)
+        self.queues.push(rows, lanes, (self.now[rows], numpy.where(let_in, self.now[rows], numpy.nan)))
+        self.arrival_count[rows, lanes] += 1
+        # Schedule another arrival if there is still time
+        self.schedule_arrival(rows[self.now[rows] < self.EndTime])
+        self.let_in(rows, lanes, self.arrival_choice[event_types])
+
+    def cars_move(self, rows, event_types):
+        lanes = self.event_lane[event_types]
+        # Already handled
+        waiting = self.queue_length[rows, lanes] > 0
+        rows = rows[waiting]
+        event_types = event_types[waiting]
+        lanes = lanes[waiting]
+        arrival_times, let_in_times = self.queues.pop(rows, lanes)
+        emptied = self.queue_length[rows, lanes] == 0
+        self.cancel_departures(rows[emptied], lanes[emptied])
+
+        # The car waited from its arrival until it was let in
+        delays = let_in_times - arrival_times
+        count = self.delay_count[rows, lanes] + 1
+        mean = self.delay_mean[rows, lanes]
+        deviations = delays - mean
+        mean = mean + deviations / count
+        self.delay_count[rows, lanes] = count
+        self.delay_mean[rows, lanes] = mean
+        self.delay_sum_squared_deviations[rows, lanes] += deviations * (delays - mean)
+
+        self.zones_occupied[rows] &= ~self.move_freed[event_types]
+        self.apply_rules(rows, event_types)
+
+    def lights_change(self, rows, event_types):
+        self.fourteenth_green[rows] = self.light_fourteenth_green[event_types]
+        # Need to schedule the next light change if there is still time
+        more = self.now[rows] < self.EndTime
+        later = rows[more]
+        self.schedule(later, self.LIGHT_COLUMN, self.now[later] + self.light_duration[event_types[more]],
+                      self.light_next[event_types[more]])
+        self.apply_rules(rows, event_types)
+
+    # Runs every replication until its future events run out, or until the simulation
+    # duration unless Drain is set, or until MaxEvents events or WallclockBudget seconds
+    def run(self):
+        until_time = numpy.inf if self.model.Drain else self.EndTime
+        max_events = self.model.MaxEvents
+        deadline = time.time() + self.model.WallclockBudget if self.model.WallclockBudget else None
+        handlers = {self.ARRIVAL: self.cars_arrive, self.MOVEMENT: self.cars_move,
+                    self.LIGHT_CHANGE: self.lights_change}
+        everyone = numpy.arange(self.replications)
+        while deadline is None or time.time() < deadline:
+            # The next event of each row is the latest scheduled of those at the earliest time.
+            # Rows with more than one event at that time are rare, so they are looked at apart
+            columns = self.event_time.argmin(axis=1)
+            next_time = self.event_time[everyone, columns]
+            tied = numpy.flatnonzero((self.event_time == next_time[:, None]).sum(axis=1) > 1)
+            if len(tied):
+                columns[tied] = numpy.where(self.event_time[tied] == next_time[tied, None],
+                                            self.event_sequence[tied], -1).argmax(axis=1)
+            active = (next_time < numpy.inf) & (next_time <= until_time)
+            if max_events:
+                active &= self.executed_count < max_events
+            rows = numpy.flatnonzero(active)
+            if not len(rows):
+                break
+            times = next_time[rows]
+            columns = columns[rows]
+            event_types = self.event_type[rows, columns]
+            self.event_time[rows, columns] = numpy.inf
+            departing = columns >= 2
+            if departing.any():
+                self.next_departure(rows[departing], columns[departing])
+            self.now[rows] = times
+            self.executed_count[rows] += 1
+            kinds = self.kind[event_types]
+            for kind, handler in handlers.items():
+                selected = kinds == kind
+                if selected.any():
+                    handler(rows[selected], event_types[selected])
+
+    # The parameters and statistics of each replication, as lines of the experiment results
+    # files
+    def statistics_rows(self):
+        model = self.model
+        return [[model.n14e_mean_arrival, model.n_atlantic_s_mean_arrival, model.TrafficLight,
+                 model.GreenLightDuration, model.RedLightDuration] + self.arrival_count[row].tolist() +
+                self.delay_mean[row].tolist() for row in xrange(self.replications)]
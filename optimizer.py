@@ -0,0 +1,207 @@
+import argparse
+import math
+import sys
+import time
+from intersection_simulation import check_arg, simulation_parameters
+from replication import replication_seeds, run_tasks
+from result_cache import add_cache_arguments, open_cache
+from result_sink import ResultSink, add_format_argument
+from running_statistics import RunningStatistics
+from sweep import parse_values
+
+# Columns of the statistics rows with the number of cars and the average wait of each lane
+CARS_COLUMNS = range(5, 11)
+WAIT_COLUMNS = range(11, 17)
+
+# Creating optional flag arguments for the optimizer. Any other flags are the simulation flags
+# of intersection_simulation.py and set the parameters that are not searched
+def check_optimizer_arg(args=None):
+    parser = argparse.ArgumentParser(description='Searches the light timings for the one with the least weighted '
+                                                 'average wait, by successive halving: every timing is run a few '
+                                                 'replications, the worst are dropped, and the rest are run more, '
+                                                 'until one is left. The other flags of intersection_simulation.py '
+                                                 'set the parameters not searched, and -s the seed the replication '
+                                                 'seeds are drawn from')
+    parser.add_argument('-g', '--greenlighttime',
+                        help='Lengths of time 14th street light is green to search, comma separated or '
+                             'start:stop:step, default is 20:60:5',
+                        default='20:60:5')
+    parser.add_argument('-r', '--redlighttime',
+                        help='Lengths of time 14th street light is red to search, comma separated or '
+                             'start:stop:step, default is 10:40:5',
+                        default='10:40:5')
+    add_weights_argument(parser)
+    parser.add_argument('-R', '--replications',
+                        help='Number of replications of every timing in the first round, default is 4',
+                        default='4')
+    parser.add_argument('-H', '--halving',
+                        help='Each round keeps the best 1 in this many timings and runs this many times as many '
+                             'replications of each, default is 3',
+                        default='3')
+    parser.add_argument('-F', '--final',
+                        help='Least number of replications of the best timing and of the runner-up the result is '
+                             'given from, default is 50',
+                        default='50')
+    parser.add_argument('-C', '--confidence',
+                        help='Confidence level of the bounds given with the result, default is 0.95',
+                        default='0.95')
+    parser.add_argument('-j', '--processes',
+                        help='Number of processes to run the replications in, 0 for one per core, default is 0',
+                        default='0')
+    parser.add_argument('-o', '--output',
+                        help='Results file a line for every timing searched is written to, default is '
+                             'ExperimentResults/optimize.csv',
+                        default='ExperimentResults/optimize.csv')
+    add_cache_arguments(parser)
+    add_format_argument(parser)
+    results, simulation_args = parser.parse_known_args(args)
+    halving = int(results.halving)
+    if halving < 2:
+        raise ValueError("Halving must keep fewer timings each round, got %d" % halving)
+    return ([(green, red) for green in parse_values(results.greenlighttime, int)
+             for red in parse_values(results.redlighttime, int)],
+            parse_weights(results.weights),
+            int(results.replications),
+            halving,
+            int(results.final),
+            float(results.confidence),
+            int(results.processes),
+            results.output,
+            results.format,
+            (results.cache, float(results.cachesize)),
+            simulation_args)
+
+# Adds the flag that sets the weights of the objective to parser
+def add_weights_argument(parser):
+    parser.add_argument('-y', '--weights',
+                        help='Comma separated weights of the average waits of the lanes n14e, s14e, en14w, es14w, '
+                             'n_atlantic_s and s_atlantic_n in the objective, or cars to weight them by the number '
+                             'of cars, which makes the objective the average wait of a car. Default is cars',
+                        default='cars')
+
+# Weights of the objective from the value of the weights flag, None for cars
+def parse_weights(text):
+    if text == 'cars':
+        return None
+    weights = [float(weight) for weight in text.split(',')]
+    if len(weights) != 6:
+        raise ValueError("Expected 6 lane weights, got %d" % len(weights))
+    return weights
+
+# Objective of a replication from its statistics row: the average waits of the lanes weighted
+# by weights, or the average wait of a car if weights is None
+def objective(row, weights=None):
+    waits = [row[column] for column in WAIT_COLUMNS]
+    if weights is None:
+        cars = [row[column] for column in CARS_COLUMNS]
+        if not sum(cars):
+            return 0.0
+        return sum(count * wait for count, wait in zip(cars, waits)) / float(sum(cars))
+    return sum(weight * wait for weight, wait in zip(weights, waits))
+
+# Mean and confidence interval half-width of values
+def interval(values, confidence=0.95):
+    statistics = RunningStatistics()
+    for value in values:
+        statistics.add(value)
+    return statistics.mean, statistics.half_width(confidence)
+
+# Runs every timing in run, a (green, red) pair with the traffic light on in parameters, up
+# to count replications with seeds, all in one pool, taking those it can from cache. The
+# objectives of the replications are appended to those of each timing in objectives
+def run_timings(parameters, objectives, seeds, run, count, weights=None, processes=0, cache=None):
+    tasks = []
+    owners = []
+    for timing in run:
+        green, red = timing
+        for replication_seed in seeds[len(objectives[timing]):count]:
+            tasks.append((dict(parameters, GreenLightDuration=green, RedLightDuration=red), replication_seed))
+            owners.append(timing)
+    for timing, row in zip(owners, run_tasks(tasks, processes, cache)):
+        objectives[timing].append(objective(row, weights))
+
+# Searches timings, (green, red) pairs, for the least mean objective by successive halving.
+# Every timing starts with replications replications; each round keeps the best 1 in halving
+# and runs halving times as many replications of each, until one is left. All timings use the
+# same seeds in the same order, drawn from seed, so they are compared under common random
+# numbers and a timing kept for the next round only runs the seeds it has not yet run. The
+# best timing and the runner-up of the last round end with at least final replications.
+# Returns the objectives of the replications of each timing, and the timings from best to worst
+def successive_halving(parameters, timings, weights=None, replications=4, halving=3, final=50, processes=0,
+                       seed=None, cache=None):
+    parameters = dict(parameters, TrafficLight=True)
+    parameters.pop('Seed', None)
+    rounds = int(math.ceil(math.log(len(timings), halving))) if len(timings) > 1 else 0
+    seeds = replication_seeds(seed, max(replications * halving ** rounds, final))
+    objectives = dict((timing, []) for timing in timings)
+
+    def extend(run, count):
+        run_timings(parameters, objectives, seeds, run, count, weights, processes, cache)
+
+    def mean(timing):
+        return sum(objectives[timing]) / len(objectives[timing])
+
+    # Timings in the order they were dropped, the last ones dropped first
+    dropped = []
+    surviving = list(timings)
+    count = replications
+    while len(surviving) > 1:
+        extend(surviving, count)
+        surviving.sort(key=mean)
+        kept = max(1, int(math.ceil(len(surviving) / float(halving))))
+        if kept == 1:
+            # The runner-up is run as long as the best, so they can be compared, and the more
+            # replications decide which of them is best
+            extend(surviving[:2], max(count, final))
+            surviving[:2] = sorted(surviving[:2], key=mean)
+        dropped = surviving[kept:] + dropped
+        surviving = surviving[:kept]
+        count *= halving
+    extend(surviving, max(replications, final))
+    return objectives, surviving + dropped
+
+# Runs the search with the values passed in with flags, prints the best timing with its
+# bounds, and writes a line for every timing searched
+def optimize(args=None):
+    timings, weights, replications, halving, final, confidence, processes, output, output_format, cache, \
+        simulation_args = check_optimizer_arg(args)
+    parameters = simulation_parameters(check_arg(simulation_args))
+    if parameters['SaveSnapshot']:
+        raise ValueError("The optimizer cannot save a snapshot, each replication would overwrite the others")
+    if parameters['LoadSnapshot']:
+        raise ValueError("The optimizer cannot load a snapshot, its timings would all carry on from one warm-up")
+    cache = open_cache(*cache, seeded=parameters['Seed'] is not None)
+
+    start_time = time.time()
+    objectives, ranking = successive_halving(parameters, timings, weights, replications, halving, final, processes,
+                                             parameters['Seed'], cache)
+    end_time = time.time()
+    if cache is not None:
+        cache.close()
+
+    sink = ResultSink(output, output_format, ('14 Green Light', '14 Red Light', 'Replications', 'Objective',
+                                              'Half Width'), 'w')
+    for timing in ranking:
+        sink.write(timing + (len(objectives[timing]),) + interval(objectives[timing], confidence))
+    sink.close()
+
+    total = sum(len(values) for values in objectives.values())
+    best = ranking[0]
+    mean, half_width = interval(objectives[best], confidence)
+    print '%d timings searched with %d replications in %f seconds (%d for a full grid of %d each), results ' \
+          'written to %s' % (len(timings), total, end_time - start_time, len(timings) * len(objectives[best]),
+                             len(objectives[best]), output)
+    print 'Best timing: green %d, red %d' % best
+    print '    Objective: %f +- %f (%g%% confidence, %d replications)' % (mean, half_width, 100 * confidence,
+                                                                        len(objectives[best]))
+    if len(ranking) > 1:
+        runner_up = ranking[1]
+        # Both ran the same seeds, so the paired differences cancel most of the noise
+        differences = [value - other for value, other in zip(objectives[runner_up], objectives[best])]
+        difference, difference_half_width = interval(differences, confidence)
+        print 'Runner-up: green %d, red %d' % runner_up
+        print '    Objective above the best by %f +- %f (%g%% confidence)' % (difference, difference_half_width,
+                                                                             100 * confidence)
+
+if __name__ == '__main__':
+    optimize(sys.argv[1:])
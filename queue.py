@@ -1,15 +1,113 @@
+from array import array
+from collections import deque
+
+# First in, first out queue. Items are kept in a deque, whose append, popleft and length
+# are all O(1) however long the queue gets (the deque keeps its length as a counter)
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()
+
+    def isEmpty(self):
+        return not self.items
+
+    def enqueue(self, item):
+        self.items.append(item)
+
+    def dequeue(self):
+        return self.items.popleft()
+
+    # The item index places behind the front, left in the queue
+    def peek(self, index=0):
+        return self.items[index]
+
+    def size(self):
+        return len(self.items)
+
+# First in, first out queue of numbers, stored in an array of type typecode, e.g. 'l' for
+# integers, so an item takes the size of one number (8 bytes for 'l' on 64-bit Linux) rather
+# than a list or deque slot and the object it points to. Dequeued items stay in front of the
+# index of the front item until they make up half the array, when they are dropped all at
+# once, so the array is at most twice the queue and every operation is O(1) amortized
+class TypedQueue:
+    def __init__(self, typecode):
+        self.items = array(typecode)
+        self.front = 0
 
     def isEmpty(self):
-        return self.items == []
+        return self.front == len(self.items)
 
     def enqueue(self, item):
-        self.items.insert(0,item)
+        self.items.append(item)
 
     def dequeue(self):
-        return self.items.pop()
+        items = self.items
+        front = self.front
+        if front == len(items):
+            raise IndexError("dequeue from an empty queue")
+        item = items[front]
+        front += 1
+        if front + front >= len(items):
+            del items[:front]
+            front = 0
+        self.front = front
+        return item
+
+    # The item index places behind the front, left in the queue
+    def peek(self, index=0):
+        return self.items[self.front + index]
+
+    def size(self):
+        return len(self.items) - self.front
+
+# Queue holding at most capacity items, all of whose storage is allocated up front. Items are
+# kept in a ring buffer: a list used circularly from the index of the front item, with the
+# number of items kept as a counter. If typecode is given the items are numbers stored in an
+# array of that type instead of a list, e.g. 'l' for integers, at the size of one number per
+# slot whether or not it holds an item
+class FixedCapacityQueue:
+    def __init__(self, capacity, typecode=None):
+        if capacity < 1:
+            raise ValueError("Queue capacity must be at least 1, got %r" % (capacity,))
+        self.capacity = capacity
+        if typecode is None:
+            self.items = [None] * capacity
+        else:
+            self.items = array(typecode, [0]) * capacity
+        self.typed = typecode is not None
+        self.front = 0
+        self.count = 0
+
+    def isEmpty(self):
+        return self.count == 0
+
+    def enqueue(self, item):
+        if self.count == self.capacity:
+            raise IndexError("enqueue onto a full queue of capacity %d" % self.capacity)
+        position = self.front + self.count
+        if position >= self.capacity:
+            position -= self.capacity
+        self.items[position] = item
+        self.count += 1
+
+    def dequeue(self):
+        if self.count == 0:
+            raise IndexError("dequeue from an empty queue")
+        front = self.front
+        item = self.items[front]
+        # Drop the reference so a dequeued item can be freed
+        if not self.typed:
+            self.items[front] = None
+        front += 1
+        self.front = front if front < self.capacity else 0
+        self.count -= 1
+        return item
+
+    # The item index places behind the front, left in the queue
+    def peek(self, index=0):
+        position = self.front + index
+        if position >= self.capacity:
+            position -= self.capacity
+        return self.items[position]
 
     def size(self):
-        return len(self.items)
\ No newline at end of file
+        return self.count
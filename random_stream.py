@@ -0,0 +1,123 @@
+from numpy import random
+
+# Source of the random variates used by the simulation. Calling NumPy for one variate at a
+# time costs far more than the arithmetic, so variates are generated in large NumPy blocks
+# and handed out one at a time, refilling a block when it runs out
+class RandomStream:
+    BLOCK_SIZE = 4096
+
+    # seed is an integer, or None to seed from the system
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.seed(seed)
+
+    # Restarts the stream from seed. Exponential, uniform and discrete variates come from
+    # separate generators, all derived from seed, so each sequence depends only on the seed
+    # and not on how calls for the different kinds are interleaved
+    def seed(self, seed=None):
+        seed_generator = random.RandomState(seed)
+        exponential_seed, uniform_seed, discrete_seed = seed_generator.randint(0, 2 ** 31 - 1, size=3)
+        self.exponential_generator = random.RandomState(exponential_seed)
+        self.uniform_generator = random.RandomState(uniform_seed)
+        self.discrete_generator = random.RandomState(discrete_seed)
+        self.exponential_block = []
+        self.exponential_index = 0
+        self.uniform_block = []
+        self.uniform_index = 0
+        # Discrete variates are drawn from the uniforms in discrete_uniforms through the alias
+        # table in discrete_table. The indices in discrete_block are only valid for that table
+        self.discrete_uniforms = None
+        self.discrete_table = None
+        self.discrete_block = []
+        self.discrete_index = 0
+        # Generator states from just before the current blocks were generated, so the
+        # stream state can be saved without saving the blocks themselves
+        self.exponential_block_state = self.exponential_generator.get_state()
+        self.uniform_block_state = self.uniform_generator.get_state()
+        self.discrete_block_state = self.discrete_generator.get_state()
+
+    # Exponentially distributed random number with the mean provided
+    def exponential(self, mean):
+        index = self.exponential_index
+        if index == len(self.exponential_block):
+            self.fill_exponential_block()
+            index = 0
+        self.exponential_index = index + 1
+        return mean * self.exponential_block[index]
+
+    # Uniformly distributed random number [0, 1)
+    def uniform(self):
+        index = self.uniform_index
+        if index == len(self.uniform_block):
+            self.fill_uniform_block()
+            index = 0
+        self.uniform_index = index + 1
+        return self.uniform_block[index]
+
+    # Index of an outcome drawn from the discrete distribution of the AliasTable provided.
+    # A whole block of indices is sampled at once, and sampled again from the same uniforms
+    # if a different table is passed in, so the n-th draw always uses the n-th uniform
+    def discrete(self, table):
+        if table is not self.discrete_table:
+            self.map_discrete_block(table)
+        index = self.discrete_index
+        if index == len(self.discrete_block):
+            self.fill_discrete_block()
+            index = 0
+        self.discrete_index = index + 1
+        return self.discrete_block[index]
+
+    def fill_exponential_block(self):
+        self.exponential_block_state = self.exponential_generator.get_state()
+        self.exponential_block = self.exponential_generator.standard_exponential(self.block_size).tolist()
+
+    def fill_uniform_block(self):
+        self.uniform_block_state = self.uniform_generator.get_state()
+        self.uniform_block = self.uniform_generator.random_sample(self.block_size).tolist()
+
+    def fill_discrete_block(self):
+        self.discrete_block_state = self.discrete_generator.get_state()
+        self.discrete_uniforms = self.discrete_generator.random_sample(self.block_size)
+        self.discrete_block = self.discrete_table.sample_batch(self.discrete_uniforms).tolist()
+
+    def map_discrete_block(self, table):
+        self.discrete_table = table
+        if self.discrete_uniforms is not None:
+            self.discrete_block = table.sample_batch(self.discrete_uniforms).tolist()
+
+    # Returns the complete state of the stream: the generator states the current blocks were
+    # generated from and how far through each block the stream is
+    def get_state(self):
+        return {'block_size': self.block_size,
+                'exponential_block_state': self.exponential_block_state,
+                'exponential_index': self.exponential_index,
+                'exponential_filled': len(self.exponential_block) > 0,
+                'uniform_block_state': self.uniform_block_state,
+                'uniform_index': self.uniform_index,
+                'uniform_filled': len(self.uniform_block) > 0,
+                'discrete_block_state': self.discrete_block_state,
+                'discrete_index': self.discrete_index,
+                'discrete_filled': self.discrete_uniforms is not None}
+
+    # Puts the stream back in a state returned by get_state(), regenerating the blocks. The
+    # discrete indices are sampled again on the next draw, from whichever table it uses
+    def set_state(self, state):
+        self.block_size = state['block_size']
+        self.exponential_generator.set_state(state['exponential_block_state'])
+        self.exponential_block = []
+        if state['exponential_filled']:
+            self.fill_exponential_block()
+        self.exponential_index = state['exponential_index']
+        self.uniform_generator.set_state(state['uniform_block_state'])
+        self.uniform_block = []
+        if state['uniform_filled']:
+            self.fill_uniform_block()
+        self.uniform_index = state['uniform_index']
+        self.discrete_generator.set_state(state['discrete_block_state'])
+        self.discrete_block_state = state['discrete_block_state']
+        self.discrete_uniforms = None
+        if state['discrete_filled']:
+            self.discrete_uniforms = self.discrete_generator.random_sample(self.block_size)
+        self.discrete_table = None
+        self.discrete_block = []
+        self.discrete_index = state['discrete_index']
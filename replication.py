@@ -0,0 +1,234 @@
+import argparse
+import multiprocessing
+import sys
+import time
+from numpy import random
+from intersection_simulation import Simulation, check_arg, simulation_parameters
+from lockstep import LockstepSimulation
+from result_cache import add_cache_arguments, open_cache
+from result_sink import ResultSink, add_format_argument
+from running_statistics import RunningStatistics
+
+# Creating optional flag arguments for the replication runner. Any other flags are the
+# simulation flags of intersection_simulation.py and set the parameters of every replication
+def check_replication_arg(args=None):
+    parser = argparse.ArgumentParser(description='Runs replications of the intersection simulation in parallel. '
+                                                 'The flags of intersection_simulation.py set the simulation '
+                                                 'parameters, and -s the seed the replication seeds are drawn from')
+    parser.add_argument('-R', '--replications',
+                        help='Number of replications to run, default is 100',
+                        default='100')
+    parser.add_argument('-j', '--processes',
+                        help='Number of processes to run the replications in, 0 for one per core, default is 0',
+                        default='0')
+    parser.add_argument('-o', '--output',
+                        help='Results file the statistics of the replications are appended to, default is '
+                             'ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv',
+                        default='ExperimentResults/light_g35_r13_fpoint1_a6_delay.csv')
+    parser.add_argument('-x', '--lockstep',
+                        help='Whether to advance all the replications in lockstep in one process with NumPy '
+                             'instead of running them one by one, by default is false',
+                        default='False')
+    add_sequential_arguments(parser)
+    add_cache_arguments(parser)
+    add_format_argument(parser)
+    results, simulation_args = parser.parse_known_args(args)
+    return (int(results.replications),
+            int(results.processes),
+            results.output,
+            results.format,
+            results.lockstep == "True" or results.lockstep == "T" or results.lockstep == "true" or
+            results.lockstep == "t",
+            sequential_options(results),
+            (results.cache, float(results.cachesize)),
+            simulation_args)
+
+# Columns of the statistics rows a sequential run watches by default, the average waits
+WAIT_COLUMNS = Simulation.STATISTICS_COLUMNS[11:]
+
+# Adds the flags of a sequential run, which stops once the means of the metrics are precise
+# enough, to parser
+def add_sequential_arguments(parser):
+    parser.add_argument('-p', '--precision',
+                        help='Runs replications in batches until the confidence interval of the mean of every metric '
+                             'has a half-width of at most this fraction of the mean, e.g. 0.05, and -R is then the '
+                             'most replications run. 0 runs exactly -R replications, which is the default',
+                        default='0')
+    parser.add_argument('-c', '--metrics',
+                        help='Comma separated columns of the results files whose means must reach the precision, '
+                             'default is every Avg Wait column',
+                        default=','.join(WAIT_COLUMNS))
+    parser.add_argument('-C', '--confidence',
+                        help='Confidence level of the intervals, default is 0.95',
+                        default='0.95')
+    parser.add_argument('-b', '--batch',
+                        help='Number of replications run between looks at the intervals, default is 10',
+                        default='10')
+
+# (precision, metrics, confidence, batch) from the parsed flags of add_sequential_arguments
+def sequential_options(results):
+    metrics = results.metrics.split(',')
+    unknown = [metric for metric in metrics if metric not in Simulation.STATISTICS_COLUMNS]
+    if unknown:
+        raise ValueError("Unknown metrics: %s" % ', '.join(unknown))
+    batch = int(results.batch)
+    if batch < 2:
+        raise ValueError("A batch needs at least two replications")
+    return (float(results.precision),
+            metrics,
+            float(results.confidence),
+            batch)
+
+# Seeds for replications replications, all different, drawn from a generator seeded with
+# seed (from the system if seed is None). Each seed gives a replication its own random
+# number stream, and the same seed always gives the same replications
+def replication_seeds(seed, replications):
+    seed_generator = random.RandomState(seed)
+    seeds = []
+    used = set()
+    while len(seeds) < replications:
+        replication_seed = int(seed_generator.randint(0, 2 ** 31 - 1))
+        if replication_seed not in used:
+            used.add(replication_seed)
+            seeds.append(replication_seed)
+    return seeds
+
+# Runs one replication with the simulation parameters and seed given as a pair, so it can be
+# mapped over a process pool, and returns its statistics row
+def run_replication(parameters_and_seed):
+    parameters, seed = parameters_and_seed
+    parameters = dict(parameters, Seed=seed)
+    simulation = Simulation(**parameters)
+    simulation.run()
+    return simulation.statistics_row()
+
+# Runs the replications given as (parameters, seed) pairs over a pool of processes (one per
+# core if processes is 0) and returns their statistics rows in the order of tasks. With a
+# cache, replications found in it are not run again, and those run are added to it
+def run_tasks(tasks, processes=0, cache=None):
+    if cache is None:
+        return run_uncached_tasks(tasks, processes)
+    rows = cache.get(tasks)
+    missing = [index for index, row in enumerate(rows) if row is None]
+    missing_tasks = [tasks[index] for index in missing]
+    missing_rows = run_uncached_tasks(missing_tasks, processes)
+    for index, row in zip(missing, missing_rows):
+        rows[index] = row
+    cache.put(missing_tasks, missing_rows)
+    return rows
+
+def run_uncached_tasks(tasks, processes=0):
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1 or len(tasks) <= 1:
+        return [run_replication(task) for task in tasks]
+    pool = multiprocessing.Pool(min(processes, len(tasks)))
+    try:
+        return pool.map(run_replication, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+# Runs replications replications of the simulation with parameters, keyword arguments for
+# Simulation, over a pool of processes (one per core if processes is 0). The seed in
+# parameters is only used to draw the replication seeds. Returns the statistics rows in
+# the order of the seeds
+def run_replications(parameters, replications, processes=0, seed=None, cache=None):
+    parameters = dict(parameters)
+    parameters.pop('Seed', None)
+    return run_tasks([(parameters, replication_seed) for replication_seed in replication_seeds(seed, replications)],
+                     processes, cache)
+
+# Mean and confidence interval half-width at confidence of each of the metrics, columns of
+# the statistics rows, over rows
+def confidence_intervals(rows, metrics, confidence=0.95):
+    intervals = []
+    for metric in metrics:
+        column = Simulation.STATISTICS_COLUMNS.index(metric)
+        statistics = RunningStatistics()
+        for row in rows:
+            statistics.add(row[column])
+        intervals.append((statistics.mean, statistics.half_width(confidence)))
+    return intervals
+
+# Whether the confidence intervals of the means of the metrics over rows all have a
+# half-width of at most precision times their mean
+def precise(rows, metrics, precision, confidence=0.95):
+    return all(half_width <= precision * abs(mean)
+               for mean, half_width in confidence_intervals(rows, metrics, confidence))
+
+# Runs replications of every set of simulation parameters in cells, batch at a time, until
+# the means of the metrics are precise to precision at confidence, or max_replications have
+# been run. The batches of all the cells still running share one pool of processes (one per
+# core if processes is 0), so the replications go where the variance is. Every cell uses the
+# same seeds in the same order, drawn from seed, so a cell that stops after n replications
+# has the rows of the first n. Returns the statistics rows of each cell, and the seeds drawn,
+# of which each cell ran as many as it has rows
+def run_sequential(cells, metrics, precision, confidence=0.95, batch=10, max_replications=100, processes=0,
+                   seed=None, cache=None):
+    cells = [dict(cell) for cell in cells]
+    for cell in cells:
+        cell.pop('Seed', None)
+    seeds = replication_seeds(seed, max_replications)
+    rows = [[] for cell in cells]
+    running = range(len(cells))
+    while running:
+        tasks = []
+        owners = []
+        for index in running:
+            run = len(rows[index])
+            for replication_seed in seeds[run:run + batch]:
+                tasks.append((cells[index], replication_seed))
+                owners.append(index)
+        for index, row in zip(owners, run_tasks(tasks, processes, cache)):
+            rows[index].append(row)
+        running = [index for index in running if len(rows[index]) < max_replications and
+                   not precise(rows[index], metrics, precision, confidence)]
+    return rows, seeds
+
+# Prints the confidence interval of each metric over rows, and whether they reached precision
+def print_precision(rows, metrics, precision, confidence=0.95):
+    for metric, (mean, half_width) in zip(metrics, confidence_intervals(rows, metrics, confidence)):
+        relative = half_width / abs(mean) if mean else (0.0 if half_width == 0 else float('inf'))
+        print '    %s: %f +- %f (%.1f%% of the mean, %g%% confidence)' % (metric, mean, half_width, 100 * relative,
+                                                                        100 * confidence)
+    if not precise(rows, metrics, precision, confidence):
+        print '    Precision of %g not reached within the replications allowed' % precision
+
+# Runs the replications with the values passed in with flags, and appends the statistics of
+# all of them to the results file at once
+def replication(args=None):
+    replications, processes, output, output_format, lockstep, sequential, cache, simulation_args = \
+        check_replication_arg(args)
+    precision, metrics, confidence, batch = sequential
+    parameters = simulation_parameters(check_arg(simulation_args))
+    if parameters['SaveSnapshot']:
+        raise ValueError("Replications cannot save a snapshot, each would overwrite the others")
+    if precision and lockstep:
+        raise ValueError("Replications in lockstep cannot stop at a precision, they all run at once")
+
+    # Lockstep replications share one random number generator, so no row is kept in the cache
+    cache = None if lockstep else open_cache(*cache, seeded=parameters['Seed'] is not None)
+    start_time = time.time()
+    if precision:
+        rows = run_sequential([parameters], metrics, precision, confidence, batch, replications, processes,
+                              parameters['Seed'], cache)[0][0]
+    elif lockstep:
+        simulation = LockstepSimulation(replications, **parameters)
+        simulation.run()
+        rows = simulation.statistics_rows()
+    else:
+        rows = run_replications(parameters, replications, processes, parameters['Seed'], cache)
+    end_time = time.time()
+    if cache is not None:
+        cache.close()
+
+    # The file gets a header line if it is new
+    sink = ResultSink(output, output_format, Simulation.STATISTICS_COLUMNS)
+    sink.write_rows(rows)
+    sink.close()
+    print '%d replications run in %f seconds, statistics appended to %s' % (len(rows), end_time - start_time, output)
+    if precision:
+        print_precision(rows, metrics, precision, confidence)
+
+if __name__ == '__main__':
+    replication(sys.argv[1:])
@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from intersection_simulation import Simulation
+
+# Modules whose code decides the results of a run. A change to any of them changes the model
+# version, so results of the code before it are not used
+MODEL_FILES = ('alias_table.py', 'engine.py', 'event_type.py', 'future_event_list.py', 'intersection_simulation.py',
+               'queue.py', 'random_stream.py', 'running_statistics.py')
+
+# Parameters that change what a run prints or how fast it is, but not its statistics
+OUTPUT_PARAMETERS = ('DB', 'TraceCapacity', 'FelStrategy')
+
+# Version of the model, a hash of the source of MODEL_FILES
+def model_version():
+    model_hash = hashlib.sha1()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_FILES:
+        fh = open(os.path.join(directory, name), 'rb')
+        model_hash.update(fh.read())
+        fh.close()
+    return model_hash.hexdigest()
+
+# Statistics rows of replications, kept in an SQLite database on disk under a hash of
+# everything that decides them: the full set of simulation parameters, the seed and the model
+# version. The rows take at most max_bytes, the least recently used making way for new ones
+class ResultCache:
+    SCHEMA = ('CREATE TABLE IF NOT EXISTS results ('
+              'key TEXT PRIMARY KEY, '
+              'version TEXT NOT NULL, '
+              'row TEXT NOT NULL, '
+              'size INTEGER NOT NULL, '
+              'last_used REAL NOT NULL)')
+
+    # Bytes the cached rows may take, 100 MB, about 300000 rows
+    MAX_BYTES = 100 * 1024 * 1024
+
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = model_version()
+        self.connection = sqlite3.connect(path, timeout=600)
+        self.connection.execute(self.SCHEMA)
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    # Key of a replication given as a (parameters, seed) pair, None if its results are not
+    # repeatable: it has no seed, starts from a snapshot file whose contents may change,
+    # saves one, or stops on real time
+    def key(self, task):
+        parameters, seed = task
+        parameters = dict((name, parameters.get(name, getattr(Simulation, name))) for name in Simulation.PARAMETERS
+                          if name not in OUTPUT_PARAMETERS and name != 'Seed')
+        if seed is None or parameters['LoadSnapshot'] or parameters['SaveSnapshot'] or parameters['WallclockBudget']:
+            return None
+        return hashlib.sha1(json.dumps([parameters, seed, self.version], sort_keys=True)).hexdigest()
+
+    # The cached statistics rows of the replications given as (parameters, seed) pairs, None for
+    # those not cached
+    def get(self, tasks):
+        keys = [self.key(task) for task in tasks]
+        rows = {}
+        wanted = [key for key in set(keys) if key is not None]
+        # SQLite takes at most 999 values in one statement
+        for start in xrange(0, len(wanted), 900):
+            chunk = wanted[start:start + 900]
+            rows.update(self.connection.execute('SELECT key, row FROM results WHERE key IN (%s)' %
+                                                ','.join('?' * len(chunk)), chunk).fetchall())
+        now = time.time()
+        self.connection.executemany('UPDATE results SET last_used = ? WHERE key = ?',
+                                    [(now, key) for key in rows])
+        self.connection.commit()
+        return [json.loads(rows[key]) if key in rows else None for key in keys]
+
+    # Stores the statistics rows of the replications given as (parameters, seed) pairs, then
+    # evicts the least recently used rows until the cache fits in max_bytes
+    def put(self, tasks, rows):
+        now = time.time()
+        entries = []
+        for task, row in zip(tasks, rows):
+            key = self.key(task)
+            if key is not None:
+                text = json.dumps(row)
+                entries.append((key, self.version, text, len(key) + len(text), now))
+        self.connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)', entries)
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        size = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        evicted = []
+        for key, entry_size in self.connection.execute('SELECT key, size FROM results ORDER BY last_used'):
+            if size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            size -= entry_size
+        self.connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+
+    # Removes every cached row, or only the rows of model versions other than the current one
+    # if stale
+    def invalidate(self, stale=False):
+        if stale:
+            removed = self.connection.execute('DELETE FROM results WHERE version != ?', (self.version,)).rowcount
+        else:
+            removed = self.connection.execute('DELETE FROM results').rowcount
+        self.connection.commit()
+        self.connection.execute('VACUUM')
+        return removed
+
+    # Number of cached rows and bytes they take, of the current model version and of others
+    def counts(self):
+        counts = {'rows': 0, 'bytes': 0, 'stale rows': 0, 'stale bytes': 0}
+        for current, rows, size in self.connection.execute(
+                'SELECT version = ?, COUNT(*), SUM(size) FROM results GROUP BY version = ?',
+                (self.version, self.version)):
+            prefix = '' if current else 'stale '
+            counts[prefix + 'rows'] = rows
+            counts[prefix + 'bytes'] = size
+        return counts
+
+# Opens the cache at path, or returns None if path is empty or the run is not seeded. Without a
+# seed the replication seeds are drawn at random, so their results could never be looked up again
+def open_cache(path, max_megabytes=ResultCache.MAX_BYTES / (1024 * 1024), seeded=True):
+    if not path or not seeded:
+        return None
+    return ResultCache(path, int(max_megabytes * 1024 * 1024))
+
+# Default file of the cache
+CACHE_PATH = 'ExperimentResults/cache.sqlite'
+
+# Adds the flags that choose the cache to parser
+def add_cache_arguments(parser):
+    parser.add_argument('-k', '--cache',
+                        help='SQLite file the statistics of replications are cached in, so a replication that has '
+                             'been run before with the same parameters, seed and model code is not run again. Empty '
+                             'for no cache, default is ' + CACHE_PATH,
+                        default=CACHE_PATH)
+    parser.add_argument('-K', '--cachesize',
+                        help='Megabytes the cache may take before the least recently used results are evicted, '
+                             'default is 100',
+                        default='100')
+
+# Creating optional flag arguments for managing the cache
+def check_arg(args=None):
+    parser = argparse.ArgumentParser(description='Shows how much the result cache holds, or invalidates it')
+    add_cache_arguments(parser)
+    parser.add_argument('-i', '--invalidate',
+                        help='Removes every cached result if set to all, or only the results of older model code if '
+                             'set to stale. By default nothing is removed',
+                        default='')
+    results = parser.parse_args(args)
+    if not results.cache:
+        parser.error('no cache to show or invalidate, -k must name the cache file')
+    if results.invalidate not in ('', 'all', 'stale'):
+        raise ValueError("Expected all or stale to invalidate, got %r" % results.invalidate)
+    return (results.cache,
+            float(results.cachesize),
+            results.invalidate)
+
+if __name__ == '__main__':
+    path, max_megabytes, invalidate = check_arg(sys.argv[1:])
+    cache = open_cache(path, max_megabytes)
+    if invalidate:
+        print '%d cached results removed' % cache.invalidate(invalidate == 'stale')
+    print '%(rows)d cached results of the current model (%(bytes)d bytes), %(stale rows)d of older ones ' \
+          '(%(stale bytes)d bytes)' % cache.counts()
+    cache.close()
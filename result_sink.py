@@ -0,0 +1,83 @@
+import json
+try:
+    import fcntl
+except ImportError:
+    # No file locks where there is no fcntl, e.g. Windows; one writer per file is then safe
+    fcntl = None
+
+# Formats a results file can be written in: comma or tab separated values with a header line,
+# or one JSON object per line keyed by the column names
+FORMATS = ('csv', 'tsv', 'jsonl')
+
+# Writes rows of values, such as the statistics rows of replications, to a results file. Rows
+# are kept in memory and written buffer_size at a time, and when flushed or closed, with one
+# write per batch made while holding an exclusive lock on the file, so any number of processes
+# can write to the same file without their lines interleaving. The header line of columns is
+# written if the file is empty when the first batch is, which is checked under the lock, so
+# only one of the processes writes it. With mode 'w' the file is emptied by the first batch
+# instead of appended to
+class ResultSink:
+    # Rows kept in memory before they are written
+    BUFFER_SIZE = 1000
+
+    def __init__(self, path, format='csv', columns=None, mode='a', buffer_size=BUFFER_SIZE):
+        if format not in FORMATS:
+            raise ValueError("Expected a results format out of %s, got %r" % (', '.join(FORMATS), format))
+        if mode not in ('a', 'w'):
+            raise ValueError("Expected mode a or w, got %r" % mode)
+        self.path = path
+        self.format = format
+        self.columns = columns
+        self.mode = mode
+        self.buffer_size = buffer_size
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    # The file line of row
+    def line(self, row):
+        if self.format == 'jsonl':
+            if self.columns is None:
+                return json.dumps(list(row)) + '\n'
+            return json.dumps(dict(zip(self.columns, row)), sort_keys=True) + '\n'
+        separator = ',' if self.format == 'csv' else '\t'
+        return separator.join([str(value) for value in row]) + '\n'
+
+    # Writes the rows kept in memory. The first call creates or empties the file even with no
+    # rows, so a file is left however many rows there are
+    def flush(self):
+        if not self.rows and self.mode == 'a':
+            return
+        fh = open(self.path, 'a')
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            if self.mode == 'w':
+                fh.truncate(0)
+                self.mode = 'a'
+            fh.seek(0, 2)
+            lines = [self.line(row) for row in self.rows]
+            if fh.tell() == 0 and self.columns is not None and self.format != 'jsonl':
+                lines.insert(0, self.line(self.columns))
+            fh.write(''.join(lines))
+            fh.flush()
+        finally:
+            # Closing the file releases the lock
+            fh.close()
+        self.rows = []
+
+    def close(self):
+        self.flush()
+
+# Adds the flag that chooses the format of the results file to parser
+def add_format_argument(parser):
+    parser.add_argument('-O', '--format',
+                        help='Format of the results file, out of %s, default is csv' % ', '.join(FORMATS),
+                        default='csv')
@@ -0,0 +1,97 @@
+import math
+
+# Mean and variance of a stream of observations, updated one observation at a time with
+# Welford's method, so nothing but three numbers is kept however many observations there are
+# and the variance does not suffer the cancellation of summing squares
+class RunningStatistics:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_squared_deviations = 0.0
+
+    def add(self, value):
+        self.count += 1
+        deviation = value - self.mean
+        self.mean += deviation / self.count
+        self.sum_squared_deviations += deviation * (value - self.mean)
+
+    def total(self):
+        return self.mean * self.count
+
+    # Sample variance, 0 until there are two observations
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self.sum_squared_deviations / (self.count - 1)
+
+    def standard_deviation(self):
+        return math.sqrt(self.variance())
+
+    # Half-width of the confidence interval of the mean at confidence, e.g. 0.95, from the
+    # Student t distribution. Infinite until there are two observations
+    def half_width(self, confidence=0.95):
+        if self.count < 2:
+            return float('inf')
+        return t_quantile((1 + confidence) / 2.0, self.count - 1) * self.standard_deviation() / math.sqrt(self.count)
+
+# Quantile of the standard normal distribution at probability, by bisection on its
+# distribution function
+def normal_quantile(probability):
+    low, high = -40.0, 40.0
+    for iteration in xrange(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+# Distribution function of the Student t distribution with degrees_of_freedom at
+# sqrt(degrees_of_freedom) * tan(angle), from the finite series for whole degrees of freedom
+# (Abramowitz and Stegun 26.7.3 and 26.7.4)
+def t_distribution(angle, degrees_of_freedom):
+    n = degrees_of_freedom
+    sine, cosine = math.sin(angle), math.cos(angle)
+    if n % 2:
+        total = term = cosine if n > 1 else 0.0
+        for k in xrange(2, n - 1, 2):
+            term *= cosine * cosine * k / (k + 1.0)
+            total += term
+        twice_tail = 2 / math.pi * (angle + sine * total)
+    else:
+        total = term = 1.0
+        for k in xrange(1, n - 2, 2):
+            term *= cosine * cosine * k / (k + 1.0)
+            total += term
+        twice_tail = sine * total
+    return (1 + twice_tail) / 2
+
+# Degrees of freedom from which the Cornish-Fisher expansion is used instead of the exact series
+CORNISH_FISHER_DEGREES = 30
+
+# Quantile of the Student t distribution with degrees_of_freedom at probability. Exact for
+# one and two degrees of freedom, by bisection on the distribution function below
+# CORNISH_FISHER_DEGREES, and from the Cornish-Fisher expansion about the normal quantile
+# from there up. The expansion comes out slightly low, which narrows the intervals, but by
+# less than 0.0002% at 30 degrees of freedom for probabilities up to 0.9995; at 3 degrees of
+# freedom it would be 0.12% low at 0.975 and 0.8% low at 0.995
+def t_quantile(probability, degrees_of_freedom):
+    n = degrees_of_freedom
+    if n == 1:
+        return math.tan(math.pi * (probability - 0.5))
+    if n == 2:
+        return (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability))
+    if n < CORNISH_FISHER_DEGREES:
+        low, high = -math.pi / 2, math.pi / 2
+        for iteration in xrange(100):
+            middle = (low + high) / 2
+            if t_distribution(middle, n) < probability:
+                low = middle
+            else:
+                high = middle
+        return math.sqrt(n) * math.tan((low + high) / 2)
+    z = normal_quantile(probability)
+    return (z + (z ** 3 + z) / (4.0 * n)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96.0 * n ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384.0 * n ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160.0 * n ** 4))
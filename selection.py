@@ -0,0 +1,194 @@
+import argparse
+import os
+import re
+import sys
+import time
+from intersection_simulation import check_arg, simulation_parameters
+from optimizer import add_weights_argument, parse_weights, run_timings
+from replication import replication_seeds
+from result_cache import add_cache_arguments, open_cache
+from result_sink import ResultSink, add_format_argument
+
+# Light plans of the experiments already run, from the names of their results files
+PLAN_FILE = re.compile(r'light_g(\d+)_r(\d+)_')
+
+def experiment_plans(directory='ExperimentResults'):
+    plans = set()
+    for name in os.listdir(directory):
+        match = PLAN_FILE.match(name)
+        if match:
+            plans.add((int(match.group(1)), int(match.group(2))))
+    return sorted(plans)
+
+# Creating optional flag arguments for the selection. Any other flags are the simulation flags
+# of intersection_simulation.py and set the parameters the plans share
+def check_selection_arg(args=None):
+    parser = argparse.ArgumentParser(description='Picks the light plan with the least weighted average wait out of '
+                                                 'a few, with the KN ranking and selection procedure: replications '
+                                                 'go to the plans still in contention, and plans clearly worse than '
+                                                 'another are dropped, until one is left. The other flags of '
+                                                 'intersection_simulation.py set the parameters the plans share, and '
+                                                 '-s the seed the replication seeds are drawn from')
+    parser.add_argument('-P', '--plans',
+                        help='Comma separated green:red light times of the plans, default is the plans of the '
+                             'light_g*_r* files in ExperimentResults',
+                        default='')
+    parser.add_argument('-c', '--confidence',
+                        help='Probability that the plan picked is the best, or within -z of it, default is 0.95',
+                        default='0.95')
+    parser.add_argument('-z', '--indifference',
+                        help='Difference in the objective too small to matter, default is 0.5',
+                        default='0.5')
+    add_weights_argument(parser)
+    parser.add_argument('-R', '--replications',
+                        help='Number of replications of every plan before any is dropped, default is 10',
+                        default='10')
+    parser.add_argument('-b', '--batch',
+                        help='Number of replications run of every plan left between looks, default is 10',
+                        default='10')
+    parser.add_argument('-M', '--maxreplications',
+                        help='Most replications of a plan, after which the plan with the least mean is picked '
+                             'without the -c guarantee, default is 1000',
+                        default='1000')
+    parser.add_argument('-j', '--processes',
+                        help='Number of processes to run the replications in, 0 for one per core, default is 0',
+                        default='0')
+    parser.add_argument('-o', '--output',
+                        help='Results file a line for every plan is written to, default is ExperimentResults/selection.csv',
+                        default='ExperimentResults/selection.csv')
+    add_cache_arguments(parser)
+    add_format_argument(parser)
+    results, simulation_args = parser.parse_known_args(args)
+    if results.plans:
+        plans = [tuple(int(duration) for duration in plan.split(':')) for plan in results.plans.split(',')]
+    else:
+        plans = experiment_plans()
+    if len(plans) < 2:
+        raise ValueError("Expected at least 2 plans to select from, got %d" % len(plans))
+    first_stage = int(results.replications)
+    if first_stage < 2:
+        raise ValueError("The first stage needs at least two replications")
+    return (plans,
+            float(results.confidence),
+            float(results.indifference),
+            parse_weights(results.weights),
+            first_stage,
+            int(results.batch),
+            int(results.maxreplications),
+            int(results.processes),
+            results.output,
+            results.format,
+            (results.cache, float(results.cachesize)),
+            simulation_args)
+
+# Picks the plan, a (green, red) pair, with the least mean objective with the fully sequential
+# procedure of Kim and Nelson (2001). Every plan is run first_stage replications, from which
+# the variance of the difference of each pair of plans is estimated. Then, one replication at
+# a time, a plan is dropped once its mean is above another's by more than a margin that
+# shrinks as replications are added, and is smaller for pairs whose difference varies less.
+# The plan left is the best, or within indifference of it, with probability confidence. All
+# plans use the same seeds, drawn from seed, which keeps the variance of the differences small.
+# Replications are run batch at a time over a pool of processes, and the drops checked after
+# each replication of the batch. Returns the objectives of the replications of each plan, the
+# number of replications each plan had when it was dropped or the procedure stopped, and the
+# plans left, from the least mean up, which is one plan unless max_replications was reached
+def kim_nelson(parameters, plans, confidence=0.95, indifference=0.5, weights=None, first_stage=10, batch=10,
+               max_replications=1000, processes=0, seed=None, cache=None):
+    parameters = dict(parameters, TrafficLight=True)
+    parameters.pop('Seed', None)
+    seeds = replication_seeds(seed, max(first_stage, max_replications))
+    objectives = dict((plan, []) for plan in plans)
+
+    def extend(run, count):
+        run_timings(parameters, objectives, seeds, run, count, weights, processes, cache)
+
+    extend(plans, first_stage)
+    alpha = 1 - confidence
+    n0 = first_stage
+    eta = 0.5 * ((2 * alpha / (len(plans) - 1)) ** (-2.0 / (n0 - 1)) - 1)
+    h_squared = 2 * eta * (n0 - 1)
+    # Sample variance of the differences of each pair of plans over the first stage
+    variances = {}
+    for plan in plans:
+        for other in plans:
+            if plan != other:
+                differences = [value - other_value for value, other_value in
+                               zip(objectives[plan][:n0], objectives[other][:n0])]
+                mean = sum(differences) / n0
+                variances[plan, other] = sum((difference - mean) ** 2 for difference in differences) / (n0 - 1)
+
+    sums = dict((plan, sum(objectives[plan][:n0])) for plan in plans)
+    stages = {}
+    surviving = list(plans)
+    count = n0
+    while True:
+        dropped = []
+        for plan in surviving:
+            for other in surviving:
+                if plan == other:
+                    continue
+                margin = max(0.0, indifference / (2 * count) *
+                             (h_squared * variances[plan, other] / indifference ** 2 - count))
+                if (sums[plan] - sums[other]) / count > margin:
+                    dropped.append(plan)
+                    break
+        for plan in dropped:
+            stages[plan] = count
+        surviving = [plan for plan in surviving if plan not in dropped]
+        if len(surviving) == 1 or count >= max_replications:
+            break
+        if len(objectives[surviving[0]]) == count:
+            extend(surviving, min(count + batch, max_replications))
+        count += 1
+        for plan in surviving:
+            sums[plan] += objectives[plan][count - 1]
+
+    # Without a single plan left, the one with the least mean is picked
+    surviving.sort(key=lambda plan: sums[plan])
+    for plan in surviving:
+        stages[plan] = count
+    return objectives, stages, surviving
+
+# Runs the selection with the values passed in with flags, prints the plan picked and writes a
+# line for every plan
+def selection(args=None):
+    plans, confidence, indifference, weights, first_stage, batch, max_replications, processes, output, \
+        output_format, cache, simulation_args = check_selection_arg(args)
+    parameters = simulation_parameters(check_arg(simulation_args))
+    if parameters['SaveSnapshot']:
+        raise ValueError("The selection cannot save a snapshot, each replication would overwrite the others")
+    if parameters['LoadSnapshot']:
+        raise ValueError("The selection cannot load a snapshot, its plans would all carry on from one warm-up")
+    cache = open_cache(*cache, seeded=parameters['Seed'] is not None)
+
+    start_time = time.time()
+    objectives, stages, surviving = kim_nelson(parameters, plans, confidence, indifference, weights, first_stage,
+                                               batch, max_replications, processes, parameters['Seed'], cache)
+    end_time = time.time()
+    if cache is not None:
+        cache.close()
+
+    # Plans from the one picked to the first dropped
+    ranking = sorted(plans, key=lambda plan: (plan not in surviving, -stages[plan],
+                                              sum(objectives[plan][:stages[plan]]) / stages[plan]))
+    sink = ResultSink(output, output_format, ('14 Green Light', '14 Red Light', 'Replications', 'Objective',
+                                              'Dropped'), 'w')
+    for plan in ranking:
+        sink.write(plan + (stages[plan], sum(objectives[plan][:stages[plan]]) / stages[plan], plan not in surviving))
+    sink.close()
+
+    best = surviving[0]
+    used = sum(stages.values())
+    run = sum(len(values) for values in objectives.values())
+    print '%d plans compared with %d replications (%d run, with batches) in %f seconds, results written to %s' % (
+        len(plans), used, run, end_time - start_time, output)
+    print 'Best plan: green %d, red %d, objective %f after %d replications' % (
+        best + (sum(objectives[best][:stages[best]]) / stages[best], stages[best]))
+    if len(surviving) == 1:
+        print '    Best, or within %g of the best, with probability %g' % (indifference, confidence)
+    else:
+        print '    %d plans were still in contention after %d replications, the one with the least mean was ' \
+              'picked without the probability guarantee' % (len(surviving), max_replications)
+
+if __name__ == '__main__':
+    selection(sys.argv[1:])
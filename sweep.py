@@ -0,0 +1,231 @@
+import argparse
+import csv
+import itertools
+import sys
+import time
+from intersection_simulation import Simulation, check_arg, simulation_parameters
+from replication import add_sequential_arguments, replication_seeds, run_sequential, run_tasks, sequential_options
+from result_cache import add_cache_arguments, open_cache
+from result_sink import ResultSink, add_format_argument
+from work_queue import WorkQueue, run_workers
+
+# Factors a sweep varies, named as the long flags that set them, and how a value given for
+# each is read
+FACTORS = ('greenlighttime', 'redlighttime', 'fourteenth', 'atlantic', 'light')
+
+def read_light(text):
+    return text == "True" or text == "T" or text == "true" or text == "t"
+
+FACTOR_TYPES = {'greenlighttime': int, 'redlighttime': int, 'fourteenth': float, 'atlantic': float,
+                'light': read_light}
+
+# Creating optional flag arguments for the sweep. Any other flags are the simulation flags of
+# intersection_simulation.py and set the parameters that are not swept
+def check_sweep_arg(args=None):
+    parser = argparse.ArgumentParser(description='Runs the intersection simulation over a grid of light timings and '
+                                                 'arrival rates. Each factor takes comma separated values, or '
+                                                 'start:stop:step for the values from start to stop, both included. '
+                                                 'The other flags of intersection_simulation.py set the parameters '
+                                                 'not swept, and -s the seed the replication seeds are drawn from')
+    parser.add_argument('-g', '--greenlighttime',
+                        help='Lengths of time 14th street light is green, default is 45',
+                        default='45')
+    parser.add_argument('-r', '--redlighttime',
+                        help='Lengths of time 14th street light is red, default is 30',
+                        default='30')
+    parser.add_argument('-f', '--fourteenth',
+                        help='Mean arrival times of cars on 14th Street, default is 0.1',
+                        default='0.1')
+    parser.add_argument('-a', '--atlantic',
+                        help='Mean arrival times of cars on Atlantic Dr, default is 6',
+                        default='6')
+    parser.add_argument('-l', '--light',
+                        help='Whether traffic light is used, e.g. t,f for both, default is false',
+                        default='False')
+    parser.add_argument('-D', '--design',
+                        help='Csv file of the design points to run instead of every combination of the factors, with '
+                             'a header line naming the factors (greenlighttime, redlighttime, fourteenth, atlantic, '
+                             'light) it sets. Factors it does not name take their first value from the flags',
+                        default='')
+    parser.add_argument('-R', '--replications',
+                        help='Number of replications of each design point, the most run with -p, default is 10',
+                        default='10')
+    parser.add_argument('-j', '--processes',
+                        help='Number of processes to run the replications in, 0 for one per core, default is 0',
+                        default='0')
+    parser.add_argument('-o', '--output',
+                        help='Results file the result table is written to, default is ExperimentResults/sweep.csv',
+                        default='ExperimentResults/sweep.csv')
+    parser.add_argument('-Q', '--queue',
+                        help='SQLite file to keep the replications in as a work queue, so an interrupted sweep '
+                             'started again carries on where it stopped and workers on other machines sharing the '
+                             'file can help (python work_queue.py <file>). Needs -s',
+                        default='')
+    add_sequential_arguments(parser)
+    add_cache_arguments(parser)
+    add_format_argument(parser)
+    results, simulation_args = parser.parse_known_args(args)
+    factor_values = dict((factor, parse_values(getattr(results, factor), FACTOR_TYPES[factor]))
+                         for factor in FACTORS)
+    return (factor_values,
+            results.design,
+            int(results.replications),
+            int(results.processes),
+            results.output,
+            results.format,
+            results.queue,
+            sequential_options(results),
+            (results.cache, float(results.cachesize)),
+            simulation_args)
+
+# Values of a factor from comma separated values, or from start:stop:step, read with read
+def parse_values(text, read):
+    if ':' in text:
+        start, stop, step = [float(part) for part in text.split(':')]
+        if step <= 0:
+            raise ValueError("Step of %r must be positive" % text)
+        values = [start + index * step for index in xrange(int(round((stop - start) / step)) + 1)]
+        if read is int:
+            return [int(round(value)) for value in values]
+        if read is float:
+            # Rounded so that e.g. 0.1:0.3:0.1 gives 0.3 and not 0.30000000000000004
+            return [round(value, 10) for value in values]
+        raise ValueError("%r cannot be given as a range" % text)
+    return [read(value) for value in text.split(',')]
+
+# Design points, as dicts from factor to value: every combination of factor_values, or the
+# rows of the design file if one is given
+def design_points(factor_values, design=''):
+    if not design:
+        return [dict(zip(FACTORS, combination))
+                for combination in itertools.product(*[factor_values[factor] for factor in FACTORS])]
+    fh = open(design, 'rb')
+    rows = list(csv.DictReader(fh))
+    fh.close()
+    points = []
+    for row in rows:
+        unknown = [factor for factor in row if factor not in FACTORS]
+        if unknown:
+            raise ValueError("Unknown factors in design %s: %s" % (design, ', '.join(unknown)))
+        points.append(dict((factor, FACTOR_TYPES[factor](row[factor]) if factor in row
+                            else factor_values[factor][0]) for factor in FACTORS))
+    return points
+
+# Simulation parameters for a design point, from the parameters not swept
+def point_parameters(parameters, point):
+    return dict(parameters,
+                GreenLightDuration=point['greenlighttime'],
+                RedLightDuration=point['redlighttime'],
+                TrafficLight=point['light'],
+                n14e_mean_arrival=point['fourteenth'],
+                s14e_mean_arrival=point['fourteenth'],
+                en14w_mean_arrival=point['fourteenth'],
+                es14w_mean_arrival=point['fourteenth'],
+                n_atlantic_s_mean_arrival=point['atlantic'],
+                s_atlantic_n_mean_arrival=point['atlantic'])
+
+# Columns of the result table: the parameters and seed that key each row, then the statistics
+KEY_COLUMNS = Simulation.STATISTICS_COLUMNS[:5] + ('Seed',)
+SWEEP_COLUMNS = KEY_COLUMNS + Simulation.STATISTICS_COLUMNS[5:]
+
+# The replications of a sweep, as (parameters, seed) pairs ordered by point and then seed.
+# Every point is run with the same replication seeds, drawn from seed, so points are compared
+# under common random numbers
+def sweep_tasks(parameters, points, replications, seed=None):
+    parameters = dict(parameters)
+    parameters.pop('Seed', None)
+    seeds = replication_seeds(seed, replications)
+    return [(point_parameters(parameters, point), replication_seed) for point in points for replication_seed in seeds]
+
+# Result table rows from the statistics rows of tasks
+def sweep_rows(tasks, rows):
+    return [row[:5] + [replication_seed] + row[5:] for row, (parameters, replication_seed) in zip(rows, tasks)]
+
+# Runs replications replications of every design point over a pool of processes (one per core
+# if processes is 0), taking those it can from cache. Returns the result table rows, ordered
+# by point and then seed
+def run_sweep(parameters, points, replications, processes=0, seed=None, cache=None):
+    tasks = sweep_tasks(parameters, points, replications, seed)
+    return sweep_rows(tasks, run_tasks(tasks, processes, cache))
+
+# Same as run_sweep, but every design point stops taking replications once the means of the
+# metrics are precise to precision at confidence, so design points with little variance take
+# fewer. Returns the result table rows
+def run_sweep_sequential(parameters, points, metrics, precision, confidence=0.95, batch=10, max_replications=10,
+                         processes=0, seed=None, cache=None):
+    point_rows, seeds = run_sequential([point_parameters(parameters, point) for point in points], metrics,
+                                       precision, confidence, batch, max_replications, processes, seed, cache)
+    rows = []
+    for point, statistics_rows in zip(points, point_rows):
+        rows += sweep_rows([(point, replication_seed) for replication_seed in seeds], statistics_rows)
+    return rows
+
+# Seconds between looks at the work queue while other workers finish their replications
+QUEUE_POLL = 5
+
+# Same as run_sweep, but with the replications kept in the work queue at path. Replications
+# already done there are not run again. Once there are none left to claim, waits for those
+# other workers hold to be done, or for their leases to expire so they can be claimed again.
+# Raises an error if a replication has failed on every attempt the work queue gives it
+def run_sweep_queue(path, parameters, points, replications, processes=0, seed=None):
+    if seed is None:
+        raise ValueError("A sweep with a work queue needs a seed, so the same replications are found when it is "
+                         "started again")
+    tasks = sweep_tasks(parameters, points, replications, seed)
+    queue = WorkQueue(path)
+    queue.add_jobs(tasks)
+    queue.close()
+    while True:
+        # No connection is held open while the worker processes are forked
+        run_workers(path, processes)
+        queue = WorkQueue(path)
+        rows = queue.results(tasks)
+        failures = queue.failures(tasks)
+        queue.close()
+        if failures:
+            raise RuntimeError("%d replications of the sweep failed on every attempt, the last error of the first "
+                               "was:\n%s" % (len(failures), failures[0]))
+        if None not in rows:
+            return sweep_rows(tasks, rows)
+        time.sleep(QUEUE_POLL)
+
+# Runs the sweep with the values passed in with flags and writes one result table
+def sweep(args=None):
+    factor_values, design, replications, processes, output, output_format, queue, sequential, cache, \
+        simulation_args = check_sweep_arg(args)
+    precision, metrics, confidence, batch = sequential
+    parameters = simulation_parameters(check_arg(simulation_args))
+    if parameters['SaveSnapshot']:
+        raise ValueError("A sweep cannot save a snapshot, each replication would overwrite the others")
+    if parameters['LoadSnapshot']:
+        raise ValueError("A sweep cannot load a snapshot, its design points would all carry on from one warm-up")
+    if precision and queue:
+        raise ValueError("A sweep with a work queue cannot stop at a precision")
+    points = design_points(factor_values, design)
+
+    # The work queue keeps the results of a sweep itself
+    cache = None if queue else open_cache(*cache, seeded=parameters['Seed'] is not None)
+    start_time = time.time()
+    if precision:
+        rows = run_sweep_sequential(parameters, points, metrics, precision, confidence, batch, replications,
+                                    processes, parameters['Seed'], cache)
+    elif queue:
+        rows = run_sweep_queue(queue, parameters, points, replications, processes, parameters['Seed'])
+    else:
+        rows = run_sweep(parameters, points, replications, processes, parameters['Seed'], cache)
+    end_time = time.time()
+    if cache is not None:
+        cache.close()
+
+    sink = ResultSink(output, output_format, SWEEP_COLUMNS, 'w')
+    sink.write_rows(rows)
+    sink.close()
+    if precision:
+        print '%d design points of %d replications in all run in %f seconds, results written to %s' % (
+            len(points), len(rows), end_time - start_time, output)
+    else:
+        print '%d design points of %d replications run in %f seconds, results written to %s' % (
+            len(points), replications, end_time - start_time, output)
+
+if __name__ == '__main__':
+    sweep(sys.argv[1:])
@@ -0,0 +1,43 @@
+import random
+import unittest
+from engine import SimulationEngine
+
+# Runs a random schedule of events on an engine with the given future event list strategy,
+# pausing with run(until_time=...) and scheduling events just after the pause, as a driver
+# that steps the simulation does. Returns the (timestamp, name) of the events in the order
+# they were executed
+def paused_run_order(fel_strategy, seed, pauses=5):
+    rng = random.Random(seed)
+    engine = SimulationEngine(fel_strategy)
+    order = []
+    names = iter(xrange(10 ** 9))
+
+    def handler(name):
+        order.append((engine.now, name))
+        if rng.random() < 0.7:
+            engine.schedule_new_event(engine.now + rng.expovariate(1.0), 0, next(names))
+
+    engine.register_handler(0, handler)
+    for index in xrange(20):
+        engine.schedule_new_event(rng.uniform(0, 10), 0, next(names))
+    until_time = 0.0
+    for pause in xrange(pauses):
+        until_time += rng.uniform(0.5, 5)
+        engine.run(until_time=until_time)
+        for index in xrange(rng.randint(1, 3)):
+            engine.schedule_new_event(until_time + rng.uniform(0, 1e-3), 0, next(names))
+    engine.run()
+    return order
+
+class PausedRunTest(unittest.TestCase):
+    # The calendar queue and the linked list must execute events in the same order as the heap
+    # when events are scheduled before the one a paused run() stopped at
+    def test_same_order_as_heap(self):
+        for seed in xrange(200):
+            expected = paused_run_order('heap', seed)
+            for fel_strategy in ('calendar', 'linked'):
+                self.assertEqual(paused_run_order(fel_strategy, seed), expected,
+                                 '%s future event list, seed %d' % (fel_strategy, seed))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from intersection_simulation import Simulation
+
+# Simulation that records the times of the light changes it executes
+class RecordingSimulation(Simulation):
+    def reset(self, seed=None):
+        self.light_change_times = []
+        Simulation.reset(self, seed)
+
+    def light_changes(self, change, payload):
+        self.light_change_times.append(self.simulation_engine.now)
+        Simulation.light_changes(self, change, payload)
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'warm.snap')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # With the default 45/30 light, the light changes exactly at 300, the end of the warm-up.
+    # The run loaded from the snapshot must still have the light changing
+    def test_light_changes_after_warm_up_ending_at_a_light_change(self):
+        Simulation(TrafficLight=True, Seed=3, SimulationDuration=300, SaveSnapshot=self.path).run()
+        simulation = RecordingSimulation(TrafficLight=True, Seed=4, SimulationDuration=300, LoadSnapshot=self.path)
+        simulation.run()
+        self.assertTrue(len(simulation.light_change_times) >= 300 / (45 + 30) * 2)
+        for delay in simulation.delay:
+            self.assertTrue(delay.count > 0)
+
+    # A snapshot with no light change pending cannot be carried on from
+    def test_snapshot_without_light_change_rejected(self):
+        simulation = Simulation(TrafficLight=True, Seed=3, SimulationDuration=300)
+        simulation.run()
+        simulation.save_snapshot(self.path)
+        self.assertRaises(ValueError, Simulation(TrafficLight=True, LoadSnapshot=self.path).run)
+
+    # The parameters come from the simulation the snapshot is loaded into, not the snapshot
+    def test_parameters_of_loading_simulation_used(self):
+        Simulation(TrafficLight=True, Seed=3, SimulationDuration=300, SaveSnapshot=self.path).run()
+        simulation = RecordingSimulation(TrafficLight=True, Seed=4, SimulationDuration=600, GreenLightDuration=60,
+                                         RedLightDuration=20, LoadSnapshot=self.path)
+        simulation.run()
+        self.assertEqual(simulation.statistics_row()[3:5], [60, 20])
+        # The change pending in the snapshot, at 345, still comes when it was due, the rest
+        # follow the new timings
+        times = simulation.light_change_times
+        self.assertEqual(times[0], 345)
+        self.assertEqual(set(later - earlier for earlier, later in zip(times[1:], times[2:])), set([60, 20]))
+
+    # The pending arrivals are of the kind with or without the light
+    def test_light_mismatch_rejected(self):
+        Simulation(TrafficLight=True, Seed=3, SimulationDuration=300, SaveSnapshot=self.path).run()
+        self.assertRaises(ValueError, Simulation(TrafficLight=False, LoadSnapshot=self.path).run)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from intersection_simulation import check_arg, simulation_parameters
+from sweep import design_points, run_sweep, sweep
+
+class SweepTest(unittest.TestCase):
+    # Every row of the result table is labelled with the factors of its design point, and
+    # points that differ give different results
+    def test_rows_match_their_factors(self):
+        parameters = simulation_parameters(check_arg(['-t', '200']))
+        factor_values = {'greenlighttime': [30, 60], 'redlighttime': [13], 'fourteenth': [0.1], 'atlantic': [6],
+                         'light': [True]}
+        points = design_points(factor_values)
+        rows = run_sweep(parameters, points, 2, processes=1, seed=3)
+        self.assertEqual(len(rows), 4)
+        for point, point_rows in zip(points, [rows[:2], rows[2:]]):
+            for row in point_rows:
+                self.assertEqual(row[:5], [point['fourteenth'], point['atlantic'], point['light'],
+                                           point['greenlighttime'], point['redlighttime']])
+        self.assertNotEqual(rows[0][6:], rows[2][6:])
+
+    # A snapshot would have every design point carry on from one warm-up
+    def test_load_snapshot_rejected(self):
+        self.assertRaises(ValueError, sweep, ['-g', '30,60', '-l', 't', '-R', '2', '-s', '3', '-L', 'warm.snap'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+from array import array
+import sys
+
+# Bounded trace of the most recent events of a run, for debugging. Every record has the same
+# fixed fields, kept in preallocated typed arrays used as a ring buffer: once capacity records
+# are held each new record overwrites the oldest. Tracing a run of any length therefore costs
+# a fixed amount of memory and no output until the trace is dumped
+class Tracer:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("Trace capacity must be at least 1, got %r" % (capacity,))
+        self.capacity = capacity
+        self.times = array('d', [0.0]) * capacity
+        self.event_types = array('l', [0]) * capacity
+        self.lanes = array('l', [0]) * capacity
+        self.queue_lengths = array('l', [0]) * capacity
+        self.next = 0       # Position the next record is written to
+        self.count = 0      # Number of records ever written, including those overwritten
+
+    # Records an event of event_type at time, for the lane with index lane (-1 if the event
+    # is not for a lane) whose queue held queue_length cars
+    def record(self, time, event_type, lane, queue_length):
+        position = self.next
+        self.times[position] = time
+        self.event_types[position] = event_type
+        self.lanes[position] = lane
+        self.queue_lengths[position] = queue_length
+        position += 1
+        self.next = position if position < self.capacity else 0
+        self.count += 1
+
+    # The records held, oldest first, as (time, event type, lane, queue length) tuples
+    def records(self):
+        held = min(self.count, self.capacity)
+        positions = [(self.next - held + offset) % self.capacity for offset in xrange(held)]
+        return [(self.times[position], self.event_types[position], self.lanes[position],
+                 self.queue_lengths[position]) for position in positions]
+
+    # Prints the records held, naming event types and lanes from the event_names dict and
+    # lane_names sequence where given
+    def dump(self, event_names=None, lane_names=None, out=sys.stdout):
+        records = self.records()
+        print >> out, 'Last %d of %d events traced:' % (len(records), self.count)
+        for time, event_type, lane, queue_length in records:
+            if event_names is not None:
+                event_type = event_names.get(event_type, event_type)
+            if lane < 0:
+                print >> out, '  %f %s' % (time, event_type)
+            else:
+                if lane_names is not None:
+                    lane = lane_names[lane]
+                print >> out, '  %f %s, %d cars in %s queue' % (time, event_type, queue_length, lane)
@@ -0,0 +1,228 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+import traceback
+from replication import run_replication
+
+# Replications to run, kept in an SQLite database so that any number of worker processes, on
+# this machine or on others sharing the file, can take them on. A job is a set of simulation
+# parameters and a seed. It is pending until a worker claims it, running while the worker
+# holds its lease, and done once its statistics row has been stored. Claims and results are
+# each one transaction, so a job is never run by two workers at once and a finished job is
+# never lost or run again. A running job whose lease has expired, because its worker died,
+# can be claimed again. A job that has raised an error, or whose worker has died, on
+# max_attempts claims is failed, keeping the last error, and is not claimed again
+class WorkQueue:
+    SCHEMA = ('CREATE TABLE IF NOT EXISTS jobs ('
+              'id INTEGER PRIMARY KEY, '
+              'parameters TEXT NOT NULL, '
+              'seed INTEGER NOT NULL, '
+              "status TEXT NOT NULL DEFAULT 'pending', "
+              'worker TEXT, '
+              'lease_expires REAL, '
+              'result TEXT, '
+              'attempts INTEGER NOT NULL DEFAULT 0, '
+              'error TEXT, '
+              'UNIQUE (parameters, seed))')
+
+    # Seconds a worker may hold a job before others may claim it
+    LEASE = 3600
+
+    # Claims of a job before it is failed
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path, lease=LEASE, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        # Transactions are begun explicitly, as BEGIN IMMEDIATE so that a claim takes the
+        # write lock before it reads which jobs are pending
+        self.connection = sqlite3.connect(path, timeout=600, isolation_level=None)
+        self.connection.execute(self.SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    # Runs function(cursor) in one write transaction and returns its result
+    def transaction(self, function):
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            result = function(cursor)
+        except:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+        return result
+
+    # Adds the jobs given as (parameters, seed) pairs, in order, skipping those already in the
+    # queue, so a sweep that is started again keeps the jobs it has done. Those of them that
+    # failed are made pending again, with their attempts counted from 0
+    def add_jobs(self, tasks):
+        rows = [(json.dumps(parameters, sort_keys=True), seed) for parameters, seed in tasks]
+        def add(cursor):
+            cursor.executemany('INSERT OR IGNORE INTO jobs (parameters, seed) VALUES (?, ?)', rows)
+            cursor.executemany("UPDATE jobs SET status = 'pending', attempts = 0, error = NULL "
+                               "WHERE parameters = ? AND seed = ? AND status = 'failed'", rows)
+        self.transaction(add)
+
+    # Claims a pending job, or a running job whose lease has expired, for worker. Returns
+    # (job id, parameters, seed), or None if there is no job to claim. A running job whose
+    # lease has expired on its last attempt is failed instead
+    def claim(self, worker):
+        def claim_job(cursor):
+            now = time.time()
+            while True:
+                cursor.execute("SELECT id, parameters, seed, status, attempts, worker FROM jobs "
+                               "WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?) "
+                               "ORDER BY id LIMIT 1", (now,))
+                job = cursor.fetchone()
+                if job is None:
+                    return None
+                job_id, parameters, seed, status, attempts, previous_worker = job
+                if status == 'running' and attempts >= self.max_attempts:
+                    cursor.execute("UPDATE jobs SET status = 'failed', lease_expires = NULL, error = ? WHERE id = ?",
+                                   ('Worker %s did not finish the job within its lease' % previous_worker, job_id))
+                    continue
+                cursor.execute("UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, "
+                               "attempts = attempts + 1 WHERE id = ?", (worker, now + self.lease, job_id))
+                return job_id, json.loads(parameters), seed
+        return self.transaction(claim_job)
+
+    # Stores the statistics row of a job. A job already done, by a worker that claimed it
+    # after this one's lease expired, keeps its first result
+    def complete(self, job_id, row):
+        self.transaction(lambda cursor: cursor.execute(
+            "UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL WHERE id = ? AND status != 'done'",
+            (json.dumps(row), job_id)))
+
+    # Records the error a job raised, from a worker that still holds it. The job is pending
+    # again, or failed if this was its last attempt
+    def fail(self, job_id, worker, error):
+        self.transaction(lambda cursor: cursor.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, "
+            "lease_expires = NULL, error = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (self.max_attempts, error, job_id, worker)))
+
+    # Makes the running jobs of the workers on this machine whose processes no longer exist
+    # pending again, without waiting for their leases to expire, or failed if that was their
+    # last attempt
+    def release_dead_workers(self):
+        host = socket.gethostname()
+        def release(cursor):
+            cursor.execute("SELECT DISTINCT worker FROM jobs WHERE status = 'running' AND worker LIKE ?",
+                           (host + ':%',))
+            dead = [worker for (worker,) in cursor.fetchall() if not process_exists(int(worker.split(':')[-1]))]
+            cursor.executemany("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                               "error = 'Worker ' || worker || ' died while running the job', worker = NULL, "
+                               "lease_expires = NULL WHERE status = 'running' AND worker = ?",
+                               [(self.max_attempts, worker) for worker in dead])
+        self.transaction(release)
+
+    # Number of jobs with each status
+    def counts(self):
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        counts.update(self.connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return counts
+
+    # The statistics rows of the jobs given as (parameters, seed) pairs, in their order, None
+    # for a job not done
+    def results(self, tasks):
+        done = dict(((parameters, seed), result) for parameters, seed, result in self.connection.execute(
+            "SELECT parameters, seed, result FROM jobs WHERE status = 'done'"))
+        results = [done.get((json.dumps(parameters, sort_keys=True), seed)) for parameters, seed in tasks]
+        return [None if result is None else json.loads(result) for result in results]
+
+    # The last errors of the failed jobs among those given as (parameters, seed) pairs, in
+    # their order
+    def failures(self, tasks):
+        failed = dict(((parameters, seed), error) for parameters, seed, error in self.connection.execute(
+            "SELECT parameters, seed, error FROM jobs WHERE status = 'failed'"))
+        errors = [failed.get((json.dumps(parameters, sort_keys=True), seed)) for parameters, seed in tasks]
+        return [error for error in errors if error is not None]
+
+# Whether the process pid is running. A zombie, killed but not yet reaped, is not
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        return error.errno != 3     # ESRCH, no such process
+    try:
+        fh = open('/proc/%d/stat' % pid)
+    except IOError:
+        return True
+    state = fh.read().rsplit(')', 1)[-1].split()[0]
+    fh.close()
+    return state != 'Z'
+
+# Name a worker process is known by in the queue
+def worker_name():
+    return '%s:%d' % (socket.gethostname(), os.getpid())
+
+# Claims and runs jobs from the queue at path until there are none left to claim. A job that
+# raises an error is given back with the error, for another attempt or to be failed. Returns
+# the number of jobs run
+def work(path, lease=WorkQueue.LEASE):
+    queue = WorkQueue(path, lease)
+    worker = worker_name()
+    done = 0
+    try:
+        while True:
+            job = queue.claim(worker)
+            if job is None:
+                return done
+            job_id, parameters, seed = job
+            try:
+                row = run_replication((parameters, seed))
+            except Exception:
+                queue.fail(job_id, worker, traceback.format_exc())
+                continue
+            queue.complete(job_id, row)
+            done += 1
+    finally:
+        queue.close()
+
+# Runs processes worker processes (one per core if 0) on the queue at path until there are
+# no jobs left to claim
+def run_workers(path, processes=0, lease=WorkQueue.LEASE):
+    queue = WorkQueue(path, lease)
+    queue.release_dead_workers()
+    queue.close()
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1:
+        work(path, lease)
+        return
+    workers = [multiprocessing.Process(target=work, args=(path, lease)) for index in xrange(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+# Creating optional flag arguments for a worker
+def check_arg(args=None):
+    parser = argparse.ArgumentParser(description='Runs the jobs of a sweep work queue, e.g. on another machine '
+                                                 'sharing the queue file with the one that started the sweep')
+    parser.add_argument('queue',
+                        help='SQLite file of the work queue')
+    parser.add_argument('-j', '--processes',
+                        help='Number of worker processes, 0 for one per core, default is 0',
+                        default='0')
+    parser.add_argument('-e', '--lease',
+                        help='Seconds a worker may hold a job before other workers may claim it, default is 3600',
+                        default='3600')
+    results = parser.parse_args(args)
+    return (results.queue,
+            int(results.processes),
+            float(results.lease))
+
+if __name__ == '__main__':
+    path, processes, lease = check_arg(sys.argv[1:])
+    run_workers(path, processes, lease)
+    queue = WorkQueue(path)
+    counts = queue.counts()
+    print '%(done)d jobs done, %(running)d running, %(pending)d pending, %(failed)d failed' % counts